@@ -3,6 +3,7 @@
 #include "MPU6050.h"
 #include <WiFi.h>
 #include <HTTPClient.h>
+#include <WiFiUdp.h>
 #include <ArduinoJson.h>
 
 #define LED_BUILTIN 2
@@ -30,6 +31,26 @@ String API_NEXT     = String(BACKEND_HOST) + "/api/player/next";
 String API_PREVIOUS = String(BACKEND_HOST) + "/api/player/previous";
 String API_STATUS   = String(BACKEND_HOST) + "/api/status";
 String API_TOGGLE   = String(BACKEND_HOST) + "/api/toggle";
+// Which user's Spotify the buttons control (POST /api/session/device-key); "" needs STARTIFY_SINGLE_USER_FALLBACK=1.
+// UDP packets carry no key: pair the device id printed at boot via POST /api/session/devices instead.
+const char* DEVICE_KEY = "";
+
+// ==================== UDP FAST PATH ====================
+// 12 byte datagram: "ST", version, opcode, device id (u32), seq (u32), little endian.
+// The backend acks with 15 bytes (adds status u16 + module flags); HTTP is the fallback.
+const char* BACKEND_IP = "10.157.199.149";
+const uint16_t UDP_PORT = 5005;
+const uint16_t UDP_ACK_TIMEOUT = 80;  // ms before resending the same seq
+const uint8_t UDP_RETRIES = 2;
+
+enum Opcode : uint8_t {
+  OP_PLAY = 1, OP_PAUSE = 2, OP_NEXT = 3, OP_PREVIOUS = 4,
+  OP_VOICE_ON = 5, OP_VOICE_OFF = 6, OP_HAND_ON = 7, OP_HAND_OFF = 8
+};
+
+WiFiUDP udp;
+uint32_t deviceId = 0;
+uint32_t udpSeq = 0;  // Starts at 0 after boot so the backend resets our dedupe window
 
 // ==================== PUSH BUTTONS ====================
 #define BUTTON_VOICE 15    // Toggle Voice Control
@@ -48,6 +69,39 @@ bool handActive = false;
 float distanceThreshold = 10.0;
 bool isPaused = false;
 
+// ==================== UDP SEND ====================
+// Returns the ack status (e.g. 202 queued, 200 toggled), or 0 if no ack arrived.
+uint16_t sendEvent(uint8_t opcode) {
+  uint8_t packet[12] = {'S', 'T', 1, opcode};
+  uint32_t seq = udpSeq++;
+  memcpy(packet + 4, &deviceId, 4);
+  memcpy(packet + 8, &seq, 4);
+
+  for (uint8_t attempt = 0; attempt <= UDP_RETRIES; attempt++) {
+    udp.beginPacket(BACKEND_IP, UDP_PORT);
+    udp.write(packet, sizeof(packet));
+    udp.endPacket();
+
+    unsigned long sent = millis();
+    while (millis() - sent < UDP_ACK_TIMEOUT) {
+      if (udp.parsePacket() == 15) {
+        uint8_t ack[15];
+        udp.read(ack, sizeof(ack));
+        uint32_t ackSeq;
+        memcpy(&ackSeq, ack + 8, 4);
+        if (ack[0] == 'S' && ack[1] == 'T' && ackSeq == seq) {
+          uint16_t status = ack[12] | (ack[13] << 8);
+          voiceActive = ack[14] & 1;
+          handActive = ack[14] & 2;
+          return status;
+        }
+      }
+      delay(1);
+    }
+  }
+  return 0;
+}
+
 // ==================== TOGGLE MODULE FUNCTION ====================
 void toggleModule(const char* moduleName, bool newState) {
   if (WiFi.status() != WL_CONNECTED) {
@@ -55,6 +109,15 @@ void toggleModule(const char* moduleName, bool newState) {
     return;
   }
 
+  bool isVoice = strcmp(moduleName, "voice") == 0;
+  uint8_t opcode = isVoice ? (newState ? OP_VOICE_ON : OP_VOICE_OFF) : (newState ? OP_HAND_ON : OP_HAND_OFF);
+  uint16_t udpStatus = sendEvent(opcode);
+  if (udpStatus >= 200 && udpStatus < 300) {
+    Serial.printf("🔘 Toggled %s → %s over UDP (%d)\n", moduleName, newState ? "ON" : "OFF", udpStatus);
+    return;
+  }
+  // No ack or an error ack: try HTTP
+
   HTTPClient http;
   http.begin(API_TOGGLE);
   http.addHeader("Content-Type", "application/json");
@@ -115,15 +178,25 @@ void fetchStatus() {
 }
 
 // ==================== PLAYER API ====================
-void callPlayerAPI(const String& url, const char* actionName) {
+void callPlayerAPI(uint8_t opcode, const String& url, const char* actionName) {
   if (WiFi.status() != WL_CONNECTED) {
     Serial.println("❌ WiFi not connected");
     return;
   }
 
+  uint16_t udpStatus = sendEvent(opcode);
+  if (udpStatus >= 200 && udpStatus < 300) {
+    Serial.printf("🎵 %s | UDP: %d\n", actionName, udpStatus);
+    return;
+  }
+  // No ack, or an error ack (e.g. 401: this board isn't paired by device id):
+  // HTTP carries DEVICE_KEY and may still act for the user
+  if (udpStatus) Serial.printf("🎵 %s | UDP: %d, retrying over HTTP\n", actionName, udpStatus);
+
   HTTPClient http;
   http.begin(url);
   http.addHeader("Content-Type", "application/json");
+  if (DEVICE_KEY[0]) http.addHeader("X-Device-Key", DEVICE_KEY);
   
   int httpCode = http.POST("{}");
   
@@ -132,10 +205,10 @@ void callPlayerAPI(const String& url, const char* actionName) {
   http.end();
 }
 
-void playAction()     { callPlayerAPI(API_PLAY, "PLAY"); isPaused = false; }
-void pauseAction()    { callPlayerAPI(API_PAUSE, "PAUSE"); isPaused = true; }
-void nextAction()     { callPlayerAPI(API_NEXT, "NEXT"); }
-void previousAction() { callPlayerAPI(API_PREVIOUS, "PREVIOUS"); }
+void playAction()     { callPlayerAPI(OP_PLAY, API_PLAY, "PLAY"); isPaused = false; }
+void pauseAction()    { callPlayerAPI(OP_PAUSE, API_PAUSE, "PAUSE"); isPaused = true; }
+void nextAction()     { callPlayerAPI(OP_NEXT, API_NEXT, "NEXT"); }
+void previousAction() { callPlayerAPI(OP_PREVIOUS, API_PREVIOUS, "PREVIOUS"); }
 
 // ==================== ULTRASONIC ====================
 float getDistance() {
@@ -180,6 +253,11 @@ void setup() {
   Serial.println("\n✅ WiFi connected!");
   Serial.printf("📍 IP: %s\n", WiFi.localIP().toString().c_str());
 
+  // UDP (acks come back to the same local port); device id from the MAC so boards can share a backend
+  udp.begin(UDP_PORT);
+  deviceId = (uint32_t)ESP.getEfuseMac();
+  Serial.printf("🆔 Device id: %08x\n", deviceId);
+
   // Fetch initial status
   fetchStatus();
 }
@@ -11,10 +11,78 @@ class Config:
     REDIRECT_URI = 'http://127.0.0.1:5000/callback'
     FRONTEND_URI = 'http://localhost:5173'
 
-    # Spotify endpoints...
-    AUTH_URL = 'https://accounts.spotify.com/authorize'
-    TOKEN_URL = 'https://accounts.spotify.com/api/token'
-    API_BASE_URL = 'https://api.spotify.com/v1'
+    # Spotify endpoints (env overrides point them at tools/mock_spotify.py)...
+    AUTH_URL = os.getenv("SPOTIFY_AUTH_URL", 'https://accounts.spotify.com/authorize')
+    TOKEN_URL = os.getenv("SPOTIFY_TOKEN_URL", 'https://accounts.spotify.com/api/token')
+    API_BASE_URL = os.getenv("SPOTIFY_API_BASE_URL", 'https://api.spotify.com/v1')
+
+    # Spotify HTTP client...
+    SPOTIFY_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+    SPOTIFY_MAX_RETRIES = 2  # Extra attempts on 429 / 5xx / network errors
+    SPOTIFY_MAX_RETRY_AFTER = 5  # Longest Retry-After (s) we wait out inside a request
+
+    # Caching...
+    PLAYER_STATE_TTL = 1.0  # Seconds a fetched /api/player/state is served to every caller
+
+    # Local playback model (progress is extrapolated between Spotify syncs)...
+    PLAYBACK_RECONCILE_INTERVAL = 15.0  # Seconds between routine syncs with Spotify
+    PLAYBACK_RECONCILE_FAST_INTERVAL = 2.0  # Sync interval after drift was detected
+    PLAYBACK_DRIFT_TOLERANCE_MS = 1500  # Prediction error that counts as drift
+    PLAYBACK_COMMAND_SETTLE = 0.5  # Seconds to give Spotify after next/previous before syncing
+
+    # Command queue...
+    COMMAND_COALESCE_WINDOW = 0.3  # Seconds in which a repeated play/pause is merged
+    COMMAND_HISTORY = 256  # Finished commands kept for /api/player/commands/<id>
+    COMMAND_WAIT_TIMEOUT = 10  # Max seconds a ?wait=1 command request blocks
+
+    # Aggregated /api/dashboard...
+    DASHBOARD_DEVICES_TTL = 10  # Seconds the device list is reused
+    DASHBOARD_PROFILE_TTL = 300  # Seconds the user profile is reused
+    DASHBOARD_WORKERS = 3  # Threads per user for concurrent Spotify calls (one per Spotify section)
+
+    # ESP32 UDP listener...
+    UDP_HOST = '0.0.0.0'
+    UDP_PORT = int(os.getenv("STARTIFY_UDP_PORT", 5005))  # 0 disables the listener
+    UDP_DEDUPE_TTL = 60  # Seconds a device's last sequence number is remembered
+
+    # IMU tilt classifier (raw MPU6050 samples from the ESP32)...
+    IMU_SAMPLE_RATE = 100  # Hz, default when a batch doesn't say
+    IMU_MAX_RATE = 1000  # Hz, the MPU6050's fastest accelerometer output
+    IMU_SCALE = 16384.0  # LSB per g at the MPU6050's +/-2g range
+    IMU_ENTER_G = 0.80  # Same tilt window as the sketch: 0.80 g ...
+    IMU_MAX_G = 1.05  # ... up to 1.05 g
+    IMU_RELEASE_G = 0.40  # Tilt below this on both axes re-arms the classifier
+    IMU_HOLD_MS = 120  # Tilt must be held this long to count
+    IMU_DEBOUNCE_MS = 500  # Min gap between two gestures of one device
+    IMU_SMOOTHING = 5  # Moving average length (samples)
+    IMU_MAX_SENSITIVITY = 4.0  # Calibration sensitivity must be in (0, this]
+    IMU_MAX_DEVICES = 64  # Devices with classifier state / stored calibration; least recently used go first
+    IMU_CALIBRATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'imu_calibration.json')
+
+    # Token lifecycle...
+    TOKEN_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.spotify_token_cache.json')
+    TOKEN_REFRESH_MARGIN = 300  # Seconds before expiry the access token is refreshed
+
+    # Users (one context per logged in Spotify account)...
+    MAX_USERS = 100  # Logged in users kept; the least recently used one is logged out beyond that
+    USER_IDLE_TIMEOUT = 24 * 3600  # Seconds without a request before a user is logged out
+    USER_SPOTIFY_POOL = 4  # Spotify connections per user
+    SINGLE_USER_FALLBACK = os.getenv("STARTIFY_SINGLE_USER_FALLBACK", "0") == "1"  # Unauthenticated requests / unpaired devices act for the only logged in user
+    DEVICE_KEY = os.getenv("STARTIFY_DEVICE_KEY")  # Which user hosted engines act for (POST /api/session/device-key); unset = the only logged in user
+    SECRET_KEY = os.getenv("STARTIFY_SECRET_KEY")  # Flask session signing; random per start if unset
+
+    # Error events (/api/error)...
+    ERROR_LOG_SIZE = 128  # Events kept; older ones are dropped
+    ERROR_WAIT_TIMEOUT = 20  # Max seconds an /api/error?since= request is held open
+
+    # Metrics...
+    METRICS_TRACE_HISTORY = 256  # Command traces kept for /api/metrics/traces
+
+    # Engines hosted inside the backend (no HTTP loopback); others connect over /api as before...
+    ENGINE_HOSTING = tuple(e.strip() for e in os.getenv("STARTIFY_HOST_ENGINES", "").split(',') if e.strip())  # e.g. "hand,voice"
+    ENGINE_HEALTH_TIMEOUT = 15  # Seconds without a controller call before an engine counts as stalled
+    ENGINE_RESTART_MAX_BACKOFF = 30  # Longest wait (s) before restarting a crashed engine
+    ENGINE_SHOW_WINDOW = os.getenv("STARTIFY_ENGINE_WINDOW", "0") == "1"  # Hand preview window when hosted
 
     SCOPES = ['user-read-playback-state', 'user-modify-playback-state', 'user-read-currently-playing', 'user-read-email', 'user-read-private']
 
@@ -2,13 +2,14 @@ import sys
 import os
 import urllib.parse
 import requests
-from flask import Blueprint, redirect, request, jsonify
+from flask import Blueprint, redirect, request, jsonify, session
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from CONFIG import Config
 from api.utils.u_auth import get_auth_url, get_token
-from api.state import AppState
-from api.utils.u_server import set_error_state, clear_error_state
+from api.utils.u_users import users
+from api.session import current_user
+from api.utils.u_server import set_error_state
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -23,54 +24,52 @@ def login():
 
 @auth_bp.route('/callback')
 def callback():
+    # Nobody is logged in yet on this path, so failures are answered (and logged), not published
     if 'error' in request.args:
-        set_error_state(
-            400,
-            "Authorization Error",
-            "Error returned in callback: " + request.args['error']
-        )
+        print(f"[AUTH] Error returned in callback: {request.args['error']}")
         return jsonify({"error": Config.ERRORS[401]}), 401
-    
-    clear_error_state()
 
     if 'code' in request.args:
         token_data = get_token(request.args['code'])
         
         if 'access_token' not in token_data:
-            set_error_state(
-                400,
-                "Token Retrieval Error",
-                "Failed to retrieve access token: " + str(token_data)
-            ) 
+            print(f"[AUTH] Failed to retrieve access token: {token_data}")
             return jsonify({"error": "Failed to retrieve token", "details": token_data})
         
-        clear_error_state()
-        
-        AppState.CURRENT_TOKEN = token_data['access_token']
+        # New user context: keeps refresh token + expiry too and refreshes before the hour is up
+        ctx = users.login(token_data)
+        session['sid'] = ctx.sid
+        session.permanent = True
 
         params = {
             'access_token': token_data['access_token'],
             'refresh_token': token_data.get('refresh_token'),
             'expires_in': token_data['expires_in']
         }
-        redirect_url = f"{Config.FRONTEND_URI}?{urllib.parse.urlencode(params)}"
+        # The frontend sends the device key back as X-Device-Key (its origin can't share our cookie).
+        # In the fragment, so it never reaches a server log; token.js removes it from history.
+        fragment = urllib.parse.urlencode({'device_key': ctx.device_key})
+        redirect_url = f"{Config.FRONTEND_URI}?{urllib.parse.urlencode(params)}#{fragment}"
         
         return redirect(redirect_url)
             
-    set_error_state(
-        501,
-        "Callback Code Retrieval Error",
-        "No code provided in callback"
-    )
+    print("[AUTH] No code provided in callback")
     return jsonify({"error": "No code provided"})
 
 @auth_bp.route('/internal/token')
 def get_internal_token():
-    if AppState.CURRENT_TOKEN:
-        return jsonify({"token": AppState.CURRENT_TOKEN})
+    # Only for the caller's own user: session cookie or device key, never the single-user fallback
+    ctx = current_user(allow_fallback=False)
+    if not ctx:
+        return jsonify({"error": Config.ERRORS[401]}), 401
+
+    token = ctx.access_token()
+    if token:
+        return jsonify({"token": token})
     set_error_state(
         404,
         "Token Not Found",
-        "No user is currently logged in; CURRENT_TOKEN is None... Error in /internal/token"
+        "Session has no access token... Error in /internal/token",
+        sid=ctx.sid
     )
     return jsonify({"error": "No user logged in"}), 404
\ No newline at end of file
@@ -0,0 +1,101 @@
+from flask import Blueprint, jsonify, request
+from CONFIG import Config
+from api.utils.u_server import errors
+from api.utils.u_state import status_snapshot
+from api.session import current_user
+from api.player import current_playback, fetch_devices
+from api.user import fetch_profile
+
+dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api')
+
+# Devices and profile change rarely; each section keeps its own lifetime in the user's `sections` cache.
+# Spotify calls of one dashboard request run side by side, on the user's own fan-out pool.
+
+def compact_profile(profile):
+    # The header only shows name + avatar
+    return {
+        "id": profile.get('id'),
+        "display_name": profile.get('display_name'),
+        "images": profile.get('images', [])[:1]
+    }
+
+def load_devices(ctx, token):
+    return ctx.sections.get_or_load(
+        ('devices', token),
+        lambda: fetch_devices(ctx, token),
+        ttl=Config.DASHBOARD_DEVICES_TTL,
+        cache_if=lambda entry: entry[1] == 200
+    )
+
+def load_profile(ctx, token):
+    def fetch():
+        payload, status = fetch_profile(ctx, token)
+        return (compact_profile(payload) if status == 200 else payload), status
+
+    return ctx.sections.get_or_load(
+        ('profile', token),
+        fetch,
+        ttl=Config.DASHBOARD_PROFILE_TTL,
+        cache_if=lambda entry: entry[1] == 200
+    )
+
+# section -> loader(ctx, token) -> (payload, status_code)
+SPOTIFY_SECTIONS = {
+    "player": current_playback,
+    "devices": load_devices,
+    "profile": load_profile
+}
+
+LOCAL_SECTIONS = ("status", "error")
+
+@dashboard_bp.route('/dashboard', methods=['GET'])
+def dashboard():
+    """
+    Everything the dashboard shows in one response. ?sections=player,status picks a subset.
+    A failing Spotify section comes back as null with its status code in "failed";
+    the rest of the payload is still served.
+    """
+    requested = request.args.get('sections')
+    if requested:
+        sections = [s for s in requested.split(',') if s in SPOTIFY_SECTIONS or s in LOCAL_SECTIONS]
+    else:
+        sections = list(SPOTIFY_SECTIONS) + list(LOCAL_SECTIONS)
+
+    body = {}
+    failed = {}
+
+    ctx = current_user()
+    spotify_sections = [s for s in sections if s in SPOTIFY_SECTIONS]
+    if spotify_sections:
+        token = ctx.access_token() if ctx else None
+        futures = None
+        if token:
+            try:
+                futures = {s: ctx.fanout.submit(SPOTIFY_SECTIONS[s], ctx, token) for s in spotify_sections}
+            except RuntimeError: # Logged out meanwhile: the user's pool is shut down
+                futures = None
+        if not futures:
+            failed = {s: 401 for s in spotify_sections}
+            body.update({s: None for s in spotify_sections})
+        else:
+            for section, future in futures.items():
+                try:
+                    payload, status = future.result()
+                except Exception as e:
+                    print(f"[DASHBOARD] {section} failed: {e}")
+                    payload, status = None, 500
+                if status == 200:
+                    body[section] = payload
+                else:
+                    body[section] = None
+                    failed[section] = status
+
+    if "status" in sections:
+        body["status"] = status_snapshot()
+    if "error" in sections:
+        body["error"] = errors.current(ctx.sid if ctx else None)
+
+    body["failed"] = failed
+    response = jsonify(body)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response, 200
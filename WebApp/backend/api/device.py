@@ -0,0 +1,64 @@
+from flask import Blueprint, jsonify
+from CONFIG import Config
+from api.player import submit_command
+from api.utils.u_state import load_state, set_module_active
+from api.utils.u_users import users
+from api.utils import u_udp
+
+device_bp = Blueprint('device', __name__, url_prefix='/api/device')
+
+# opcode -> player command
+PLAYER_OPS = {
+    u_udp.OP_PLAY: "play",
+    u_udp.OP_PAUSE: "pause",
+    u_udp.OP_NEXT: "next",
+    u_udp.OP_PREVIOUS: "previous"
+}
+
+# opcode -> (module, active)
+TOGGLE_OPS = {
+    u_udp.OP_VOICE_ON: ("voice", True),
+    u_udp.OP_VOICE_OFF: ("voice", False),
+    u_udp.OP_HAND_ON: ("hand", True),
+    u_udp.OP_HAND_OFF: ("hand", False)
+}
+
+listener = None
+
+def handle_device_event(opcode, device_id):
+    """
+    Same effect as the HTTP routes: player opcodes go into the command queue,
+    toggles into the state store. Returns (status, voice_active, hand_active) for the ack.
+    """
+    status = 200
+    if opcode in PLAYER_OPS:
+        # Acts for the user the device was paired with (POST /api/session/devices)
+        device = f"{device_id:08x}"
+        ctx = users.for_device(device) or (users.only() if Config.SINGLE_USER_FALLBACK else None)
+        status = 202 if submit_command(ctx, PLAYER_OPS[opcode], f"udp:{device}") else 401
+    elif opcode in TOGGLE_OPS:
+        set_module_active(*TOGGLE_OPS[opcode])
+    elif opcode != u_udp.OP_STATUS:
+        status = 400
+
+    state = load_state()
+    return status, state['voice_active'], state['hand_active']
+
+def start_udp_listener():
+    """Starts the ESP32 datagram listener next to the HTTP server (no-op if UDP_PORT is unset)."""
+    global listener
+    if listener or not Config.UDP_PORT:
+        return listener
+    try:
+        listener = u_udp.DeviceListener(handle_device_event, Config.UDP_HOST, Config.UDP_PORT, Config.UDP_DEDUPE_TTL).start()
+        print(f"📡 [UDP] Listening for devices on {Config.UDP_HOST}:{listener.port}")
+    except OSError as e:
+        print(f"[UDP] Could not bind {Config.UDP_HOST}:{Config.UDP_PORT} ({e}); devices must use HTTP")
+        listener = None
+    return listener
+
+@device_bp.route('/stats', methods=['GET'])
+def device_stats():
+    if not listener:
+        return jsonify({"error": "UDP listener not running"}), 404
+    return jsonify(listener.stats()), 200
@@ -0,0 +1,241 @@
+import atexit
+import importlib
+import os
+import sys
+import threading
+import time
+from flask import Blueprint, jsonify
+from CONFIG import Config
+from api.player import submit_command
+from api.utils.u_metrics import record_engine_report
+from api.utils.u_state import load_state, get_version, wait_for_change, set_engine_status
+from api.utils.u_users import users
+
+# The engine scripts import each other flat (from controller import ...)
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'engine')
+if ENGINE_DIR not in sys.path:
+    sys.path.append(ENGINE_DIR)
+
+STABLE_RUN = 60  # Seconds of uptime after which the restart backoff starts over
+
+engines_bp = Blueprint('engines', __name__, url_prefix='/api/engines')
+
+class LocalController:
+    """
+    Drop-in for engine/controller.SystemController when an engine runs inside the
+    backend: commands go straight into the command queue and status is read from
+    the state store, with no HTTP round trip. Every call doubles as a heartbeat.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.source = f"engine:{name}"
+        self.voice_active = False
+        self.hand_active = False
+        self.status_version = None
+        self.last_seen = time.monotonic()
+        self.sent = 0
+        self.failed = 0
+
+    def beat(self):
+        self.last_seen = time.monotonic()
+
+    def sync_system_status(self):
+        self.beat()
+        state = load_state()
+        self.status_version = get_version()
+        self.voice_active = state['voice_active']
+        self.hand_active = state['hand_active']
+        return self.voice_active, self.hand_active
+
+    def subscribe(self):
+        pass # The state store already wakes wait_for_status_change()
+
+    def wait_for_status_change(self, timeout):
+        self.beat()
+        since = self.status_version if self.status_version is not None else get_version()
+        wait_for_change(since, timeout)
+        self.beat()
+
+    def set_engine_status(self, module_name, is_ready):
+        self.beat()
+        set_engine_status(module_name, is_ready)
+        print(f"📡 [ENGINE] {module_name} is {'ONLINE' if is_ready else 'OFFLINE'}")
+
+    def user(self):
+        """
+        The user hosted engines act for: STARTIFY_DEVICE_KEY, else the single logged in user.
+        (No SINGLE_USER_FALLBACK check: these engines run inside the backend, there is no caller to trust.)
+        """
+        if Config.DEVICE_KEY:
+            return users.for_key(Config.DEVICE_KEY)
+        return users.only()
+
+    def send_command(self, command, origin=None):
+        self.beat()
+        # origin is wall-clock (as from the camera / mic); the command queue works in monotonic time
+        origin = time.monotonic() - max(0.0, time.time() - origin) if origin else None
+        if submit_command(self.user(), command, self.source, origin=origin):
+            self.sent += 1
+            print(f"[ENGINE] Queued: {command.upper()}")
+        else:
+            self.failed += 1
+
+    def flush(self, timeout=None):
+        return True # Nothing is buffered on this side of the command queue
+
+    def close(self, timeout=2.0):
+        pass
+
+    def report_metrics(self, engine, snapshot):
+        self.beat()
+        record_engine_report(engine, {**snapshot, "delivery": {"sent": self.sent, "failed": self.failed}})
+
+    def report(self):
+        return f"📡 [ENGINE] {self.name}: sent {self.sent}, failed {self.failed} (in-process)"
+
+    # --- Shortcuts ---
+    def play(self, origin=None): self.send_command('play', origin)
+    def pause(self, origin=None): self.send_command('pause', origin)
+    def next(self, origin=None): self.send_command('next', origin)
+    def previous(self, origin=None): self.send_command('previous', origin)
+
+class EngineSupervisor:
+    """
+    Runs one engine's main(controller=..., stop_event=...) on a worker thread and
+    restarts it with exponential backoff whenever it returns or raises on its own.
+    A missing dependency (ImportError) is not retried.
+    """
+    def __init__(self, name, load_target, health_timeout=Config.ENGINE_HEALTH_TIMEOUT,
+                 max_backoff=Config.ENGINE_RESTART_MAX_BACKOFF):
+        self.name = name
+        self.load_target = load_target
+        self.health_timeout = health_timeout
+        self.max_backoff = max_backoff
+        self.controller = None
+        self.state = "stopped"
+        self.starts = 0
+        self.last_error = None
+        self.started_at = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"engine-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            self.controller = LocalController(self.name)
+            self.state = "starting" if not self.starts else "restarting"
+            self.started_at = time.monotonic()
+            self.starts += 1
+            try:
+                target = self.load_target()
+                self.state = "running"
+                target(controller=self.controller, stop_event=self._stop)
+                self.last_error = None if self._stop.is_set() else "exited"
+            except ImportError as e:
+                self.last_error = f"missing dependency: {e}"
+                self.state = "failed"
+                print(f"❌ [ENGINE] {self.name} cannot run here ({e})")
+                return
+            except Exception as e:
+                self.last_error = repr(e)
+            finally:
+                set_engine_status(self.name, False) # In case it died before saying so
+
+            if self._stop.is_set():
+                break
+            if time.monotonic() - self.started_at > STABLE_RUN:
+                backoff = 1
+            self.state = "restarting"
+            print(f"⚠️ [ENGINE] {self.name} stopped ({self.last_error}), restarting in {backoff}s")
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+        self.state = "stopped"
+
+    def check(self):
+        """Marks a running engine stalled (and not ready) when it stopped calling its controller."""
+        if self.state not in ("running", "stalled") or not self.controller:
+            return
+        silent = time.monotonic() - self.controller.last_seen
+        if silent > self.health_timeout and self.state == "running":
+            self.state = "stalled"
+            set_engine_status(self.name, False)
+            print(f"⚠️ [ENGINE] {self.name} silent for {silent:.0f}s")
+        elif silent <= self.health_timeout and self.state == "stalled":
+            self.state = "running"
+            set_engine_status(self.name, True)
+
+    def health(self):
+        controller = self.controller
+        return {
+            "state": self.state,
+            "starts": self.starts,
+            "last_error": self.last_error,
+            "uptime": round(time.monotonic() - self.started_at, 1) if self.started_at and self.state in ("running", "stalled") else 0,
+            "last_seen": round(time.monotonic() - controller.last_seen, 1) if controller else None,
+            "sent": controller.sent if controller else 0,
+            "failed": controller.failed if controller else 0
+        }
+
+# --- Engines the backend can host ---
+def load_hand():
+    hand_tracking = importlib.import_module("hand_tracking")
+    return lambda **kwargs: hand_tracking.main(show_window=Config.ENGINE_SHOW_WINDOW, **kwargs)
+
+def load_voice():
+    return importlib.import_module("voice_control").main
+
+ENGINES = {
+    "hand": load_hand,
+    "voice": load_voice
+}
+
+supervisors = {}
+watchdog = None
+
+def watch_engines():
+    while True:
+        time.sleep(Config.ENGINE_HEALTH_TIMEOUT / 3)
+        for supervisor in list(supervisors.values()):
+            supervisor.check()
+
+def start_engines(names=Config.ENGINE_HOSTING):
+    """Starts the configured engines in-process. Remote engines keep using the HTTP API."""
+    global watchdog
+    for name in names:
+        if name not in ENGINES:
+            print(f"[ENGINE] Unknown engine '{name}', skipped")
+            continue
+        if name not in supervisors:
+            supervisors[name] = EngineSupervisor(name, ENGINES[name]).start()
+            print(f"🚀 [ENGINE] Hosting {name} in-process")
+
+    if supervisors and not watchdog:
+        watchdog = threading.Thread(target=watch_engines, name="engine-watchdog", daemon=True)
+        watchdog.start()
+    return supervisors
+
+def stop_engines():
+    """Lets hosted engines release the camera / mic and report themselves offline."""
+    for supervisor in supervisors.values():
+        supervisor.stop()
+
+atexit.register(stop_engines)
+
+@engines_bp.route('', methods=['GET'])
+def engines_health():
+    return jsonify({name: s.health() for name, s in supervisors.items()}), 200
@@ -0,0 +1,93 @@
+import numpy as np
+from flask import Blueprint, jsonify, request
+from CONFIG import Config
+from api.player import submit_command
+from api.session import current_user
+from api.utils.u_users import users
+from api.utils.u_imu import ImuClassifier, check_rate
+
+imu_bp = Blueprint('imu', __name__, url_prefix='/api/imu')
+
+# One classifier for all devices; state is kept per device id
+classifier = ImuClassifier()
+
+def normalize_device_id(device_id):
+    # Same form as POST /api/session/devices stores, so pairing, gesture state and calibration agree
+    return device_id.strip().lower()[:32]
+
+def read_samples():
+    """
+    Raw accelerometer samples from the request, as an (N,3) array.
+    - application/octet-stream: little endian int16 ax,ay,az triples;
+      t0 (ms) and rate (Hz) as query parameters.
+    - JSON: {"t0": ms, "rate": Hz, "samples": [[ax, ay, az], ...]}
+    Returns (samples, t0, rate) or raises ValueError.
+    """
+    if request.mimetype == 'application/octet-stream':
+        body = request.get_data()
+        if len(body) % 6:
+            raise ValueError("Body must be int16 ax,ay,az triples")
+        samples = np.frombuffer(body, dtype='<i2').reshape(-1, 3)
+        args = request.args
+        return samples, args.get('t0', type=float), check_rate(args.get('rate', Config.IMU_SAMPLE_RATE))
+
+    data = request.get_json(silent=True)
+    if not data or 'samples' not in data:
+        raise ValueError("Missing samples")
+    samples = np.asarray(data['samples'], dtype=np.float32)
+    if samples.ndim != 2 or samples.shape[1] != 3:
+        raise ValueError("samples must be a list of [ax, ay, az]")
+    return samples, data.get('t0'), check_rate(data.get('rate', Config.IMU_SAMPLE_RATE))
+
+@imu_bp.route('/<device_id>/samples', methods=['POST'])
+def ingest_samples(device_id):
+    device_id = normalize_device_id(device_id)
+
+    # Device key / session first, then the user the device was paired with.
+    # Resolved before classifying: unknown devices get no classifier state.
+    ctx = current_user(allow_fallback=False) or users.for_device(device_id)
+    if not ctx and Config.SINGLE_USER_FALLBACK:
+        ctx = users.only()
+    if not ctx:
+        return jsonify({"error": "No User Logged In"}), 401
+
+    try:
+        samples, t0, rate = read_samples()
+    except ValueError as e:
+        return jsonify({"error": f"Bad Request: {e}"}), 400
+
+    gestures = classifier.process(device_id, samples, t0, rate)
+
+    queued = []
+    for command, t_ms in gestures:
+        cmd = submit_command(ctx, command, f"imu:{device_id}")
+        queued.append({"command": command, "t_ms": t_ms, "id": cmd.id if cmd else None})
+
+    return jsonify({"samples": len(samples), "gestures": queued}), 200
+
+@imu_bp.route('/<device_id>/calibrate', methods=['POST'])
+def calibrate(device_id):
+    """
+    Samples recorded with the device lying still; optional "sensitivity" (1.0 = default tilt).
+    Needs a session or device key; a device paired with another user can't be recalibrated.
+    """
+    device_id = normalize_device_id(device_id)
+    ctx = current_user(allow_fallback=False)
+    if not ctx:
+        return jsonify({"error": "No User Logged In"}), 401
+    owner = users.for_device(device_id)
+    if owner and owner is not ctx:
+        return jsonify({"error": "Forbidden: Device is paired with another user"}), 403
+
+    try:
+        samples, _, _ = read_samples()
+        data = request.get_json(silent=True) or {}
+        sensitivity = data.get('sensitivity', request.args.get('sensitivity', type=float))
+        entry = classifier.calibrate(device_id, samples, sensitivity)
+    except ValueError as e:
+        return jsonify({"error": f"Bad Request: {e}"}), 400
+    return jsonify({"device": device_id, **entry}), 200
+
+@imu_bp.route('/stats', methods=['GET'])
+def imu_stats():
+    return jsonify(classifier.stats()), 200
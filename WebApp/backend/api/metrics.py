@@ -0,0 +1,125 @@
+import time
+from flask import Blueprint, Response, g, jsonify, request
+from api.engines import ENGINES
+from api.player import command_queue
+from api.session import current_user
+from api.utils.u_metrics import registry, traces, engine_reports, record_engine_report
+from api.utils.u_state import load_state
+from api.utils.u_users import users
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api')
+
+# Bounds on what an engine report may add to the label set
+MAX_REPORT_KEYS = 32  # Top-level numbers, stages and delivery counters (each)
+MAX_KEY_LENGTH = 48
+
+http_latency = registry.histogram(
+    "startify_http_request_duration_seconds", "Flask request latency per route", ("method", "route", "status"))
+
+def instrument(app):
+    """Times every request by route template (not raw path, so ids don't explode the label set)."""
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            http_latency.observe(time.perf_counter() - start, request.method, route, str(response.status_code))
+        trace_id = request.headers.get('X-Correlation-Id')
+        if trace_id:
+            response.headers['X-Correlation-Id'] = trace_id[:64]
+        return response
+
+# --- Values read at scrape time ---
+def collect_commands():
+    stats = command_queue.stats()
+    return [((key,), value) for key, value in stats.items()]
+
+def collect_cache():
+    # Summed over every user's cache
+    stats = users.stats()
+    return [((key[len("state_cache_"):],), value) for key, value in stats.items() if key.startswith("state_cache_")]
+
+def collect_users():
+    stats = users.stats()
+    return [(("active",), stats["users"]), (("evicted",), stats["evicted"])]
+
+def collect_state():
+    return [((key,), int(value)) for key, value in load_state().items()]
+
+def collect_engine_values():
+    """Flat numbers of each engine's last report (fps, drops, delivery counters...)."""
+    now = time.monotonic()
+    for engine, (received, snapshot) in list(engine_reports.items()):
+        yield (engine, "report_age_seconds"), round(now - received, 1)
+        for key, value in snapshot.items():
+            if isinstance(value, (int, float)):
+                yield (engine, key), value
+            elif key == "delivery" and isinstance(value, dict):
+                for name, count in value.items():
+                    if isinstance(count, (int, float)):
+                        yield (engine, f"delivery_{name}"), count
+
+def collect_engine_stages():
+    for engine, (_, snapshot) in list(engine_reports.items()):
+        for stage, s in (snapshot.get("stages") or {}).items():
+            for stat in ("avg_ms", "max_ms", "last_ms"):
+                if stat in s:
+                    yield (engine, stage, stat[:-3]), s[stat] / 1000.0
+
+def collect_engine_stage_counts():
+    for engine, (_, snapshot) in list(engine_reports.items()):
+        for stage, s in (snapshot.get("stages") or {}).items():
+            yield (engine, stage), s.get("count", 0)
+
+registry.gauges("startify_command_queue", "Command queue counters (executed, coalesced, pending)", ("stat",), collect_commands)
+registry.gauges("startify_player_state_cache", "Playback state cache counters (all users)", ("stat",), collect_cache)
+registry.gauges("startify_users", "Logged in user contexts (active) and evictions so far", ("stat",), collect_users)
+registry.gauges("startify_system_state", "Module flags from the state store (1 = on)", ("key",), collect_state)
+registry.gauges("startify_engine_value", "Latest numbers reported by each engine", ("engine", "stat"), collect_engine_values)
+registry.gauges("startify_engine_stage_seconds", "Engine stage timings from the latest report", ("engine", "stage", "stat"), collect_engine_stages)
+registry.gauges("startify_engine_stage_count", "Samples behind each engine stage timing", ("engine", "stage"), collect_engine_stage_counts)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+@metrics_bp.route('/metrics/traces', methods=['GET'])
+def recent_traces():
+    """The calling user's latest command traces, newest first: per-stage ms and every Spotify attempt."""
+    ctx = current_user()
+    if not ctx:
+        return jsonify({"error": "No User Logged In"}), 401
+    limit = min(request.args.get('limit', 50, type=int), traces.size)
+    return jsonify(traces.recent(ctx.sid, limit)), 200
+
+def clean_report(metrics):
+    """Only the shapes collect_engine_* read, with bounded key counts and lengths."""
+    def numbers(d):
+        items = [(str(k)[:MAX_KEY_LENGTH], v) for k, v in d.items()
+                 if isinstance(v, (int, float)) and not isinstance(v, bool)]
+        return dict(items[:MAX_REPORT_KEYS])
+
+    report = numbers(metrics)
+    if isinstance(metrics.get('delivery'), dict):
+        report['delivery'] = numbers(metrics['delivery'])
+    if isinstance(metrics.get('stages'), dict):
+        stages = [(name, s) for name, s in metrics['stages'].items() if isinstance(s, dict)]
+        report['stages'] = {str(name)[:MAX_KEY_LENGTH]: numbers(s) for name, s in stages[:MAX_REPORT_KEYS]}
+    return report
+
+@metrics_bp.route('/engine/metrics', methods=['POST'])
+def engine_metrics():
+    # Engines authenticate with the device key (STARTIFY_DEVICE_KEY)
+    if not current_user(allow_fallback=False):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.get_json(silent=True)
+    if not data or data.get('engine') not in ENGINES or not isinstance(data.get('metrics'), dict):
+        return jsonify({"error": "Bad Request"}), 400
+
+    record_engine_report(data['engine'], clean_report(data['metrics']))
+    return jsonify({"status": "acknowledged"}), 200
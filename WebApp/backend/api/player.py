@@ -1,33 +1,74 @@
-from flask import Blueprint, jsonify
-from api.state import AppState
+import hashlib
+import json
+import uuid
+from flask import Blueprint, Response, jsonify, request
+from CONFIG import Config
+from api.utils.u_commands import CommandQueue
+from api.utils.u_metrics import registry, traces, monotonic_origin
 from api.utils.u_player import play_playback, pause_playback, skip_next, skip_previous, get_playback_state, get_devices
 from api.utils.u_server import set_error_state, clear_error_state # <--- ERROR UTILS
+from api.utils.u_users import users
+from api.session import current_user
 
 player_bp = Blueprint('player', __name__, url_prefix='/api/player')
 
-def get_token_or_set_error(action_name):
-    if not AppState.CURRENT_TOKEN:
+# Playback model + state cache live on each UserContext: one upstream fetch per TTL
+# per user, no matter how many dashboards are polling, and no cross-talk between users
+
+def get_user_or_set_error(action_name):
+    """(UserContext, token, None) for this request, or (None, None, error_response)."""
+    ctx = current_user()
+    token = ctx.access_token() if ctx else None
+    if not token:
         msg = f"Failed to {action_name}: User not logged in."
-        set_error_state(
-            401, 
-            msg, 
-            f"AppState.CURRENT_TOKEN is None. Action: {action_name}"
-        )
-        return None, (jsonify({"error": msg}), 401)
+        if ctx:
+            # Without a user there is nobody to show it to; the 401 says it all
+            set_error_state(
+                401, 
+                msg, 
+                f"Session has no access token. Action: {action_name}",
+                sid=ctx.sid
+            )
+        return None, None, (jsonify({"error": msg}), 401)
     
-    return AppState.CURRENT_TOKEN, None
+    return ctx, token, None
 
-# --- GENERIC HANDLER ---
-def handle_spotify_request(action_func, action_name):
-    token, error_response = get_token_or_set_error(action_name)
-    if error_response:
-        return error_response
+# --- COMMANDS ---
+# command -> (Spotify call, description used in messages)
+COMMANDS = {
+    "play": (play_playback, "resume playback"),
+    "pause": (pause_playback, "pause playback"),
+    "next": (skip_next, "skip to next track"),
+    "previous": (skip_previous, "skip to previous track")
+}
 
-    res = action_func(token)
+def execute_command(sid, command):
+    """
+    Runs one command against Spotify for the user `sid`. Returns (http_status, body).
+    Called from the command queue's executor thread, so no Flask request context here.
+    The token is looked up at run time: it may have been refreshed while the command waited.
+    """
+    action_func, action_name = COMMANDS[command]
+    ctx = users.get(sid, touch=False)
+    token = ctx.access_token() if ctx else None
+    if not token:
+        return 401, {"error": f"Failed to {action_name}: User logged out"}
+    res = ctx.call(action_func, token)
+
+    # Whatever happened, the cached playback state may be wrong now. The cache is this
+    # user's alone: drop every key, call() may have refreshed the token it's stored under
+    ctx.state_cache.invalidate()
 
     if res.status_code in [200, 201, 204]:
-        clear_error_state()
-        return jsonify({"status": "success", "action": action_name}), 200
+        clear_error_state(sid)
+
+        # Spotify accepted it: update the local model instead of waiting for a poll
+        body = {"status": "success", "action": action_name}
+        ctx.playback.apply(command)
+        state = ctx.playback.snapshot()
+        if state:
+            body["is_playing"] = state["is_playing"]
+        return 200, body
     
     # 4. Handle Spotify API Errors
     try:
@@ -38,48 +79,144 @@ def handle_spotify_request(action_func, action_name):
     set_error_state(
         res.status_code, 
         f"Spotify Error: Failed to {action_name}", 
-        f"Status: {res.status_code}\nResponse: {str(details)}"
+        f"Status: {res.status_code}\nResponse: {str(details)}",
+        sid=sid
     )
     
-    return jsonify({"error": "Spotify API Error", "details": details}), res.status_code
+    return res.status_code, {"error": "Spotify API Error", "details": details}
+
+# --- COMMAND METRICS ---
+# client = detection -> backend (engine queue + network), queue = waiting for the executor,
+# run = Spotify call(s) incl. retries; total = detection -> Spotify answered
+command_stages = registry.histogram(
+    "startify_command_stage_seconds", "Player command latency per stage (client, queue, run)", ("stage",))
+command_latency = registry.histogram(
+    "startify_command_latency_seconds", "Gesture / button to Spotify response per source", ("source", "command"))
+command_results = registry.counter(
+    "startify_commands_total", "Executed player commands", ("source", "command", "status"))
+
+def source_label(source):
+    """engine:hand -> hand, udp:<id> -> udp, imu:<id> -> imu, anything else (an address) -> http."""
+    kind, _, rest = (source or "").partition(":")
+    if kind == "engine":
+        return rest
+    return kind if kind in ("udp", "imu") else "http"
+
+def record_command(cmd):
+    """Runs on the executor thread once a command got its Spotify answer."""
+    source = source_label(cmd.source)
+    command_stages.observe(cmd.created - cmd.origin, "client")
+    command_stages.observe(cmd.started - cmd.created, "queue")
+    command_stages.observe(cmd.finished - cmd.started, "run")
+    command_latency.observe(cmd.finished - cmd.origin, source, cmd.command)
+    command_results.inc(source, cmd.command, cmd.status)
+
+    timings = cmd.as_dict()
+    traces.update(cmd.trace_id, status=cmd.status, http_status=cmd.http_status,
+                  **{k: timings[k] for k in ("client_ms", "queued_ms", "run_ms", "total_ms")})
+    for follower in cmd.followers:
+        traces.update(follower.trace_id, status="coalesced", merged_into=cmd.id)
+
+# Every source (hand, voice, ESP32, UI) goes through here, in order, per user
+command_queue = CommandQueue(execute_command, on_finish=record_command)
+users.on_evict.append(command_queue.forget)
+
+def queue_command(ctx, command, source, trace_id=None, origin=None):
+    """Submits to the command queue under a correlation id (the caller's, or a new one)."""
+    trace_id = trace_id or uuid.uuid4().hex[:12]
+    traces.start(trace_id, sid=ctx.sid, command=command, source=source, status="queued")
+    # Keyed by login session, not token, so a refresh doesn't split the queue
+    cmd = command_queue.submit(ctx.sid, command, source, trace_id, origin)
+    if cmd.status == "coalesced":
+        traces.update(trace_id, command_id=cmd.id, status="coalesced", merged_into=cmd.merged_into)
+    else:
+        traces.update(trace_id, command_id=cmd.id)
+    return cmd
+
+def submit_command(ctx, command, source, trace_id=None, origin=None):
+    """
+    Queues a command from outside an HTTP request (UDP device, IMU stream, hosted engine)
+    for the already resolved user `ctx`. origin: time.monotonic() of the detection, if known.
+    Returns the queued Command, or None if there is no (logged in) user.
+    """
+    if not ctx:
+        print(f"[COMMANDS] {command} from {source} dropped: no user (pair the device or set its device key)")
+        return None
+    if not ctx.access_token():
+        set_error_state(
+            401,
+            f"Failed to {COMMANDS[command][1]}: User not logged in.",
+            f"Command from {source}, but the session has no access token",
+            sid=ctx.sid
+        )
+        return None
+    return queue_command(ctx, command, source, trace_id, origin)
+
+# --- GENERIC HANDLER ---
+def handle_spotify_request(command):
+    """
+    Queues the command and answers 202 with its id right away.
+    ?wait=1 blocks until it ran and returns the Spotify outcome (the old synchronous behaviour).
+    """
+    action_name = COMMANDS[command][1]
+    ctx, _, error_response = get_user_or_set_error(action_name)
+    if error_response:
+        return error_response
+
+    source = request.headers.get('X-Command-Source', request.remote_addr)
+    # Engines send their correlation id and how long ago the gesture was detected
+    trace_id = request.headers.get('X-Correlation-Id', '')[:64] or None
+    origin = monotonic_origin(request.headers.get('X-Trace-Age-Ms'))
+    cmd = queue_command(ctx, command, source, trace_id, origin)
+
+    if request.args.get('wait', type=int) and cmd.wait(Config.COMMAND_WAIT_TIMEOUT):
+        return jsonify(cmd.result), cmd.http_status
+
+    return jsonify({"status": cmd.status, "id": cmd.id, "trace_id": cmd.trace_id, "action": action_name}), 202
 
 
 # --- ROUTES ---
 
 @player_bp.route('/play', methods=['POST'])
 def play():
-    return handle_spotify_request(play_playback, "resume playback")
+    return handle_spotify_request("play")
 
 @player_bp.route('/pause', methods=['POST'])
 def pause():
-    return handle_spotify_request(pause_playback, "pause playback")
+    return handle_spotify_request("pause")
 
 @player_bp.route('/next', methods=['POST'])
 def next_track():
-    return handle_spotify_request(skip_next, "skip to next track")
+    return handle_spotify_request("next")
 
 @player_bp.route('/previous', methods=['POST'])
 def prev_track():
-    return handle_spotify_request(skip_previous, "skip to previous track")
+    return handle_spotify_request("previous")
 
-@player_bp.route('/state', methods=['GET'])
-def current_state():
-    token, error_json = get_token_or_set_error("fetch state")
-    if error_json: return error_json
+@player_bp.route('/commands/<command_id>', methods=['GET'])
+def command_status(command_id):
+    ctx = current_user()
+    cmd = command_queue.get(command_id)
+    # Ids of other users' commands are not revealed
+    if not cmd or not ctx or cmd.key != ctx.sid:
+        return jsonify({"error": "Unknown command id"}), 404
+    return jsonify(cmd.as_dict()), 200
 
-    res = get_playback_state(token)
+def fetch_state(ctx, token):
+    """Fetches + trims the playback state from Spotify. Returns (payload, status_code)."""
+    res = ctx.call(get_playback_state, token)
 
     if res.status_code == 204:
-        return jsonify(None), 200
+        return None, 200
 
     if res.status_code != 200:
-        return jsonify({"error": "Failed to fetch state"}), res.status_code
+        return {"error": "Failed to fetch state"}, res.status_code
 
     data = res.json()
 
     # Ads or No Track Playing
     if not data.get('item'):
-        return jsonify(None), 200
+        return None, 200
 
     track = data['item']
     
@@ -100,18 +237,75 @@ def current_state():
         }
     }
 
-    return jsonify(response_payload), 200
+    return response_payload, 200
 
+def sync_state(ctx, token):
+    """fetch_state() + feed the result into the user's model (runs once per single-flight)."""
+    payload, status = fetch_state(ctx, token)
+    if status == 200:
+        ctx.playback.reconcile(payload)
+    return payload, status
 
-@player_bp.route('/devices', methods=['GET'])
-def list_devices():
-    token, error_json = get_token_or_set_error("fetch state")
+def current_playback(ctx, token):
+    """
+    Playback state from the user's local model, syncing with Spotify first if the model needs it.
+    Returns (payload, status_code). Safe to call outside a request (dashboard fan-out).
+    """
+    if ctx.playback.needs_reconcile():
+        payload, status = ctx.state_cache.get_or_load(
+            token,
+            lambda: sync_state(ctx, token),
+            cache_if=lambda entry: entry[1] == 200
+        )
+        if status != 200:
+            return payload, status
+
+    # Served locally; progress_ms is extrapolated from the last sync
+    return ctx.playback.snapshot(), 200
+
+def state_etag(ctx, payload):
+    """
+    ETag of the model state, leaving out the extrapolated progress_ms (it changes on
+    every call): the state without it + the model version, which moves on every sync
+    and command. A 304 therefore means "nothing changed but the clock".
+    """
+    stable = {k: v for k, v in payload.items() if k != 'progress_ms'} if payload else None
+    basis = json.dumps([stable, ctx.playback.version], separators=(',', ':'), sort_keys=True)
+    return hashlib.sha1(basis.encode()).hexdigest()[:20]
+
+@player_bp.route('/state', methods=['GET'])
+def current_state():
+    ctx, token, error_json = get_user_or_set_error("fetch state")
     if error_json: return error_json
 
-    res = get_devices(token)
-    
-    data = res.json()
+    payload, status = current_playback(ctx, token)
+    if status != 200:
+        return jsonify(payload), status
+
+    etag = state_etag(ctx, payload)
+
+    # Dashboards revalidate with If-None-Match; unchanged state costs a bodyless 304
+    # (they keep extrapolating progress_ms from the body they already have)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(json.dumps(payload, separators=(',', ':')), mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 
+def fetch_devices(ctx, token):
+    """Returns (devices, status_code)."""
+    res = ctx.call(get_devices, token)
     if res.status_code != 200:
-        return jsonify({"error": "Failed to fetch devices"}), res.status_code
-    return jsonify(data['devices']), 200
\ No newline at end of file
+        return {"error": "Failed to fetch devices"}, res.status_code
+    return res.json()['devices'], 200
+
+@player_bp.route('/devices', methods=['GET'])
+def list_devices():
+    ctx, token, error_json = get_user_or_set_error("fetch devices")
+    if error_json: return error_json
+
+    payload, status = fetch_devices(ctx, token)
+    return jsonify(payload), status
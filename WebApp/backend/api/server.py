@@ -8,33 +8,78 @@ from flask_cors import CORS
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from CONFIG import Config
-from api.state import AppState
-from api.utils.u_server import set_error_state, clear_error_state
-from api.utils.u_state import load_state, set_engine_status, update_key
+from api.utils.u_server import errors
+from api.utils.u_spotify import spotify
+from api.utils.u_state import load_state, status_snapshot, set_engine_status, set_module_active, wait_for_change
+
+WATCH_TIMEOUT = 25 # Max seconds a /status/watch request is held open
 
 app = Flask(__name__)
-app.secret_key = os.urandom(24)
-CORS(app)
+# A fixed key keeps browser sessions valid across restarts (user contexts are persisted too)
+app.secret_key = Config.SECRET_KEY or os.urandom(24)
+app.permanent_session_lifetime = Config.USER_IDLE_TIMEOUT
+app.config['SESSION_COOKIE_SAMESITE'] = 'Lax' # No session cookie on other sites' POSTs
+# Only our frontend may read answers; it authenticates with X-Device-Key, not cookies
+CORS(app, origins=[Config.FRONTEND_URI])
 
 # Tell flask that these blueprints exist
 from api.auth import auth_bp
 app.register_blueprint(auth_bp)
 
+from api.session import session_bp, current_user
+app.register_blueprint(session_bp)
+
 from api.player import player_bp
 app.register_blueprint(player_bp)
 
 from api.user import user_bp
 app.register_blueprint(user_bp)
 
+from api.dashboard import dashboard_bp
+app.register_blueprint(dashboard_bp)
+
+from api.device import device_bp, start_udp_listener
+app.register_blueprint(device_bp)
+
+from api.imu import imu_bp
+app.register_blueprint(imu_bp)
+
+from api.engines import engines_bp, start_engines
+app.register_blueprint(engines_bp)
+
+from api.metrics import metrics_bp, instrument
+app.register_blueprint(metrics_bp)
+instrument(app)
+
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 @api_bp.route('/error', methods=['GET'])
 def get_error_state():
-    return jsonify({
-        "code": AppState.ERROR_STATE['code'],
-        "message": AppState.ERROR_STATE['message'],
-        "dev_info": AppState.ERROR_STATE['dev_info']
-    })
+    """
+    Without ?since: the current error (code/message/dev_info, all null if none) and its seq.
+    /api/error?since=<seq>&timeout=<seconds>: only the events after seq, held open until
+    one arrives or the timeout passes. Clients pass the returned "seq" as the next since.
+    Callers see the system's errors plus their own user's, never another user's.
+    """
+    ctx = current_user()
+    sid = ctx.sid if ctx else None
+    since = request.args.get('since', type=int)
+    if since is None:
+        current = errors.current(sid) or {}
+        return jsonify({
+            "code": current.get('code'),
+            "message": current.get('message'),
+            "dev_info": current.get('dev_info'),
+            "seq": errors.seq
+        })
+
+    timeout = min(request.args.get('timeout', Config.ERROR_WAIT_TIMEOUT, type=float), Config.ERROR_WAIT_TIMEOUT)
+    return jsonify(errors.since(since, sid, max(0.0, timeout)))
+
+@api_bp.route('/spotify/stats', methods=['GET'])
+def spotify_stats():
+    # Per-endpoint latency + status counts of the shared Spotify client
+    return jsonify(spotify.stats())
 
 @api_bp.route('/engine/status', methods=['POST'])
 def engine_status():
@@ -48,7 +93,22 @@ def engine_status():
 
 @api_bp.route('/status', methods=['GET'])
 def get_status():
-    return jsonify(load_state())
+    return jsonify(status_snapshot())
+
+@api_bp.route('/status/watch', methods=['GET'])
+def watch_status():
+    """
+    Long-poll: /api/status/watch?since=<version>&timeout=<seconds>
+    Returns as soon as the state version differs from `since`, or after the timeout
+    with the unchanged state. Clients loop on it instead of polling /status.
+    """
+    since = request.args.get('since', type=int)
+    timeout = min(request.args.get('timeout', WATCH_TIMEOUT, type=float), WATCH_TIMEOUT)
+
+    if since is not None:
+        wait_for_change(since, timeout)
+
+    return jsonify(status_snapshot())
 
 @api_bp.route('/toggle', methods=['POST'])
 def toggle_state():
@@ -58,16 +118,7 @@ def toggle_state():
     if not data or 'module' not in data or 'active' not in data:
         return jsonify({"error": "Bad Request: Missing module or active state"}), 400
 
-    key_map = {
-        "voice": "voice_active",
-        "hand": "hand_active"
-    }
-    
-    target_key = key_map.get(data['module'])
-    
-    if target_key:
-        update_key(target_key, data['active'])
-
+    if set_module_active(data['module'], data['active']):
         new_state = load_state()
         return jsonify({
             "status": "success", 
@@ -80,4 +131,8 @@ def toggle_state():
 app.register_blueprint(api_bp)
 
 if __name__ == '__main__':
+    # With the debug reloader only the serving child process binds the UDP port and hosts engines
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_udp_listener()
+        start_engines()
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
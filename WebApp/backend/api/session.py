@@ -0,0 +1,73 @@
+from flask import Blueprint, jsonify, request, session
+from CONFIG import Config
+from api.utils.u_users import users
+
+session_bp = Blueprint('session', __name__, url_prefix='/api/session')
+
+def request_device_key():
+    # Header only: a key in the URL would end up in browser history and access logs
+    return request.headers.get('X-Device-Key')
+
+def current_user(allow_fallback=True):
+    """
+    UserContext of this request, or None:
+    1. the browser session cookie set at /callback,
+    2. a device key (X-Device-Key header), for engines, the ESP32 and the frontend,
+    3. only if SINGLE_USER_FALLBACK is turned on, the only logged in user (any caller may then act for them).
+    """
+    ctx = users.get(session.get('sid'))
+    if ctx:
+        return ctx
+
+    key = request_device_key()
+    if key:
+        return users.for_key(key)
+
+    if allow_fallback and Config.SINGLE_USER_FALLBACK:
+        return users.only()
+    return None
+
+def user_or_401():
+    ctx = current_user(allow_fallback=False)
+    if not ctx:
+        return None, (jsonify({"error": "No User Logged In"}), 401)
+    return ctx, None
+
+@session_bp.route('', methods=['GET'])
+def session_info():
+    ctx, error = user_or_401()
+    if error: return error
+    return jsonify({
+        "sid": ctx.sid[:6],
+        "devices": sorted(ctx.devices),
+        "expires_at": ctx.tokens.expires_at
+    }), 200
+
+@session_bp.route('/logout', methods=['POST'])
+def logout():
+    ctx = current_user(allow_fallback=False)
+    session.pop('sid', None)
+    if ctx:
+        users.logout(ctx.sid)
+    return jsonify({"status": "logged out"}), 200
+
+@session_bp.route('/devices', methods=['POST'])
+def pair_device():
+    """Commands of this UDP / IMU device id now act for the calling user."""
+    ctx, error = user_or_401()
+    if error: return error
+
+    data = request.get_json(silent=True) or {}
+    device_id = str(data.get('device_id', '')).strip().lower()[:32]
+    if not device_id:
+        return jsonify({"error": "Bad Request: Missing device_id"}), 400
+
+    users.pair_device(ctx.sid, device_id)
+    return jsonify({"status": "paired", "device_id": device_id}), 200
+
+@session_bp.route('/device-key', methods=['POST'])
+def rotate_device_key():
+    """New device key for the calling user (the old one stops working); the only place it is shown again."""
+    ctx, error = user_or_401()
+    if error: return error
+    return jsonify({"device_key": users.rotate_key(ctx.sid)}), 200
@@ -1,5 +1,5 @@
 from flask import Blueprint, jsonify
-from api.state import AppState
+from api.session import current_user
 from api.utils.u_user import get_user_profile
 from api.utils.u_server import set_error_state, clear_error_state
 
@@ -7,14 +7,19 @@ user_bp = Blueprint('user', __name__, url_prefix='/api/user')
 
 @user_bp.route('/profile', methods=['GET'])
 def profile():
-    # 1. Check Token
-    if not AppState.CURRENT_TOKEN:
+    # 1. Check User + Token
+    ctx = current_user()
+    token = ctx.access_token() if ctx else None
+    if not token:
         return jsonify({"error": "No User Logged In"}), 401
 
-    # 2. Call Spotify
-    res = get_user_profile(AppState.CURRENT_TOKEN)
+    # 2. Call Spotify + handle response
+    payload, status = fetch_profile(ctx, token)
+    return jsonify(payload), status
 
-    # 3. Handle Response
+def fetch_profile(ctx, token):
+    """Returns (profile, status_code). Refreshes + retries once on 401."""
+    res = ctx.call(get_user_profile, token)
     if res.status_code == 200:
-        return jsonify(res.json()), 200
-    return jsonify({"error": "Failed to fetch profile", "details": res.json()}), res.status_code
\ No newline at end of file
+        return res.json(), 200
+    return {"error": "Failed to fetch profile", "details": res.json()}, res.status_code
\ No newline at end of file
@@ -1,10 +1,10 @@
 import sys
 import os
 import urllib.parse
-import requests
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from CONFIG import Config
+from api.utils.u_spotify import spotify
 
 def get_auth_url(scope):
     params = {
@@ -24,5 +24,15 @@ def get_token(code):
         'client_id': Config.SPOTIFY_CLIENT_ID,
         'client_secret': Config.SPOTIFY_CLIENT_SECRET
     }
-    response = requests.post(Config.TOKEN_URL, data=req_body)
-    return response.json()
\ No newline at end of file
+    response = spotify.post(Config.TOKEN_URL, data=req_body)
+    return response.json()
+
+def refresh_access_token(refresh_token):
+    req_body = {
+        'grant_type': 'refresh_token',
+        'refresh_token': refresh_token,
+        'client_id': Config.SPOTIFY_CLIENT_ID,
+        'client_secret': Config.SPOTIFY_CLIENT_SECRET
+    }
+    response = spotify.post(Config.TOKEN_URL, data=req_body)
+    return response.json()
@@ -0,0 +1,112 @@
+import threading
+import time
+
+class _Flight:
+    """One upstream load that concurrent callers wait on."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class TTLCache:
+    """
+    Keyed cache whose entries expire after `ttl` seconds, with single-flight loading:
+    while one caller is fetching a key, everyone else asking for it waits for that
+    result instead of starting their own fetch.
+
+    invalidate(key) drops the entry and makes sure a fetch that was already running
+    can't store its (now outdated) result.
+
+    Keys come and go (access tokens change every refresh), so nothing is kept for a
+    key that isn't used: expired entries are swept at most once per `ttl` on access,
+    and a generation only exists while a fetch for its key is in flight.
+    """
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}     # key -> (value, expires_at)
+        self._inflight = {}    # key -> _Flight
+        self._generations = {} # key -> int, bumped by invalidate() while a fetch is in flight
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_load(self, key, loader, ttl=None, cache_if=None):
+        """
+        Cached value for key, or loader() if missing/expired.
+        cache_if(value) -> bool decides whether a fresh value may be stored (e.g. not errors).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._sweep(now)
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                self.hits += 1
+                return entry[0]
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                generation = self._generations.get(key, 0)
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                ok = flight.error is None and (cache_if is None or cache_if(flight.value))
+                if ok and self._generations.get(key, 0) == generation:
+                    self._entries[key] = (flight.value, time.monotonic() + (self.ttl if ttl is None else ttl))
+                # No fetch left to guard against
+                self._generations.pop(key, None)
+            flight.done.set()
+
+        return flight.value
+
+    def peek(self, key):
+        """Cached value if present and fresh, else None. Never loads."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            return None
+
+    def invalidate(self, key=None):
+        """Drops one key (or everything if key is None)."""
+        with self._lock:
+            self._sweep(time.monotonic())
+            keys = list(self._entries.keys() | self._inflight.keys()) if key is None else [key]
+            for k in keys:
+                self._entries.pop(k, None)
+                if k in self._inflight:
+                    self._generations[k] = self._generations.get(k, 0) + 1
+
+    def _sweep(self, now):
+        # Caller holds self._lock
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.ttl
+        for k in [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]:
+            del self._entries[k]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
@@ -0,0 +1,193 @@
+import sys
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from CONFIG import Config
+from api.utils.u_metrics import traced
+
+# play/pause set a state: only the latest matters and repeats are no-ops.
+# next/previous are cumulative and always run.
+STATE_COMMANDS = ("play", "pause")
+
+class Command:
+    def __init__(self, key, command, source=None, trace_id=None, origin=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.trace_id = trace_id or self.id # Correlation id, set by the engine that detected the gesture
+        self.key = key
+        self.command = command
+        self.source = source
+        self.status = "queued" # queued -> running -> done | failed, or coalesced
+        self.http_status = None
+        self.result = None
+        self.merged_into = None
+        self.created = time.monotonic()
+        self.origin = origin or self.created # When the gesture / utterance was detected (monotonic)
+        self.started = None
+        self.finished = None
+        self.followers = [] # commands merged into this one; they finish with its result
+        self._done = threading.Event()
+
+    def finish(self, status, http_status=None, result=None):
+        self.status = status
+        self.http_status = http_status
+        self.result = result
+        self.finished = time.monotonic()
+        self._done.set()
+        for follower in self.followers:
+            follower.finish("coalesced", http_status, result)
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def as_dict(self):
+        def ms(a, b):
+            return round((b - a) * 1000, 1) if a and b else None
+        return {
+            "id": self.id,
+            "command": self.command,
+            "source": self.source,
+            "status": self.status,
+            "http_status": self.http_status,
+            "result": self.result,
+            "merged_into": self.merged_into,
+            "trace_id": self.trace_id,
+            "client_ms": ms(self.origin, self.created),
+            "queued_ms": ms(self.created, self.started),
+            "run_ms": ms(self.started, self.finished),
+            "total_ms": ms(self.origin, self.finished)
+        }
+
+class CommandQueue:
+    """
+    Per-user command queues. submit() returns at once; one executor thread per user
+    runs that user's commands in order through execute(key, command) -> (http_status, body).
+
+    Coalescing (only between commands of the same user):
+    - a play/pause still waiting replaces an earlier waiting play/pause;
+    - if that leaves the state the last executed command already set
+      (play -> pause -> play while the first play runs), nothing is queued;
+    - a play/pause equal to one submitted less than `window` seconds ago
+      (ESP32 and gesture engine both sending pause) is merged into it.
+    Merged commands point at the command that carries them (`merged_into`).
+
+    on_finish(cmd), if given, is called on the executor thread after each executed command.
+    """
+    def __init__(self, execute, window=Config.COMMAND_COALESCE_WINDOW, history=Config.COMMAND_HISTORY, on_finish=None):
+        self.execute = execute
+        self.on_finish = on_finish
+        self.window = window
+        self.history = history
+
+        self._lock = threading.Lock()
+        self._queues = {}        # key -> deque[Command]
+        self._workers = {}       # key -> Thread (only while there is work)
+        self._last = {}          # key -> last accepted (non-merged) Command
+        self._last_executed = {} # key -> last state command sent to Spotify
+        self._records = OrderedDict()
+
+        self.executed = 0
+        self.coalesced = 0
+
+    def submit(self, key, command, source=None, trace_id=None, origin=None):
+        cmd = Command(key, command, source, trace_id, origin)
+
+        with self._lock:
+            self._remember(cmd)
+            queue = self._queues.setdefault(key, deque())
+            last = self._last.get(key)
+
+            if command in STATE_COMMANDS:
+                # Duplicate of something just accepted (pending, running or done)
+                if last and last.command == command and cmd.created - last.created < self.window:
+                    return self._merge(cmd, last)
+
+                # Newer state supersedes a pending one
+                if queue and queue[-1].command in STATE_COMMANDS and queue[-1].status == "queued":
+                    superseded = queue.pop()
+                    self._merge(superseded, cmd)
+                    if self._last_executed.get(key) == command:
+                        # Net effect is nothing: the state is already what was asked for
+                        self._last[key] = cmd
+                        cmd.finish("coalesced", 200, {"status": "success", "command": command, "noop": True})
+                        return cmd
+
+            queue.append(cmd)
+            self._last[key] = cmd
+            if key not in self._workers:
+                worker = threading.Thread(target=self._run, args=(key,), name=f"commands-{key[-6:]}", daemon=True)
+                self._workers[key] = worker
+                worker.start()
+
+        return cmd
+
+    def _merge(self, cmd, into):
+        # Caller holds self._lock
+        cmd.merged_into = into.id
+        cmd.status = "coalesced"
+        self.coalesced += 1
+        if into._done.is_set():
+            cmd.finish("coalesced", into.http_status, into.result)
+        else:
+            into.followers.append(cmd)
+        return cmd
+
+    def _run(self, key):
+        while True:
+            with self._lock:
+                queue = self._queues.get(key)
+                if not queue:
+                    self._workers.pop(key, None)
+                    return
+                cmd = queue.popleft()
+                cmd.status = "running"
+                cmd.started = time.monotonic()
+                if cmd.command in STATE_COMMANDS:
+                    self._last_executed[key] = cmd.command
+                else:
+                    self._last_executed.pop(key, None) # Skipping may change play/pause on its own
+
+            try:
+                with traced(cmd.trace_id):
+                    http_status, body = self.execute(key, cmd.command)
+            except Exception as e:
+                http_status, body = 500, {"error": "Command failed", "details": str(e)}
+
+            with self._lock:
+                self.executed += 1
+                if http_status >= 400 and self._last_executed.get(key) == cmd.command:
+                    self._last_executed.pop(key, None)
+                cmd.finish("done" if http_status < 400 else "failed", http_status, body)
+
+            if self.on_finish:
+                try:
+                    self.on_finish(cmd)
+                except Exception as e:
+                    print(f"[COMMANDS] on_finish failed: {e}")
+
+    def _remember(self, cmd):
+        # Caller holds self._lock
+        self._records[cmd.id] = cmd
+        while len(self._records) > self.history:
+            self._records.popitem(last=False)
+
+    def forget(self, key):
+        """Drops everything kept for `key` (a logged out user); its pending commands fail with 401."""
+        with self._lock:
+            pending = self._queues.pop(key, ())
+            self._last.pop(key, None)
+            self._last_executed.pop(key, None)
+            for cmd in pending:
+                cmd.finish("failed", 401, {"error": "User logged out"})
+
+    def get(self, command_id):
+        with self._lock:
+            return self._records.get(command_id)
+
+    def stats(self):
+        with self._lock:
+            pending = sum(len(q) for q in self._queues.values())
+        return {"executed": self.executed, "coalesced": self.coalesced, "pending": pending}
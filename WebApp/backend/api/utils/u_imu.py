@@ -0,0 +1,266 @@
+import sys
+import os
+import json
+import threading
+from collections import OrderedDict
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from CONFIG import Config
+
+# Gesture codes (same order of precedence as the ESP32 sketch's if/else chain)
+NONE, PREVIOUS, NEXT, PAUSE, PLAY = range(5)
+COMMANDS = (None, "previous", "next", "pause", "play")
+
+class Settings:
+    """Classifier tuning. `sensitivity` scales the tilt needed to trigger (1.0 = enter_g)."""
+    def __init__(self, enter_g=Config.IMU_ENTER_G, max_g=Config.IMU_MAX_G, release_g=Config.IMU_RELEASE_G,
+                 hold_ms=Config.IMU_HOLD_MS, debounce_ms=Config.IMU_DEBOUNCE_MS,
+                 smoothing=Config.IMU_SMOOTHING, sensitivity=1.0):
+        self.enter_g = enter_g          # tilt (g) on x/y that counts as a gesture
+        self.max_g = max_g              # above this it's a shake/knock, not a tilt
+        self.release_g = release_g      # both axes below this = back to neutral (re-arms)
+        self.hold_ms = hold_ms          # tilt must be held this long
+        self.debounce_ms = debounce_ms  # min time between two emitted gestures
+        self.smoothing = smoothing      # moving average length in samples
+        self.sensitivity = sensitivity
+
+def check_sensitivity(value):
+    """value as a float, or ValueError unless 0 < value <= IMU_MAX_SENSITIVITY."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("sensitivity must be a number")
+    if not (0 < value <= Config.IMU_MAX_SENSITIVITY):
+        raise ValueError(f"sensitivity must be above 0 and at most {Config.IMU_MAX_SENSITIVITY}")
+    return value
+
+def check_rate(value):
+    """value as a float, or ValueError unless 0 < value <= IMU_MAX_RATE."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("rate must be a number")
+    if not (0 < value <= Config.IMU_MAX_RATE):
+        raise ValueError(f"rate must be above 0 and at most {Config.IMU_MAX_RATE} Hz")
+    return value
+
+class DeviceState:
+    def __init__(self, bias=(0.0, 0.0, 0.0), sensitivity=1.0):
+        self.lock = threading.Lock()
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.sensitivity = sensitivity
+        self.tail = np.empty((0, 3), dtype=np.float32) # last smoothing-1 samples for the filter
+        self.next_t = None       # expected timestamp of the next sample (ms)
+        self.seg_code = NONE     # gesture of the segment still running at the end of the last batch
+        self.seg_start = 0.0
+        self.seg_fired = False
+        self.armed = True        # neutral seen since the last emitted gesture
+        self.last_emit = -np.inf
+        self.samples = 0
+        self.gestures = 0
+
+def moving_average(tail, acc, k):
+    """k-sample moving average of acc, continuing from the previous batch's tail."""
+    if k <= 1:
+        return acc
+    data = np.concatenate((tail, acc))
+    csum = np.cumsum(data, axis=0, dtype=np.float64)
+    csum = np.concatenate((np.zeros((1, 3)), csum))
+    ends = np.arange(len(tail) + 1, len(data) + 1)
+    starts = np.maximum(ends - k, 0)
+    return ((csum[ends] - csum[starts]) / (ends - starts)[:, None]).astype(np.float32)
+
+def tilt_codes(x, y, enter, max_g):
+    """Per-sample gesture code from filtered x/y tilt (vectorized version of the sketch's thresholds)."""
+    return np.select(
+        [
+            (x >= enter) & (x <= max_g),
+            (x <= -enter) & (x >= -max_g),
+            (y >= enter) & (y <= max_g),
+            (y <= -enter) & (y >= -max_g)
+        ],
+        [PREVIOUS, NEXT, PAUSE, PLAY],
+        NONE
+    ).astype(np.int8)
+
+class ImuClassifier:
+    """
+    Streaming tilt classifier for any number of devices.
+
+    process(device_id, raw, t0_ms, rate_hz) takes a batch of raw accelerometer samples
+    ((N,3) int16 counts, or g if scale=1) and returns [(command, t_ms), ...].
+
+    Per batch, all numeric work is vectorized: bias removal, moving-average filter,
+    thresholding into per-sample codes, and run-length segmentation. Only the (few)
+    tilt segments are walked in Python to apply hold time, debounce and re-arming.
+    Filter and segment state carry over between batches, so splitting a stream into
+    batches doesn't change the result.
+
+    At most `max_devices` devices keep state, and as many keep a stored calibration;
+    beyond that the least recently used is dropped.
+    """
+    def __init__(self, settings=None, scale=Config.IMU_SCALE, calibration_file=Config.IMU_CALIBRATION_FILE,
+                 max_devices=Config.IMU_MAX_DEVICES):
+        self.settings = settings or Settings()
+        self.scale = scale
+        self.calibration_file = calibration_file
+        self.max_devices = max_devices
+        self._devices = OrderedDict() # device id -> DeviceState, least recently used first
+        self._lock = threading.Lock()
+        self._calibration = self._load_calibration()
+
+    def _device(self, device_id):
+        with self._lock:
+            state = self._devices.get(device_id)
+            if state is None:
+                cal = self._calibration.get(device_id, {})
+                try:
+                    sensitivity = check_sensitivity(cal.get('sensitivity', 1.0))
+                except ValueError:
+                    sensitivity = 1.0 # Hand-edited or from before sensitivity was checked
+                state = self._devices[device_id] = DeviceState(cal.get('bias', (0.0, 0.0, 0.0)), sensitivity)
+                while len(self._devices) > self.max_devices:
+                    self._devices.popitem(last=False)
+            else:
+                self._devices.move_to_end(device_id)
+            return state
+
+    def process(self, device_id, raw, t0_ms=None, rate_hz=Config.IMU_SAMPLE_RATE):
+        s = self.settings
+        rate_hz = check_rate(rate_hz)
+        state = self._device(device_id)
+        raw = np.asarray(raw, dtype=np.float32).reshape(-1, 3)
+        n = len(raw)
+        if n == 0:
+            return []
+
+        with state.lock:
+            dt = 1000.0 / rate_hz
+            if t0_ms is None:
+                t0_ms = state.next_t if state.next_t is not None else 0.0
+            t = t0_ms + np.arange(n) * dt
+            state.next_t = t0_ms + n * dt
+
+            acc = raw / self.scale - state.bias
+            filtered = moving_average(state.tail, acc, s.smoothing)
+            if s.smoothing > 1:
+                state.tail = np.concatenate((state.tail, acc))[-(s.smoothing - 1):]
+            state.samples += n
+
+            enter = s.enter_g / (s.sensitivity * state.sensitivity)
+            x, y = filtered[:, 0], filtered[:, 1]
+            codes = tilt_codes(x, y, enter, s.max_g)
+            neutral = np.flatnonzero((np.abs(x) < s.release_g) & (np.abs(y) < s.release_g))
+
+            # Run-length segments of equal code
+            starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+            ends = np.append(starts[1:], n)
+            seg_codes = codes[starts]
+
+            events = []
+            last_emit_idx = -1 # index in this batch of the last emitted gesture (-1: before the batch)
+            last_fired = False # whether the segment running at the end of the batch has fired
+            armed = state.armed
+            for i in np.flatnonzero(seg_codes != NONE):
+                start, end, code = starts[i], ends[i], int(seg_codes[i])
+
+                continues = i == 0 and code == state.seg_code
+                seg_start_t = state.seg_start if continues else t[start]
+                fired = state.seg_fired if continues else False
+
+                # Neutral since the last gesture? (only needs checking until it's true)
+                if not armed:
+                    k = np.searchsorted(neutral, last_emit_idx + 1)
+                    armed = k < len(neutral) and neutral[k] < start
+
+                # Held long enough and outside the debounce of the previous gesture
+                fire_t = max(seg_start_t + s.hold_ms, state.last_emit + s.debounce_ms)
+                if not fired and armed and fire_t <= t[end - 1]:
+                    events.append((COMMANDS[code], float(fire_t)))
+                    state.last_emit = fire_t
+                    last_emit_idx = max(start, start + int(np.ceil((fire_t - t[start]) / dt)))
+                    armed = False
+                    fired = True
+
+                if end == n:
+                    last_fired = fired
+
+            # Carry the running segment and arming into the next batch
+            last_code = int(seg_codes[-1])
+            if not (len(starts) == 1 and last_code == state.seg_code):
+                state.seg_start = float(t[starts[-1]])
+            state.seg_code = last_code
+            state.seg_fired = last_fired
+            if not armed:
+                armed = bool(len(neutral) and neutral[-1] > last_emit_idx)
+            state.armed = armed
+            state.gestures += len(events)
+            return events
+
+    # --- Calibration ---
+    def calibrate(self, device_id, raw, sensitivity=None):
+        """Device held at rest: its mean x/y tilt becomes the zero point. Persisted per device."""
+        raw = np.asarray(raw, dtype=np.float32).reshape(-1, 3)
+        if len(raw) == 0:
+            raise ValueError("No samples to calibrate from")
+        if sensitivity is not None:
+            sensitivity = check_sensitivity(sensitivity)
+        mean = raw.mean(axis=0) / self.scale
+        bias = [float(mean[0]), float(mean[1]), 0.0] # z carries gravity; it isn't classified
+
+        state = self._device(device_id)
+        with state.lock:
+            state.bias = np.asarray(bias, dtype=np.float32)
+            if sensitivity is not None:
+                state.sensitivity = sensitivity
+            entry = {"bias": bias, "sensitivity": state.sensitivity}
+
+        with self._lock:
+            self._calibration.pop(device_id, None) # Re-insert: most recently calibrated last
+            self._calibration[device_id] = entry
+            while len(self._calibration) > self.max_devices:
+                del self._calibration[next(iter(self._calibration))]
+            self._save_calibration()
+        return entry
+
+    def _load_calibration(self):
+        if not self.calibration_file:
+            return {}
+        try:
+            with open(self.calibration_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"[IMU] Ignoring unreadable calibration file: {e}")
+            return {}
+
+    def _save_calibration(self):
+        # Caller holds self._lock
+        if not self.calibration_file:
+            return
+        tmp_path = f"{self.calibration_file}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self._calibration, f, indent=2)
+            os.replace(tmp_path, self.calibration_file)
+        except OSError as e:
+            print(f"[IMU] Could not save calibration: {e}")
+
+    def stats(self):
+        with self._lock:
+            devices = dict(self._devices)
+        return {
+            device_id: {"samples": d.samples, "gestures": d.gestures, "sensitivity": d.sensitivity,
+                        "bias": [round(float(b), 4) for b in d.bias]}
+            for device_id, d in devices.items()
+        }
+
+# --- Recordings: .npz with t_ms (N,) and raw (N,3) int16 ---
+def save_recording(path, t_ms, raw):
+    np.savez_compressed(path, t_ms=np.asarray(t_ms, dtype=np.float64), raw=np.asarray(raw, dtype=np.int16))
+
+def load_recording(path):
+    data = np.load(path)
+    return data['t_ms'], data['raw']
@@ -0,0 +1,210 @@
+import bisect
+import sys
+import os
+import threading
+import time
+from collections import OrderedDict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from CONFIG import Config
+
+# Upper bounds (seconds) shared by every latency histogram: 1ms .. 10s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+def _number(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+class Histogram:
+    """
+    Prometheus-style cumulative histogram. observe() is a bisect plus a few adds
+    under a lock, so it's cheap enough for every request / command.
+    """
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {} # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, ('le', _number(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+class Gauges:
+    """
+    Values read at scrape time: collect() -> [(label values, value)].
+    Keeps gauges off the hot path entirely.
+    """
+    def __init__(self, name, help_text, label_names, collect):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.collect = collect
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in self.collect():
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, label_names=()):
+        return self.register(Counter(name, help_text, label_names))
+
+    def histogram(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help_text, label_names, buckets))
+
+    def gauges(self, name, help_text, label_names, collect):
+        return self.register(Gauges(name, help_text, label_names, collect))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            try:
+                lines += metric.render()
+            except Exception as e:
+                lines.append(f"# {metric.name} unavailable: {e}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# --- Correlation ids ---
+# A command's id travels engine -> /api/player/<cmd> -> command queue -> Spotify call.
+# The executor thread marks which trace it's working on, so the Spotify client can
+# attach its upstream timing without every caller passing the id along.
+_local = threading.local()
+
+class TraceLog:
+    """
+    Last `size` traces: id -> {command, source, spans: [(name, ms, detail)], ...}.
+    Each trace belongs to the user (sid) whose command it is; recent() only returns theirs.
+    """
+    def __init__(self, size=Config.METRICS_TRACE_HISTORY):
+        self.size = size
+        self._traces = OrderedDict() # trace id -> (sid, trace)
+        self._lock = threading.Lock()
+
+    def start(self, trace_id, sid=None, **fields):
+        with self._lock:
+            self._traces[trace_id] = (sid, {"id": trace_id, "spans": [], **fields})
+            self._traces.move_to_end(trace_id)
+            while len(self._traces) > self.size:
+                self._traces.popitem(last=False)
+
+    def _get(self, trace_id):
+        # Caller holds self._lock
+        entry = self._traces.get(trace_id)
+        return entry[1] if entry else None
+
+    def span(self, trace_id, name, elapsed_s, detail=None):
+        with self._lock:
+            trace = self._get(trace_id)
+            if trace is not None:
+                trace["spans"].append({"name": name, "ms": round(elapsed_s * 1000, 2), "detail": detail})
+
+    def update(self, trace_id, **fields):
+        with self._lock:
+            trace = self._get(trace_id)
+            if trace is not None:
+                trace.update(fields)
+
+    def recent(self, sid, limit=50):
+        with self._lock:
+            items = [t for owner, t in self._traces.values() if owner == sid][-limit:]
+            return [{**t, "spans": list(t["spans"])} for t in reversed(items)]
+
+traces = TraceLog()
+
+class traced:
+    """with traced(trace_id): ... marks the current thread as working on that trace."""
+    def __init__(self, trace_id):
+        self.trace_id = trace_id
+
+    def __enter__(self):
+        self.previous = getattr(_local, "trace_id", None)
+        _local.trace_id = self.trace_id
+        return self
+
+    def __exit__(self, *exc):
+        _local.trace_id = self.previous
+        return False
+
+def current_trace():
+    return getattr(_local, "trace_id", None)
+
+# --- Engine reports ---
+# Latest timing snapshot per engine (FramePipeline.snapshot() etc.), pushed every few seconds
+engine_reports = {}
+
+def record_engine_report(engine, snapshot):
+    engine_reports[engine] = (time.monotonic(), snapshot)
+
+def monotonic_origin(age_ms):
+    """Local monotonic time of an event that happened age_ms ago on the caller's side."""
+    try:
+        age = max(0.0, float(age_ms)) / 1000.0
+    except (TypeError, ValueError):
+        return None
+    return time.monotonic() - age
@@ -0,0 +1,128 @@
+import sys
+import os
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from CONFIG import Config
+
+class PlaybackModel:
+    """
+    Local model of what Spotify is playing, so /state reads don't need Spotify.
+    One per user (UserContext), so it isn't tied to a token: a refresh keeps the model.
+
+    - reconcile(payload): adopt Spotify's state (the trimmed /state payload).
+    - apply(command):     optimistic update after a command Spotify accepted.
+    - snapshot():         current state; progress_ms is extrapolated from the
+                          last known position and a monotonic timestamp.
+    - needs_reconcile():  True on the slow schedule, once the extrapolated
+                          position passes the end of the track, shortly after
+                          next/previous (the new track is unknown).
+
+    A reconcile whose real position is further than the drift tolerance from the
+    prediction (seek / control from another device) switches to the fast interval
+    until the model agrees with Spotify again. So does "nothing playing": playback
+    started elsewhere should show up without waiting for the slow schedule.
+
+    `version` changes on every reconcile / apply, i.e. whenever the state changes for
+    another reason than the clock; it's what /state's ETag is built from.
+    """
+    def __init__(self, interval=Config.PLAYBACK_RECONCILE_INTERVAL,
+                 fast_interval=Config.PLAYBACK_RECONCILE_FAST_INTERVAL,
+                 drift_tolerance_ms=Config.PLAYBACK_DRIFT_TOLERANCE_MS,
+                 settle=Config.PLAYBACK_COMMAND_SETTLE):
+        self.interval = interval
+        self.fast_interval = fast_interval
+        self.drift_tolerance_ms = drift_tolerance_ms
+        self.settle = settle
+        self._lock = threading.Lock()
+
+        self.payload = None     # last known state without live progress
+        self.progress_ms = 0    # position at self.anchor
+        self.anchor = 0.0       # time.monotonic() of progress_ms
+        self.next_sync = 0.0    # time.monotonic() after which we must reconcile
+        self.track_changing = False # next/previous sent; a new track is expected, not drift
+        self.drift_count = 0
+        self.last_drift_ms = 0
+        self.version = 0
+
+    def _position(self, now):
+        # Caller holds self._lock
+        if not self.payload:
+            return 0
+        position = self.progress_ms
+        if self.payload['is_playing']:
+            position += int((now - self.anchor) * 1000)
+        return min(position, self.payload['item']['duration_ms'])
+
+    def needs_reconcile(self):
+        now = time.monotonic()
+        with self._lock:
+            if now >= self.next_sync:
+                return True
+            # Track ended while playing -> Spotify moved on to something we don't know
+            if self.payload and self.payload['is_playing']:
+                return self._position(now) >= self.payload['item']['duration_ms']
+            return False
+
+    def reconcile(self, payload):
+        now = time.monotonic()
+        with self._lock:
+            interval = self.interval
+            if payload and self.payload:
+                same_track = payload['item'] == self.payload['item']
+                drift = payload['progress_ms'] - self._position(now)
+                self.last_drift_ms = drift
+                expected = self.track_changing and not same_track
+                if not expected and (not same_track or abs(drift) > self.drift_tolerance_ms):
+                    self.drift_count += 1
+                    interval = self.fast_interval
+
+            if not payload:
+                interval = self.fast_interval
+
+            self.version += 1
+            self.payload = payload
+            self.track_changing = False
+            self.progress_ms = payload['progress_ms'] if payload else 0
+            self.anchor = now
+            self.next_sync = now + interval
+
+    def apply(self, command):
+        now = time.monotonic()
+        with self._lock:
+            if not self.payload:
+                self.next_sync = 0.0 # Nothing to update optimistically; just refetch
+                return
+
+            self.version += 1
+            if command in ("play", "pause"):
+                self.progress_ms = self._position(now)
+                self.anchor = now
+                self.payload = {**self.payload, 'is_playing': command == "play"}
+            elif command in ("next", "previous"):
+                # We can't know the new track; show a restart and confirm once Spotify settles
+                self.progress_ms = 0
+                self.anchor = now
+                self.payload = {**self.payload, 'is_playing': True}
+                self.track_changing = True
+                self.next_sync = min(self.next_sync, now + self.settle)
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            if not self.payload:
+                return None
+            return {**self.payload, 'progress_ms': self._position(now)}
+
+    def is_playing(self):
+        with self._lock:
+            return bool(self.payload and self.payload['is_playing'])
+
+    def stats(self):
+        with self._lock:
+            return {
+                "drift_count": self.drift_count,
+                "last_drift_ms": self.last_drift_ms,
+                "next_sync_in": round(max(0.0, self.next_sync - time.monotonic()), 2)
+            }
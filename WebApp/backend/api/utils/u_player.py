@@ -1,53 +1,35 @@
-import requests
 import sys
 import os
 
 # Path Fix
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from CONFIG import Config
+from api.utils.u_spotify import spotify
 
 # Shortcuts
 base_url = f"{Config.API_BASE_URL}/me/player"
-a = "Authorization"
-b = "Bearer"
 
-def play_playback(token):
+def play_playback(token, client=spotify):
     url = f"{base_url}/play"
-    headers = {a: f"{b} {token}"}
-    
-    response = requests.put(url, headers=headers)
-    return response
+    return client.put(url, token=token)
 
-def pause_playback(token):
+def pause_playback(token, client=spotify):
     url = f"{base_url}/pause"
-    headers = {a: f"{b} {token}"}
-    
-    response = requests.put(url, headers=headers)
-    return response
+    return client.put(url, token=token)
 
-def skip_next(token):
+def skip_next(token, client=spotify):
     url = f"{base_url}/next"
-    headers = {a: f"{b} {token}"}
+    return client.post(url, token=token)
 
-    response = requests.post(url, headers=headers)
-    return response
-
-def skip_previous(token):
+def skip_previous(token, client=spotify):
     url = f"{base_url}/previous"
-    headers = {a: f"{b} {token}"}
-
-    response = requests.post(url, headers=headers)
-    return response
+    return client.post(url, token=token)
 
-def get_playback_state(token):
+def get_playback_state(token, client=spotify):
     url = base_url
-    headers = {a: f"{b} {token}"}
-
-    response = requests.get(url, headers=headers)
-    return response
+    return client.get(url, token=token)
 
-def get_devices(token):
+def get_devices(token, client=spotify):
     """Fetches list of available devices"""
     url = f"{base_url}/devices"
-    headers = {a: f"{b} {token}"}
-    return requests.get(url, headers=headers)
+    return client.get(url, token=token)
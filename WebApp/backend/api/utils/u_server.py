@@ -1,16 +1,97 @@
 import sys
 import os
+import threading
+import time
+from collections import deque
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from CONFIG import Config
-from api.state import AppState
 
-def set_error_state(code, message, dev_info):
-    AppState.ERROR_STATE['code'] = code
-    AppState.ERROR_STATE['message'] = message
-    AppState.ERROR_STATE['dev_info'] = dev_info
+class ErrorLog:
+    """
+    Fixed-size ring of error events. Every event gets the next sequence number, so
+    clients read incrementally (since(seq)) and block until something new arrives
+    instead of re-fetching the whole state.
 
-def clear_error_state():
-    AppState.ERROR_STATE['code'] = None
-    AppState.ERROR_STATE['message'] = None
-    AppState.ERROR_STATE['dev_info'] = None
\ No newline at end of file
+    Events belong to one user (sid) or to the whole system (sid=None: engines, mic,
+    server); a reader only ever sees its own and the system's events.
+    - set(): an error event; it also becomes that sid's current error.
+    - clear(): a "clear" event, only if that sid has a current error (successful calls
+      clear all the time and must not flood the ring).
+    Old events fall off the end; a reader whose cursor is older than the ring is
+    told so with "truncated".
+    """
+    def __init__(self, size=Config.ERROR_LOG_SIZE):
+        self._events = deque(maxlen=size) # (sid, event)
+        self._current = {} # sid -> active error event
+        self._latest = {}  # sid -> seq of its newest event
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def _append(self, sid, event):
+        # Caller holds self._lock
+        self.seq += 1
+        event = {"seq": self.seq, "time": time.time(), **event}
+        self._events.append((sid, event))
+        self._latest[sid] = self.seq
+        self._changed.notify_all()
+        return event
+
+    def set(self, code, message, dev_info, sid=None):
+        with self._lock:
+            self._current[sid] = self._append(sid, {"type": "error", "code": code, "message": message, "dev_info": dev_info})
+
+    def clear(self, sid=None):
+        with self._lock:
+            if self._current.pop(sid, None) is None:
+                return
+            self._append(sid, {"type": "clear", "code": None, "message": None, "dev_info": None})
+
+    def _current_for(self, sid):
+        # Caller holds self._lock. The newer of the user's and the system's active error
+        found = [e for e in (self._current.get(None), self._current.get(sid) if sid else None) if e]
+        return max(found, key=lambda e: e["seq"]) if found else None
+
+    def _latest_for(self, sid):
+        # Caller holds self._lock
+        return max(self._latest.get(None, 0), self._latest.get(sid, 0) if sid else 0)
+
+    def current(self, sid=None):
+        """The active error event visible to `sid`, or None."""
+        with self._lock:
+            return self._current_for(sid)
+
+    def since(self, seq, sid=None, timeout=0):
+        """
+        Events visible to `sid` after `seq`, waiting up to `timeout` seconds for the first one.
+        A cursor ahead of us (the server restarted) reads the whole ring again.
+        """
+        with self._changed:
+            if seq > self.seq:
+                seq = 0
+            # Other users' events wake us too; only our own end the wait
+            self._changed.wait_for(lambda: self._latest_for(sid) > seq, timeout)
+            events = [e for owner, e in self._events if e["seq"] > seq and (owner is None or owner == sid)]
+            oldest = self._events[0][1]["seq"] if self._events else self.seq + 1
+            return {
+                "seq": self.seq,
+                "events": events,
+                "current": self._current_for(sid),
+                "truncated": seq + 1 < oldest
+            }
+
+    def forget(self, sid):
+        """Drops a logged out user's current error (its events age out of the ring)."""
+        with self._lock:
+            self._current.pop(sid, None)
+            self._latest.pop(sid, None)
+
+errors = ErrorLog()
+
+def set_error_state(code, message, dev_info, sid=None):
+    """sid: the user this error belongs to; None for system-wide errors every user should see."""
+    errors.set(code, message, dev_info, sid)
+
+def clear_error_state(sid=None):
+    errors.clear(sid)
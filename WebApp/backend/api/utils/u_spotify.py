@@ -0,0 +1,167 @@
+import json
+import sys
+import os
+import threading
+import time
+import urllib.parse
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from CONFIG import Config
+from api.utils.u_metrics import registry, traces, current_trace
+
+# Safe to repeat after a 5xx / read timeout (POST next/previous could double-skip)
+IDEMPOTENT_METHODS = ("GET", "PUT")
+RETRY_STATUSES = (500, 502, 503, 504)
+
+upstream_latency = registry.histogram(
+    "startify_spotify_request_duration_seconds", "Spotify upstream latency per attempt", ("endpoint",))
+upstream_responses = registry.counter(
+    "startify_spotify_responses_total", "Spotify responses per endpoint and status (none = network error)", ("endpoint", "status"))
+
+class EndpointStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.statuses = {}
+
+    def record(self, elapsed_s, status):
+        ms = elapsed_s * 1000.0
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "statuses": {str(k): v for k, v in self.statuses.items()}
+        }
+
+class SpotifyClient:
+    """
+    One pooled keep-alive session for every Spotify call (Web API + accounts).
+
+    - Default (connect, read) timeouts on every request.
+    - 429: waits for Retry-After (if it's short enough) and retries.
+    - 5xx / network errors: exponential backoff, but only for idempotent methods.
+    - Network failures come back as a synthetic 503/504 Response, so callers
+      keep handling everything through res.status_code.
+    - Latency and status counts are recorded per endpoint ("PUT /v1/me/player/play");
+      clients created with stats_from=other add to the other client's table.
+    """
+    def __init__(self, timeout=Config.SPOTIFY_TIMEOUT, max_retries=Config.SPOTIFY_MAX_RETRIES,
+                 max_retry_after=Config.SPOTIFY_MAX_RETRY_AFTER, backoff=0.25, pool_size=16, stats_from=None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_retry_after = max_retry_after
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        if stats_from:
+            self._stats, self._stats_lock = stats_from._stats, stats_from._stats_lock
+        else:
+            self._stats = {}
+            self._stats_lock = threading.Lock()
+
+    def request(self, method, url, token=None, headers=None, **kwargs):
+        method = method.upper()
+        headers = dict(headers or {})
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        kwargs.setdefault("timeout", self.timeout)
+
+        endpoint = f"{method} {urllib.parse.urlparse(url).path}"
+        idempotent = method in IDEMPOTENT_METHODS
+
+        for attempt in range(self.max_retries + 1):
+            last_try = attempt == self.max_retries
+            start = time.perf_counter()
+            try:
+                res = self.session.request(method, url, headers=headers, **kwargs)
+            except requests.exceptions.RequestException as e:
+                self._record(endpoint, time.perf_counter() - start, None)
+                # A timed-out connect never reached Spotify, so even a POST can be retried
+                retry_safe = idempotent or isinstance(e, requests.exceptions.ConnectTimeout)
+                if last_try or not retry_safe:
+                    return self._error_response(url, e)
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+
+            self._record(endpoint, time.perf_counter() - start, res.status_code)
+
+            if last_try:
+                return res
+            if res.status_code == 429:
+                retry_after = self._retry_after(res)
+                if retry_after > self.max_retry_after:
+                    return res # Don't park a request thread for long; let the caller report it
+                time.sleep(retry_after)
+                continue
+            if res.status_code in RETRY_STATUSES and idempotent:
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+            return res
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    @staticmethod
+    def _retry_after(res):
+        try:
+            return max(0.0, float(res.headers.get("Retry-After", 1)))
+        except ValueError:
+            return 1.0
+
+    @staticmethod
+    def _error_response(url, exc):
+        res = requests.Response()
+        res.status_code = 504 if isinstance(exc, requests.exceptions.Timeout) else 503
+        res.url = url
+        res.headers["Content-Type"] = "application/json"
+        res._content = json.dumps({
+            "error": {"status": res.status_code, "message": f"Spotify unreachable: {exc}"}
+        }).encode()
+        return res
+
+    def _record(self, endpoint, elapsed_s, status):
+        upstream_latency.observe(elapsed_s, endpoint)
+        upstream_responses.inc(endpoint, str(status) if status else "none")
+        trace_id = current_trace()
+        if trace_id:
+            traces.span(trace_id, f"spotify {endpoint}", elapsed_s, status)
+
+        with self._stats_lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = EndpointStats()
+            stats.record(elapsed_s, status)
+
+    def stats(self):
+        with self._stats_lock:
+            return {endpoint: s.as_dict() for endpoint, s in self._stats.items()}
+
+    def close(self):
+        self.session.close()
+
+# Accounts calls (u_auth) and the default for u_player / u_user; every logged in
+# user also gets a small pool of their own (see u_users)
+spotify = SpotifyClient()
@@ -1,7 +1,10 @@
+import atexit
 import json
 import os
+import threading
 
 STATUS_FILE = 'system_status.json'
+FLUSH_DELAY = 0.5 # Seconds of changes batched into one disk write
 
 DEFAULT_STATE = {
     "voice_active": False,
@@ -10,31 +13,136 @@ DEFAULT_STATE = {
     "hand_ready": False
 }
 
+class StateStore:
+    """
+    The authoritative system state, held in memory behind one lock.
+
+    - Loaded from disk once at startup; reads never touch the disk.
+    - Every real change bumps `version` and wakes wait_for_change() callers.
+    - Persistence is write-behind: changes within FLUSH_DELAY are batched and
+      written to a temp file that is atomically renamed over STATUS_FILE.
+    """
+    def __init__(self, path, defaults, flush_delay=FLUSH_DELAY):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.version = 0
+        self._state = dict(defaults)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._io_lock = threading.Lock()
+        self._dirty = False
+        self._timer = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self._state.update({k: data[k] for k in self._state if k in data})
+        except FileNotFoundError:
+            with self._lock:
+                self._schedule_flush()
+        except (OSError, ValueError) as e:
+            print(f"STATE LOAD FAILED: {self.path} ({e}), starting from defaults")
+
+    # --- Reads ---
+    def snapshot(self):
+        """Copy of the state with its version, taken atomically."""
+        with self._lock:
+            return {**self._state, "version": self.version}
+
+    def get(self):
+        with self._lock:
+            return dict(self._state)
+
+    def wait_for_change(self, since, timeout):
+        """
+        Blocks until the version differs from `since` (or timeout).
+        Uses != so a client holding a version from before a server restart returns at once.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != since, timeout)
+            return self.version
+
+    # --- Writes ---
+    def update(self, key, value):
+        """Sets a known key. Returns False if the key doesn't exist."""
+        with self._lock:
+            if key not in self._state:
+                return False
+            if self._state[key] != value:
+                self._state[key] = value
+                self.version += 1
+                self._changed.notify_all()
+                self._schedule_flush()
+            return True
+
+    def _schedule_flush(self):
+        # Caller holds self._lock
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Writes the state to disk now if anything changed since the last write."""
+        with self._io_lock:
+            with self._lock:
+                self._timer = None
+                if not self._dirty:
+                    return
+                data = dict(self._state)
+                self._dirty = False
+
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"STATE SAVE FAILED: {self.path} ({e})")
+                with self._lock:
+                    self._schedule_flush()
+
+store = StateStore(STATUS_FILE, DEFAULT_STATE)
+atexit.register(store.flush)
+
 def load_state():
-    if not os.path.exists(STATUS_FILE):
-        save_state(DEFAULT_STATE)
-        return DEFAULT_STATE
-    try:
-        with open(STATUS_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return DEFAULT_STATE
+    return store.get()
+
+def status_snapshot():
+    return store.snapshot()
 
 def save_state(state):
-    with open(STATUS_FILE, 'w') as f:
-        json.dump(state, f, indent=4)
+    for key, value in state.items():
+        store.update(key, value)
+
+def get_version():
+    return store.version
+
+def wait_for_change(since, timeout):
+    return store.wait_for_change(since, timeout)
 
 def set_engine_status(module, is_ready):
-    state = load_state()
-    key = f"{module}_ready"
-    if key in state:
-        state[key] = is_ready
-        save_state(state)
-        print(f"STATE UPDATE: {key} -> {is_ready}")
+    update_key(f"{module}_ready", is_ready)
 
 def update_key(key, value):
-    state = load_state()
-    if key in state:
-        state[key] = value
-        save_state(state)
-        print(f"STATE UPDATE: {key} -> {value}")
\ No newline at end of file
+    if store.update(key, value):
+        print(f"STATE UPDATE: {key} -> {value}")
+
+# Module name (as sent by the UI / ESP32) -> state key
+MODULE_KEYS = {
+    "voice": "voice_active",
+    "hand": "hand_active"
+}
+
+def set_module_active(module, active):
+    """Turns an engine on/off. False if the module name is unknown."""
+    target_key = MODULE_KEYS.get(module)
+    if not target_key:
+        return False
+    update_key(target_key, active)
+    return True
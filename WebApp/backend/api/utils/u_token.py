@@ -0,0 +1,143 @@
+import sys
+import os
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from CONFIG import Config
+from api.utils.u_auth import refresh_access_token
+from api.utils.u_server import set_error_state
+
+RETRY_DELAY = 30 # Seconds before retrying a failed background refresh
+
+class TokenManager:
+    """
+    Owns the Spotify tokens of one logged in user.
+
+    - Keeps access token, refresh token and expiry.
+    - Refreshes in the background `margin` seconds before expiry; concurrent callers
+      share one in-flight refresh.
+    - call(func) runs func(token) and, on a 401, refreshes once and retries.
+    - on_change() is called after every new token so the owner can persist it.
+    """
+    def __init__(self, margin=Config.TOKEN_REFRESH_MARGIN, on_change=None, sid=None):
+        self.margin = margin
+        self.on_change = on_change
+        self.sid = sid # Owner, so refresh errors only reach this user
+
+        self.access = None
+        self.refresh_token = None
+        self.expires_at = 0.0 # time.time(); wall clock so it survives restarts
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._timer = None
+
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    # --- Tokens in / out ---
+    def set_tokens(self, token_data):
+        """Adopts a Spotify token response (login or refresh)."""
+        with self._lock:
+            self.access = token_data['access_token']
+            # Spotify only sometimes rotates the refresh token
+            self.refresh_token = token_data.get('refresh_token') or self.refresh_token
+            self.expires_at = time.time() + int(token_data.get('expires_in', 3600))
+            self._schedule_refresh()
+        if self.on_change:
+            self.on_change()
+
+    def restore(self, data):
+        """Takes back what as_dict() returned (persisted before a restart)."""
+        with self._lock:
+            self.access = data.get('access_token')
+            self.refresh_token = data.get('refresh_token')
+            self.expires_at = float(data.get('expires_at', 0))
+            self._schedule_refresh()
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'access_token': self.access,
+                'refresh_token': self.refresh_token,
+                'expires_at': self.expires_at
+            }
+
+    def access_token(self):
+        """Current access token (refreshed first if it already expired), or None."""
+        with self._lock:
+            token, expired = self.access, time.time() >= self.expires_at
+        if token and expired and self.refresh_token:
+            return self.refresh(stale_token=token) or token
+        return token
+
+    def clear(self):
+        with self._lock:
+            self.access = self.refresh_token = None
+            self.expires_at = 0.0
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+    # --- Refresh ---
+    def refresh(self, stale_token=None):
+        """
+        Refreshes the access token. Single-flight: if another caller already replaced
+        `stale_token` while we waited, its result is used instead of refreshing again.
+        Returns the new access token, or None if refreshing failed.
+        """
+        with self._refresh_lock:
+            with self._lock:
+                if stale_token and self.access != stale_token:
+                    return self.access
+                refresh_token = self.refresh_token
+            if not refresh_token:
+                return None
+
+            token_data = refresh_access_token(refresh_token)
+            if 'access_token' not in token_data:
+                self.refresh_failures += 1
+                set_error_state(
+                    401,
+                    "Spotify session expired",
+                    "Failed to refresh access token: " + str(token_data),
+                    sid=self.sid
+                )
+                with self._lock:
+                    self._schedule_refresh(RETRY_DELAY)
+                return None
+
+            self.refreshes += 1
+            self.set_tokens(token_data)
+            print("🔑 [TOKEN] Access token refreshed")
+            return token_data['access_token']
+
+    def _schedule_refresh(self, delay=None):
+        # Caller holds self._lock
+        if self._timer:
+            self._timer.cancel()
+        if not self.refresh_token:
+            return
+        if delay is None:
+            # Never more than half the remaining lifetime early, so short-lived tokens don't refresh in a loop
+            left = self.expires_at - time.time()
+            delay = max(0.0, left - min(self.margin, left / 2))
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self):
+        with self._lock:
+            token = self.access
+        self.refresh(stale_token=token)
+
+    def call(self, func, token=None):
+        """func(token) with one transparent refresh + retry on 401."""
+        token = token or self.access_token()
+        res = func(token)
+        if res.status_code == 401 and self.refresh_token:
+            new_token = self.refresh(stale_token=token)
+            if new_token:
+                res = func(new_token)
+        return res
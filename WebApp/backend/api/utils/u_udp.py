@@ -0,0 +1,178 @@
+import socket
+import struct
+import threading
+import time
+
+# --- Wire format (little endian) ---
+# Request: magic "ST", version, opcode, device id, sequence number        -> 12 bytes
+# Ack:     magic "ST", version, opcode | ACK_FLAG, device id, sequence,
+#          status (HTTP-style code), flags (bit0 voice_active, bit1 hand_active) -> 15 bytes
+MAGIC = b"ST"
+VERSION = 1
+PACKET = struct.Struct("<2sBBII")
+ACK = struct.Struct("<2sBBIIHB")
+ACK_FLAG = 0x80
+
+OP_PLAY = 1
+OP_PAUSE = 2
+OP_NEXT = 3
+OP_PREVIOUS = 4
+OP_VOICE_ON = 5
+OP_VOICE_OFF = 6
+OP_HAND_ON = 7
+OP_HAND_OFF = 8
+OP_STATUS = 9 # No action; the ack carries the module flags
+
+STATUS_STALE = 409 # Sequence older than what we already handled for this device
+
+def encode_packet(opcode, device_id, seq):
+    return PACKET.pack(MAGIC, VERSION, opcode, device_id, seq)
+
+def decode_packet(data):
+    """(opcode, device_id, seq) or None if it isn't one of ours."""
+    if len(data) != PACKET.size:
+        return None
+    magic, version, opcode, device_id, seq = PACKET.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return opcode, device_id, seq
+
+def encode_ack(opcode, device_id, seq, status, voice_active=False, hand_active=False):
+    flags = (1 if voice_active else 0) | (2 if hand_active else 0)
+    return ACK.pack(MAGIC, VERSION, opcode | ACK_FLAG, device_id, seq, status, flags)
+
+def decode_ack(data):
+    """dict or None."""
+    if len(data) != ACK.size:
+        return None
+    magic, version, opcode, device_id, seq, status, flags = ACK.unpack(data)
+    if magic != MAGIC or not opcode & ACK_FLAG:
+        return None
+    return {
+        "opcode": opcode & ~ACK_FLAG,
+        "device_id": device_id,
+        "seq": seq,
+        "status": status,
+        "voice_active": bool(flags & 1),
+        "hand_active": bool(flags & 2)
+    }
+
+def seq_newer(seq, last):
+    # Serial number arithmetic, so the 32 bit counter may wrap
+    return 0 < (seq - last) % 2**32 < 2**31
+
+class DeviceListener:
+    """
+    UDP listener for controller datagrams.
+
+    handler(opcode, device_id) -> (status, voice_active, hand_active) runs once per
+    (device, seq). Devices retransmit until acked, so a repeat of the last handled seq
+    gets the cached ack again instead of running twice; older seqs are acked STALE.
+    A device that was silent for `dedupe_ttl` seconds (or sends seq 0, i.e. rebooted)
+    starts a fresh sequence; its entry is dropped by the next sweep (at most one
+    per `dedupe_ttl`), so ids that stop sending don't pile up.
+    """
+    def __init__(self, handler, host, port, dedupe_ttl=60.0):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.dedupe_ttl = dedupe_ttl
+
+        self._devices = {} # device_id -> (last_seq, last_ack_bytes, last_seen)
+        self._last_sweep = time.monotonic()
+        self._sock = None
+        self._thread = None
+        self._running = False
+
+        self.received = 0
+        self.handled = 0
+        self.duplicates = 0
+        self.stale = 0
+        self.invalid = 0
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((self.host, self.port))
+        self._sock.settimeout(0.5) # So stop() is noticed
+        self.port = self._sock.getsockname()[1]
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name="udp-devices", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2)
+        if self._sock:
+            self._sock.close()
+
+    def _serve(self):
+        while self._running:
+            try:
+                data, addr = self._sock.recvfrom(64)
+            except socket.timeout:
+                self._sweep(time.monotonic())
+                continue
+            except OSError:
+                break
+
+            self.received += 1
+            ack = self.handle_datagram(data)
+            if ack:
+                try:
+                    self._sock.sendto(ack, addr)
+                except OSError as e:
+                    print(f"[UDP] Ack to {addr} failed: {e}")
+
+    def handle_datagram(self, data):
+        """Returns the ack bytes to send back (None for garbage)."""
+        packet = decode_packet(data)
+        if not packet:
+            self.invalid += 1
+            return None
+        opcode, device_id, seq = packet
+
+        now = time.monotonic()
+        self._sweep(now)
+        last = self._devices.get(device_id)
+        if last and seq != 0 and now - last[2] < self.dedupe_ttl:
+            last_seq, last_ack, _ = last
+            if seq == last_seq:
+                self.duplicates += 1
+                self._devices[device_id] = (last_seq, last_ack, now)
+                return last_ack
+            if not seq_newer(seq, last_seq):
+                self.stale += 1
+                return encode_ack(opcode, device_id, seq, STATUS_STALE)
+
+        try:
+            status, voice_active, hand_active = self.handler(opcode, device_id)
+        except Exception as e:
+            print(f"[UDP] Handler failed for opcode {opcode}: {e}")
+            status, voice_active, hand_active = 500, False, False
+
+        self.handled += 1
+        ack = encode_ack(opcode, device_id, seq, status, voice_active, hand_active)
+        self._devices[device_id] = (seq, ack, now)
+        return ack
+
+    def _sweep(self, now):
+        # Only the recv thread touches _devices, so no lock
+        if now - self._last_sweep < self.dedupe_ttl:
+            return
+        self._last_sweep = now
+        expired = [d for d, (_, _, seen) in self._devices.items() if now - seen >= self.dedupe_ttl]
+        for device_id in expired:
+            del self._devices[device_id]
+
+    def stats(self):
+        return {
+            "port": self.port,
+            "devices": len(self._devices),
+            "received": self.received,
+            "handled": self.handled,
+            "duplicates": self.duplicates,
+            "stale": self.stale,
+            "invalid": self.invalid
+        }
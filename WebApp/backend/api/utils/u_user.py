@@ -1,14 +1,11 @@
-import requests
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from CONFIG import Config
+from api.utils.u_spotify import spotify
 
-def get_user_profile(token):
+def get_user_profile(token, client=spotify):
     """Fetches the current user's profile from Spotify"""
     url = f"{Config.API_BASE_URL}/me"
-    headers = {"Authorization": f"Bearer {token}"}
-    
-    response = requests.get(url, headers=headers)
-    return response
\ No newline at end of file
+    return client.get(url, token=token)
\ No newline at end of file
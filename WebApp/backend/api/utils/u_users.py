@@ -0,0 +1,263 @@
+import sys
+import os
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from CONFIG import Config
+from api.utils.u_cache import TTLCache
+from api.utils.u_playback import PlaybackModel
+from api.utils.u_server import errors
+from api.utils.u_spotify import SpotifyClient, spotify
+from api.utils.u_token import TokenManager
+
+SWEEP_INTERVAL = 60 # Seconds between idle sweeps (done on the next store access)
+
+class UserContext:
+    """
+    Everything that belongs to one logged in Spotify account: tokens, the local
+    playback model + its caches, and a small Spotify connection pool. Nothing in
+    here is shared with other users, so they never wait on each other's locks.
+
+    sid identifies the login (browser session cookie, command queue key);
+    device_key lets engines / the ESP32 act for this user without a browser.
+    """
+    def __init__(self, sid, device_key, on_change=None):
+        self.sid = sid
+        self.device_key = device_key
+        self.devices = set() # paired UDP / IMU device ids
+        self.tokens = TokenManager(on_change=on_change, sid=sid)
+        self.spotify = SpotifyClient(pool_size=Config.USER_SPOTIFY_POOL, stats_from=spotify)
+        self.playback = PlaybackModel()
+        self.state_cache = TTLCache(Config.PLAYER_STATE_TTL)
+        self.sections = TTLCache(Config.DASHBOARD_DEVICES_TTL)
+        # Dashboard fan-out; per user, so one user stuck in Spotify backoff can't stall the others
+        self.fanout = ThreadPoolExecutor(max_workers=Config.DASHBOARD_WORKERS, thread_name_prefix=f"dashboard-{sid[:6]}")
+        self.created = time.time()
+        self.last_seen = time.monotonic()
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    def access_token(self):
+        return self.tokens.access_token()
+
+    def call(self, func, token=None):
+        """func(token, client=<this user's pool>) with the token manager's refresh + retry on 401."""
+        return self.tokens.call(lambda t: func(t, client=self.spotify), token)
+
+    def close(self):
+        self.tokens.clear()
+        self.spotify.close()
+        self.fanout.shutdown(wait=False)
+
+    def as_dict(self):
+        return {**self.tokens.as_dict(), "device_key": self.device_key, "devices": sorted(self.devices), "created": self.created}
+
+class UserStore:
+    """
+    Session-keyed UserContexts, bounded two ways:
+    - at most `max_users`; a login beyond that evicts the least recently used user;
+    - users not seen for `idle_timeout` seconds are evicted.
+    Lookups (sid, device key, device id) are dict hits under one short lock.
+    Tokens, device keys and pairings are persisted to `cache_path` (owner-only),
+    so a restart doesn't log anyone out. on_evict(sid) hooks let other modules drop
+    their per-user bookkeeping.
+    """
+    def __init__(self, cache_path=Config.TOKEN_CACHE_FILE, max_users=Config.MAX_USERS,
+                 idle_timeout=Config.USER_IDLE_TIMEOUT):
+        self.cache_path = cache_path
+        self.max_users = max_users
+        self.idle_timeout = idle_timeout
+        self.on_evict = []
+
+        self._users = OrderedDict() # sid -> UserContext, least recently used first
+        self._keys = {}             # device_key -> sid
+        self._devices = {}          # device id -> sid
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.evicted = 0
+
+        self._load()
+
+    def _new_context(self, sid=None, device_key=None):
+        return UserContext(sid or secrets.token_urlsafe(16), device_key or secrets.token_urlsafe(24), on_change=self.save)
+
+    # --- Login / logout ---
+    def login(self, token_data):
+        """New UserContext for a fresh Spotify login."""
+        ctx = self._new_context()
+        ctx.tokens.on_change = None # Saved once below, not once per set_tokens
+        ctx.tokens.set_tokens(token_data)
+        ctx.tokens.on_change = self.save
+        with self._lock:
+            self._add(ctx)
+            evicted = self._evict_over_capacity()
+        self._closed(evicted)
+        self.save()
+        return ctx
+
+    def logout(self, sid):
+        with self._lock:
+            ctx = self._remove(sid)
+        self._closed([ctx] if ctx else [])
+        self.save()
+        return ctx is not None
+
+    def _add(self, ctx):
+        # Caller holds self._lock
+        self._users[ctx.sid] = ctx
+        self._keys[ctx.device_key] = ctx.sid
+        for device_id in ctx.devices:
+            self._devices[device_id] = ctx.sid
+
+    def _remove(self, sid):
+        # Caller holds self._lock
+        ctx = self._users.pop(sid, None)
+        if ctx:
+            self._keys.pop(ctx.device_key, None)
+            for device_id in ctx.devices:
+                if self._devices.get(device_id) == sid:
+                    del self._devices[device_id]
+        return ctx
+
+    # --- Lookups ---
+    def get(self, sid, touch=True):
+        if not sid:
+            return None
+        self._sweep()
+        with self._lock:
+            ctx = self._users.get(sid)
+            if ctx and touch:
+                self._users.move_to_end(sid)
+                ctx.touch()
+        return ctx
+
+    def for_key(self, device_key):
+        with self._lock:
+            sid = self._keys.get(device_key)
+        return self.get(sid)
+
+    def for_device(self, device_id):
+        with self._lock:
+            sid = self._devices.get(str(device_id))
+        return self.get(sid)
+
+    def only(self):
+        """The single logged in user, or None if there are none or several."""
+        with self._lock:
+            if len(self._users) != 1:
+                return None
+            sid = next(iter(self._users))
+        return self.get(sid)
+
+    # --- Devices ---
+    def pair_device(self, sid, device_id):
+        """Commands from this UDP / IMU device id now act for `sid` (a device belongs to one user)."""
+        device_id = str(device_id)
+        with self._lock:
+            ctx = self._users.get(sid)
+            if not ctx:
+                return False
+            previous = self._users.get(self._devices.get(device_id))
+            if previous:
+                previous.devices.discard(device_id)
+            ctx.devices.add(device_id)
+            self._devices[device_id] = sid
+        self.save()
+        return True
+
+    def rotate_key(self, sid):
+        with self._lock:
+            ctx = self._users.get(sid)
+            if not ctx:
+                return None
+            self._keys.pop(ctx.device_key, None)
+            ctx.device_key = secrets.token_urlsafe(24)
+            self._keys[ctx.device_key] = sid
+        self.save()
+        return ctx.device_key
+
+    # --- Eviction ---
+    def _evict_over_capacity(self):
+        # Caller holds self._lock
+        evicted = []
+        while len(self._users) > self.max_users:
+            sid = next(iter(self._users))
+            evicted.append(self._remove(sid))
+        return evicted
+
+    def _sweep(self):
+        now = time.monotonic()
+        if now - self._last_sweep < SWEEP_INTERVAL:
+            return
+        with self._lock:
+            self._last_sweep = now
+            idle = [sid for sid, ctx in self._users.items() if now - ctx.last_seen > self.idle_timeout]
+            evicted = [self._remove(sid) for sid in idle]
+        if evicted:
+            self._closed(evicted)
+            self.save()
+
+    def _closed(self, contexts):
+        for ctx in contexts:
+            self.evicted += 1
+            ctx.close()
+            for hook in self.on_evict:
+                hook(ctx.sid)
+            print(f"👤 [USERS] Session {ctx.sid[:6]}… closed")
+
+    def stats(self):
+        with self._lock:
+            users = list(self._users.values())
+        totals = {"users": len(users), "evicted": self.evicted}
+        for ctx in users:
+            for key, value in ctx.state_cache.stats().items():
+                totals[f"state_cache_{key}"] = totals.get(f"state_cache_{key}", 0) + value
+        return totals
+
+    # --- Persistence ---
+    def _load(self):
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[USERS] Ignoring unreadable token cache: {e}")
+            return
+
+        if 'access_token' in data: # Single-user cache from before sessions existed
+            data = {"users": {data.get('session_id') or secrets.token_urlsafe(16): data}}
+
+        with self._lock:
+            for sid, entry in data.get("users", {}).items():
+                ctx = self._new_context(sid, entry.get('device_key'))
+                ctx.devices.update(entry.get('devices', []))
+                ctx.created = entry.get('created', ctx.created)
+                ctx.tokens.restore(entry)
+                self._add(ctx)
+            evicted = self._evict_over_capacity()
+        self._closed(evicted)
+
+    def save(self):
+        with self._lock:
+            data = {"users": {sid: ctx.as_dict() for sid, ctx in self._users.items()}}
+        with self._io_lock:
+            tmp_path = f"{self.cache_path}.tmp"
+            try:
+                # Owner-only: this file is as good as a login
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.cache_path)
+            except OSError as e:
+                print(f"[USERS] Could not persist token cache: {e}")
+
+users = UserStore()
+users.on_evict.append(errors.forget)
@@ -0,0 +1,97 @@
+import time
+from collections import namedtuple
+
+Event = namedtuple("Event", "source command t priority due")
+
+class GestureArbiter:
+    """
+    Merges the confirmed gestures of several sources (cameras, hands) into one
+    command stream before anything reaches the controller.
+
+    - DEDUPE:   the same command from another source within `dedupe_window` seconds
+                (by capture time) of the last dispatched one is dropped, so two
+                cameras seeing one fist send a single pause. Repeats from the same
+                source are deliberate (its gate already re-armed) and always pass,
+                so a double "next" stays two skips.
+    - PRIORITY: an event is held for `settle` seconds. A different command from a
+                higher-priority source in that time replaces it; one from an equal
+                or lower priority is dropped. After a dispatch, a different command
+                from a lower-priority source within `dedupe_window` is dropped too.
+    settle=0 dispatches at once and only deduplicates.
+    """
+    def __init__(self, priorities=None, dedupe_window=0.6, settle=0.05):
+        self.priorities = dict(priorities or {})
+        self.dedupe_window = dedupe_window
+        self.settle = settle
+        self._held = None
+        self._last = None
+
+        self.received = 0
+        self.dispatched = 0
+        self.duplicates = 0
+        self.overridden = 0
+        self.suppressed = 0
+
+    def submit(self, source, command, t, now=None):
+        """Adds one gesture (t = capture time). Returns the events now due, like poll()."""
+        now = time.time() if now is None else now
+        ready = self.poll(now)
+        self.received += 1
+        priority = self.priorities.get(source, 0)
+
+        last = self._last
+        if last and t - last.t < self.dedupe_window:
+            if command == last.command:
+                if source != last.source:
+                    self.duplicates += 1
+                    return ready
+            elif priority < last.priority:
+                self.suppressed += 1
+                return ready
+
+        held = self._held
+        if held:
+            if command == held.command:
+                if source != held.source:
+                    self.duplicates += 1
+                    return ready
+                # Same source again: both count, the held one goes out now
+                ready += self._release()
+            elif priority <= held.priority:
+                self.suppressed += 1
+                return ready
+            else:
+                self.overridden += 1
+
+        self._held = Event(source, command, t, priority, now + self.settle)
+        return ready + self.poll(now)
+
+    def poll(self, now=None):
+        """Events whose settle time is over, in order. Call at least every next_due() seconds."""
+        now = time.time() if now is None else now
+        held = self._held
+        if not held or held.due > now:
+            return []
+        return self._release()
+
+    def _release(self):
+        held, self._held = self._held, None
+        self._last = held
+        self.dispatched += 1
+        return [held]
+
+    def next_due(self, now=None):
+        """Seconds until the held event is due, or None if nothing is held."""
+        if not self._held:
+            return None
+        now = time.time() if now is None else now
+        return max(0.0, self._held.due - now)
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "dispatched": self.dispatched,
+            "duplicates": self.duplicates,
+            "overridden": self.overridden,
+            "suppressed": self.suppressed
+        }
@@ -0,0 +1,107 @@
+import threading
+import time
+import numpy as np
+
+class AudioCapture:
+    """
+    Reads the microphone on a background thread into a fixed ring of chunks, so
+    audio keeps being recorded while the consumer is busy (e.g. waiting for a
+    recognizer). read() hands out chunks in order; if the consumer falls more than
+    `buffer_seconds` behind, the oldest audio is overwritten and counted in `dropped`.
+
+    open_source() -> context manager whose value has .stream.read(frames), .CHUNK and
+    .SAMPLE_RATE (e.g. speech_recognition.Microphone). The mic is only open between
+    start() and stop().
+    """
+    def __init__(self, open_source, chunk_frames, sample_rate, buffer_seconds=10.0):
+        self.open_source = open_source
+        self.chunk_frames = chunk_frames
+        self.sample_rate = sample_rate
+        self.slots = max(2, int(buffer_seconds * sample_rate / chunk_frames))
+        self._ring = np.zeros((self.slots, chunk_frames), dtype=np.int16)
+        self._write_seq = 0 # next chunk number the capture thread writes
+        self._read_seq = 0  # next chunk number read() returns
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.error = None
+
+        self.captured = 0
+        self.dropped = 0
+
+    @property
+    def chunk_seconds(self):
+        return self.chunk_frames / self.sample_rate
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        if self._running:
+            return
+        with self._cond:
+            self._read_seq = self._write_seq # Don't replay audio from before a pause
+        self.error = None
+        self._running = True
+        self._thread = threading.Thread(target=self._capture, name="audio-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        with self._cond:
+            self._cond.notify_all()
+
+    def _capture(self):
+        try:
+            with self.open_source() as source:
+                print("🎙️ Microphone open")
+                while self._running:
+                    data = source.stream.read(self.chunk_frames)
+                    chunk = np.frombuffer(data, dtype='<i2')
+                    with self._cond:
+                        slot = self._ring[self._write_seq % self.slots]
+                        slot[:len(chunk)] = chunk
+                        slot[len(chunk):] = 0
+                        self._write_seq += 1
+                        self.captured += 1
+                        self._cond.notify()
+        except Exception as e:
+            self.error = e
+            print(f"⚠️ Audio capture stopped: {e}")
+        finally:
+            self._running = False
+            with self._cond:
+                self._cond.notify_all()
+
+    def read(self, timeout=None):
+        """Next chunk as int16 PCM bytes, or None on timeout / when capture isn't running."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._read_seq >= self._write_seq:
+                if not self._running:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+            behind = self._write_seq - self._read_seq
+            if behind > self.slots:
+                self.dropped += behind - self.slots
+                self._read_seq = self._write_seq - self.slots
+
+            chunk = self._ring[self._read_seq % self.slots].tobytes()
+            self._read_seq += 1
+            return chunk
+
+    def backlog(self):
+        """Chunks captured but not read yet."""
+        with self._cond:
+            return min(self._write_seq - self._read_seq, self.slots)
+
+    def report(self):
+        return f"captured {self.captured} chunks | backlog {self.backlog()} | dropped {self.dropped}"
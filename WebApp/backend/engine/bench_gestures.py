@@ -0,0 +1,141 @@
+"""
+Gesture engine benchmark. Runs without a webcam, OpenCV or MediaPipe.
+
+    python bench_gestures.py session.lmk                # replay a real recording
+    python bench_gestures.py --synthetic 20000          # generated stream (CI)
+    python bench_gestures.py --synthetic 20000 --save fixture.lmk
+    python bench_gestures.py --synthetic 20000 --min-fps 5000 --json
+"""
+import argparse
+import json
+import sys
+import numpy as np
+
+from gate import ConfirmationGate, CooldownGate
+from gestures import NONE, PLAY, PAUSE, NEXT, PREVIOUS, NUM_LANDMARKS
+from recording import RECORD_DTYPE, load_recording, write_recording
+from replay import replay
+
+# --- SYNTHETIC HANDS ---
+SPINES = {
+    PLAY: (0.0, -1.0),     # upright, pointing up
+    PAUSE: (0.0, -1.0),    # fist
+    NEXT: (1.0, 0.0),      # fingers pointing right
+    PREVIOUS: (-1.0, 0.0), # fingers pointing left
+    NONE: (0.0, -1.0)      # two fingers up -> no gesture
+}
+EXTENDED = {PLAY: 4, PAUSE: 0, NEXT: 4, PREVIOUS: 4, NONE: 2}
+
+def synthetic_hand(gesture, rng, noise=0.004):
+    """A plausible (21, 3) hand for a gesture code."""
+    d = np.array(SPINES[gesture], dtype=np.float32)
+    p = np.array([-d[1], d[0]], dtype=np.float32)
+    wrist = np.array([0.5, 0.7], dtype=np.float32) + rng.normal(0, 0.02, 2).astype(np.float32)
+
+    lms = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+    lms[0, :2] = wrist
+    for j in range(1, 5): # thumb
+        lms[j, :2] = wrist + p * 0.03 * j + d * 0.02 * j
+
+    for k, mcp in enumerate((5, 9, 13, 17)):
+        base = wrist + d * 0.15 + p * (k - 1) * 0.035
+        extended = k < EXTENDED[gesture]
+        lms[mcp, :2] = base
+        lms[mcp + 1, :2] = base + d * 0.06                  # pip
+        lms[mcp + 2, :2] = base + d * (0.1 if extended else 0.02)
+        lms[mcp + 3, :2] = base + d * 0.14 if extended else wrist + d * 0.12
+
+    lms[:, :2] += rng.normal(0, noise, (NUM_LANDMARKS, 2)).astype(np.float32)
+    return lms
+
+def synthetic_stream(frames, fps=30.0, seed=0):
+    """Random holds of each gesture (and empty frames), like a person using the camera."""
+    rng = np.random.default_rng(seed)
+    records = np.zeros(frames, dtype=RECORD_DTYPE)
+    records["t"] = 1_700_000_000.0 + np.arange(frames) / fps
+
+    i = 0
+    choices = [NONE, PLAY, PAUSE, NEXT, PREVIOUS, -1] # -1 = no hand
+    while i < frames:
+        gesture = choices[rng.integers(len(choices))]
+        hold = min(int(rng.integers(5, 60)), frames - i)
+        if gesture >= 0:
+            records["present"][i:i + hold] = 1
+            for j in range(i, i + hold):
+                records["lm"][j] = synthetic_hand(gesture, rng)
+        i += hold
+    return records
+
+# --- REPORT ---
+def make_gate(args):
+    if args.gate == "cooldown":
+        return CooldownGate(args.cooldown)
+    return ConfirmationGate(args.window, args.votes, args.release, args.rearm)
+
+def run(records, args, label):
+    frame_mode = replay(records, make_gate(args), per_frame=True)
+    batch_mode = replay(records, make_gate(args), per_frame=False)
+
+    if frame_mode.commands != batch_mode.commands:
+        raise AssertionError("per-frame and batch classification disagree")
+
+    return {
+        "source": label,
+        "frames": frame_mode.frames,
+        "fps": round(frame_mode.fps, 1),
+        "batch_fps": round(batch_mode.fps, 1),
+        "latency_us": frame_mode.percentiles_us(),
+        "commands": frame_mode.command_counts(),
+        "command_log": [(i, c) for i, _, c in frame_mode.commands]
+    }
+
+def print_report(report):
+    print(f"📼 {report['source']} ({report['frames']} frames)")
+    print(f"   per-frame: {report['fps']:>12,.1f} fps  latency {report['latency_us']} µs")
+    print(f"   batch:     {report['batch_fps']:>12,.1f} fps")
+    print(f"   commands:  {report['commands'] or 'none'}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay landmark streams through the gesture engine.")
+    parser.add_argument("recordings", nargs="*", help="landmark recordings (.lmk)")
+    parser.add_argument("--synthetic", type=int, metavar="FRAMES", help="benchmark a generated stream")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="PATH", help="write the synthetic stream as a recording")
+    parser.add_argument("--gate", choices=("confirm", "cooldown"), default="confirm",
+                        help="k-of-n confirmation (engine default) or the legacy 1s cooldown")
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--votes", type=int, default=3)
+    parser.add_argument("--release", type=int, default=1)
+    parser.add_argument("--rearm", type=int, default=5)
+    parser.add_argument("--cooldown", type=float, default=1.0)
+    parser.add_argument("--min-fps", type=float, default=0, help="exit 1 if per-frame fps is below this")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    sources = []
+    if args.synthetic:
+        records = synthetic_stream(args.synthetic, seed=args.seed)
+        if args.save:
+            write_recording(args.save, records["t"], records["lm"], records["present"])
+        sources.append((f"synthetic seed={args.seed}", records))
+    for path in args.recordings:
+        sources.append((path, load_recording(path)))
+
+    if not sources:
+        parser.error("give at least one recording or --synthetic FRAMES")
+
+    reports = [run(records, args, label) for label, records in sources]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            print_report(report)
+
+    slow = [r for r in reports if r["fps"] < args.min_fps]
+    for r in slow:
+        print(f"❌ {r['source']}: {r['fps']} fps < {args.min_fps} fps", file=sys.stderr)
+    return 1 if slow else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+ROI mode benchmark: MediaPipe on our own hand crop (static image mode) vs MediaPipe's
+built-in tracking on the full frame, on the same frames. Needs OpenCV + MediaPipe.
+
+    python bench_roi.py clip.mp4                 # a recorded clip (hand moving + gestures)
+    python bench_roi.py 0 --frames 300           # live from camera 0 (frames are buffered first)
+    python bench_roi.py clip.mp4 --json
+
+Reports ms per frame (mean / p95) and the share of frames with a hand for each mode;
+turn ROI mode on (STARTIFY_HAND_ROI=1) only if it is faster without losing detections.
+"""
+import argparse
+import json
+import time
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from gestures import landmarks_to_array
+from roi import HandROI
+from hand_tracking import ROI_EXPAND, ROI_SIZE, SEARCH_SIZE
+
+def read_frames(source, limit):
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    frames = []
+    while len(frames) < limit:
+        ok, img = cap.read()
+        if not ok:
+            break
+        frames.append(img)
+    cap.release()
+    return frames
+
+def run(frames, roi_mode):
+    hands = mp.solutions.hands.Hands(
+        static_image_mode=roi_mode,
+        max_num_hands=1,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5
+    )
+    roi = HandROI(expand=ROI_EXPAND, roi_size=ROI_SIZE, search_size=SEARCH_SIZE) if roi_mode else None
+    timings = []
+    detected = 0
+
+    for img in frames:
+        start = time.perf_counter()
+        patch, window = roi.crop(img) if roi else (img, None)
+        results = hands.process(cv2.cvtColor(patch, cv2.COLOR_BGR2RGB))
+        landmarks = None
+        if results.multi_hand_landmarks:
+            landmarks = landmarks_to_array(results.multi_hand_landmarks[0].landmark)
+            if window:
+                landmarks = roi.to_full(landmarks, window)
+        if roi:
+            roi.update(landmarks, img.shape)
+        timings.append(time.perf_counter() - start)
+        detected += landmarks is not None
+
+    hands.close()
+    ms = np.array(timings) * 1000
+    result = {
+        "frames": len(frames),
+        "mean_ms": round(float(ms.mean()), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "detected": round(detected / len(frames), 3)
+    }
+    if roi:
+        result.update({"roi_frames": roi.roi_frames, "search_frames": roi.search_frames})
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="video file or camera index")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    frames = read_frames(args.source, args.frames)
+    if not frames:
+        parser.error(f"no frames read from {args.source}")
+
+    results = {"tracking": run(frames, roi_mode=False), "roi": run(frames, roi_mode=True)}
+    saving = 1 - results["roi"]["mean_ms"] / results["tracking"]["mean_ms"]
+    results["roi_cpu_saving"] = round(saving, 3)
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    for name in ("tracking", "roi"):
+        r = results[name]
+        print(f"{name:9s} {r['mean_ms']:7.2f} ms/frame (p95 {r['p95_ms']:.2f})  hand in {r['detected']:.0%} of {r['frames']} frames")
+    print(f"ROI mode saves {saving:.0%} per frame" if saving > 0 else f"ROI mode costs {-saving:.0%} more per frame")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Voice recognizer benchmark over WAV fixtures.
+
+    python bench_voice.py fixtures/ --backend vosk --model models/vosk-model-small-en-us-0.15
+    python bench_voice.py fixtures/ --backend google --json
+
+Fixtures are WAV files named after the spoken word: play_01.wav, skip_3.wav,
+back-quiet.wav ... (anything else, e.g. noise_01.wav, is expected to give no command).
+Each file is streamed in --chunk-ms chunks like the live microphone. Reported per
+command: accuracy and latency from speech onset (first chunk over --threshold) to the
+moment the command fired, i.e. audio that had to be heard plus recognizer compute time.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import wave
+import numpy as np
+
+from speech import KEYWORDS, chunk_rms, create_recognizer
+
+def read_wav(path, sample_rate):
+    """Mono 16-bit PCM bytes at sample_rate (downmixed / resampled if needed)."""
+    with wave.open(path, 'rb') as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit WAV is supported")
+        rate, channels = f.getframerate(), f.getnchannels()
+        audio = np.frombuffer(f.readframes(f.getnframes()), dtype='<i2')
+
+    audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != sample_rate:
+        n = int(len(audio) * sample_rate / rate)
+        audio = np.interp(np.linspace(0, len(audio) - 1, n), np.arange(len(audio)), audio)
+    return audio.astype('<i2').tobytes()
+
+def expected_command(path):
+    word = os.path.basename(path).split('.')[0].split('_')[0].split('-')[0].lower()
+    return KEYWORDS.get(word)
+
+def run_file(backend, pcm, sample_rate, chunk_ms, threshold):
+    chunk_bytes = sample_rate * chunk_ms // 1000 * 2
+    onset = None
+    compute = 0.0
+    backend.start()
+
+    for offset in range(0, len(pcm), chunk_bytes):
+        chunk = pcm[offset:offset + chunk_bytes]
+        position_ms = (offset + len(chunk)) / 2 / sample_rate * 1000
+        if onset is None and chunk_rms(chunk) > threshold:
+            onset = offset / 2 / sample_rate * 1000
+
+        start = time.perf_counter()
+        command = backend.accept(chunk)
+        elapsed = time.perf_counter() - start
+        compute += elapsed
+        if command:
+            return command, position_ms - (onset or 0) + elapsed * 1000, compute, True
+
+    start = time.perf_counter()
+    command = backend.finish()
+    elapsed = time.perf_counter() - start
+    compute += elapsed
+    position_ms = len(pcm) / 2 / sample_rate * 1000
+    return command, position_ms - (onset or 0) + elapsed * 1000, compute, False
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency / accuracy of voice backends on WAV fixtures")
+    parser.add_argument("fixtures", nargs="+", help="WAV files or directories of them")
+    parser.add_argument("--backend", default="vosk", choices=["vosk", "google"])
+    parser.add_argument("--model", default=os.getenv("STARTIFY_VOSK_MODEL"), help="Vosk model directory")
+    parser.add_argument("--rate", type=int, default=16000)
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument("--threshold", type=float, default=300, help="RMS that marks speech onset")
+    parser.add_argument("--min-accuracy", type=float, default=None, help="exit 1 below this (0-1)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    paths = []
+    for item in args.fixtures:
+        if os.path.isdir(item):
+            paths += sorted(os.path.join(item, f) for f in os.listdir(item) if f.lower().endswith('.wav'))
+        else:
+            paths.append(item)
+    if not paths:
+        parser.error("no WAV fixtures found")
+
+    backend = create_recognizer(args.backend, args.rate, args.model)
+
+    results = []
+    for path in paths:
+        expected = expected_command(path)
+        command, latency_ms, compute, early = run_file(backend, read_wav(path, args.rate), args.rate, args.chunk_ms, args.threshold)
+        results.append({
+            "file": os.path.basename(path),
+            "expected": expected,
+            "got": command,
+            "ok": command == expected,
+            "latency_ms": round(latency_ms, 1),
+            "compute_ms": round(compute * 1000, 1),
+            "early": early
+        })
+
+    per_command = {}
+    for label in sorted({r["expected"] or "none" for r in results}):
+        rows = [r for r in results if (r["expected"] or "none") == label]
+        hits = [r["latency_ms"] for r in rows if r["ok"] and r["got"]]
+        per_command[label] = {
+            "n": len(rows),
+            "accuracy": round(sum(r["ok"] for r in rows) / len(rows), 3),
+            "latency_p50_ms": round(float(np.percentile(hits, 50)), 1) if hits else None,
+            "latency_max_ms": round(max(hits), 1) if hits else None,
+            "early_fires": sum(r["early"] for r in rows)
+        }
+    accuracy = sum(r["ok"] for r in results) / len(results)
+    report = {"backend": backend.name, "files": len(results), "accuracy": round(accuracy, 3),
+              "commands": per_command, "results": results}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for r in results:
+            mark = "✅" if r["ok"] else "❌"
+            print(f"{mark} {r['file']:<28} expected {str(r['expected']):<9} got {str(r['got']):<9} "
+                  f"{r['latency_ms']:>7} ms{' (early)' if r['early'] else ''}")
+        print(f"\n📊 {backend.name}: {len(results)} files, accuracy {accuracy:.1%}")
+        for label, s in per_command.items():
+            print(f"   {label:<9} n={s['n']:<3} acc {s['accuracy']:.0%}  p50 {s['latency_p50_ms']} ms  "
+                  f"max {s['latency_max_ms']} ms  early {s['early_fires']}")
+
+    if args.min_accuracy is not None and accuracy < args.min_accuracy:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,109 @@
+import os
 import requests
+import threading
 import time
+import uuid
+from collections import deque
+from requests.adapters import HTTPAdapter
 
 # The Address of your Flask Brain
 BASE_URL = "http://127.0.0.1:5000/api"
+# Which user's Spotify the commands go to (POST /api/session/device-key); unset only works with STARTIFY_SINGLE_USER_FALLBACK=1
+DEVICE_KEY = os.getenv("STARTIFY_DEVICE_KEY")
 
-class SystemController:
+# --- NETWORK ---
+CONNECT_TIMEOUT = 0.5  # Seconds; the backend is local, anything slower means it's down
+READ_TIMEOUT = 5.0  # Seconds; covers the backend's own Spotify round trip
+COMMAND_QUEUE_SIZE = 8  # Pending commands; the oldest is dropped when full
+WATCH_TIMEOUT = 25  # Seconds the backend may hold a /status/watch long-poll
+WATCH_RETRY = 1.0  # Seconds to wait before re-subscribing after an error
+
+# play/pause set a state, so only the latest pending one matters.
+# next/previous are cumulative and are never merged.
+STATE_COMMANDS = ("play", "pause")
+
+class DeliveryStats:
+    """Counters + latency (enqueue -> backend response) for dispatched commands."""
     def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def record(self, elapsed_s, ok):
+        ms = elapsed_s * 1000.0
+        if ok:
+            self.sent += 1
+        else:
+            self.failed += 1
+        self.total_ms += ms
+        self.last_ms = ms
+        self.max_ms = max(self.max_ms, ms)
+
+    @property
+    def avg_ms(self):
+        done = self.sent + self.failed
+        return self.total_ms / done if done else 0.0
+
+    def as_dict(self):
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "avg_ms": round(self.avg_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+            "last_ms": round(self.last_ms, 2)
+        }
+
+class SystemController:
+    def __init__(self, coalesce=True, name=None):
+        self.source = f"engine:{name}" if name else None # X-Command-Source on every command
         self.voice_active = False
         self.hand_active = False
         self.last_poll = 0
-        self.poll_rate = 1.0 
+        self.poll_rate = 1.0
+
+        # Status subscription (long-poll on /status/watch); falls back to polling
+        self.status_version = None
+        self._watching = False
+        self._watch_thread = None
+        self._status_changed = threading.Condition()
+
+        # One keep-alive connection pool for every call to the backend
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if DEVICE_KEY:
+            self.session.headers["X-Device-Key"] = DEVICE_KEY
+        self.timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+        # Background dispatch: send_command() only enqueues
+        self.coalesce = coalesce
+        self.stats = DeliveryStats()
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self._worker = threading.Thread(target=self._dispatch_loop, name="controller-dispatch", daemon=True)
+        self._worker.start()
 
     def sync_system_status(self):
+        # Subscribed: the watcher thread keeps the flags current, no request needed
+        if self._watch_thread is None:
+            self.subscribe()
+        if self._watching:
+            return self.voice_active, self.hand_active
+
         if time.time() - self.last_poll < self.poll_rate:
             return self.voice_active, self.hand_active
 
         try:
-            res = requests.get(f"{BASE_URL}/status")
+            res = self.session.get(f"{BASE_URL}/status", timeout=self.timeout)
             if res.status_code == 200:
                 data = res.json()
                 self.voice_active = data.get('voice_active', False)
@@ -27,30 +114,162 @@ class SystemController:
             # if server is down, default to inactive
             self.voice_active = False
             self.hand_active = False
-        
+
         return self.voice_active, self.hand_active
 
+    # --- Status Subscription ---
+    def subscribe(self):
+        """Starts following status changes from the backend in the background."""
+        if self._watch_thread is not None:
+            return
+        self._watching = True
+        self._watch_thread = threading.Thread(target=self._watch_loop, name="controller-watch", daemon=True)
+        self._watch_thread.start()
+
+    def _watch_loop(self):
+        session = requests.Session() # The long-poll parks a connection; keep it off the command pool
+        url = f"{BASE_URL}/status/watch"
+
+        while not self._closed:
+            params = {"timeout": WATCH_TIMEOUT}
+            if self.status_version is not None:
+                params["since"] = self.status_version
+            try:
+                res = session.get(url, params=params, timeout=(CONNECT_TIMEOUT, WATCH_TIMEOUT + 5))
+                if res.status_code == 404:
+                    print("[CONTROLLER] Backend has no /status/watch, falling back to polling")
+                    self._watching = False
+                    break
+                if res.status_code == 200:
+                    self._apply_status(res.json())
+                    continue
+            except Exception as e:
+                print(f"❌ [CONTROLLER] Sync Failed: {e}")
+                self._apply_status({}) # if server is down, default to inactive
+            time.sleep(WATCH_RETRY)
+
+        session.close()
+
+    def _apply_status(self, data):
+        with self._status_changed:
+            self.status_version = data.get('version')
+            self.voice_active = data.get('voice_active', False)
+            self.hand_active = data.get('hand_active', False)
+            self.last_poll = time.time()
+            self._status_changed.notify_all()
+
+    def wait_for_status_change(self, timeout):
+        """Sleeps until the backend reports a change (or timeout). Replaces time.sleep() in idle loops."""
+        if not self._watching:
+            time.sleep(timeout)
+            return
+        with self._status_changed:
+            version = self.status_version
+            self._status_changed.wait_for(lambda: self.status_version != version, timeout)
+
     def set_engine_status(self, module_name, is_ready):
         url = f"{BASE_URL}/engine/status"
         try:
             payload = {"module": module_name, "ready": is_ready}
-            requests.post(url, json=payload)
+            self.session.post(url, json=payload, timeout=self.timeout)
             state = "ONLINE" if is_ready else "OFFLINE"
             print(f"📡 [CONTROLLER] {module_name} is {state}")
         except Exception as e:
             print(f"[CONTROLLER] Heartbeat Failed: {e}")
 
-    def send_command(self, command):
-        print(f"[CONTROLLER] Sending: {command.upper()}")
+    # --- Commands ---
+    def send_command(self, command, origin=None):
+        """
+        Queues a command and returns immediately. Delivery happens on the dispatch thread.
+        origin: time.time() of the camera frame / utterance it came from (default: now).
+        The backend gets a correlation id and the command's age, so it can report
+        gesture-to-music latency per stage.
+        """
+        item = (command, time.perf_counter(), uuid.uuid4().hex[:12], origin or time.time())
+        with self._cond:
+            if self._closed:
+                return
+            last = self._pending[-1][0] if self._pending else None
+
+            if self.coalesce and last in STATE_COMMANDS and command in STATE_COMMANDS:
+                # e.g. pending "pause" then "play" -> only "play" is worth sending
+                self._pending[-1] = item
+                self.stats.coalesced += 1
+            else:
+                if len(self._pending) >= COMMAND_QUEUE_SIZE:
+                    self._pending.popleft()
+                    self.stats.dropped += 1
+                self._pending.append(item)
+
+            self._cond.notify()
+        print(f"[CONTROLLER] Queued: {command.upper()}")
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                command, queued_at, trace_id, origin = self._pending.popleft()
+                self._busy = True
+
+            ok = self._post_command(command, trace_id, origin)
+            self.stats.record(time.perf_counter() - queued_at, ok)
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _post_command(self, command, trace_id, origin):
+        print(f"[CONTROLLER] Sending: {command.upper()} ({trace_id})")
+        headers = {
+            "X-Correlation-Id": trace_id,
+            "X-Trace-Age-Ms": f"{(time.time() - origin) * 1000:.1f}"
+        }
+        if self.source:
+            headers["X-Command-Source"] = self.source
         try:
-            res = requests.post(f"{BASE_URL}/player/{command}")
-            if res.status_code != 200:
+            res = self.session.post(f"{BASE_URL}/player/{command}", headers=headers, timeout=self.timeout)
+            if res.status_code not in (200, 202):
                 print(f"[CONTROLLER] Command Failed: {res.text}")
+                return False
+            return True
         except Exception as e:
             print(f"[CONTROLLER] Network Error: {e}")
+            return False
+
+    def flush(self, timeout=None):
+        """Blocks until every queued command was delivered (or timeout). Returns True if drained."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, timeout=2.0):
+        """Delivers what's still queued, then stops the dispatch thread and the session."""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._cond.notify_all()
+        self._worker.join(timeout)
+        self.session.close()
+        # The watcher may be parked in a long-poll; it's a daemon and exits on its next wake-up
+
+    def report_metrics(self, engine, snapshot):
+        """Sends engine timings (e.g. FramePipeline.snapshot()) to the backend's /api/metrics."""
+        payload = {"engine": engine, "metrics": {**snapshot, "delivery": self.stats.as_dict()}}
+        try:
+            self.session.post(f"{BASE_URL}/engine/metrics", json=payload, timeout=self.timeout)
+        except Exception as e:
+            print(f"[CONTROLLER] Metrics Report Failed: {e}")
+
+    def report(self):
+        s = self.stats.as_dict()
+        return (f"📡 [CONTROLLER] sent {s['sent']}, failed {s['failed']}, dropped {s['dropped']}, "
+                f"coalesced {s['coalesced']} | delivery avg {s['avg_ms']}ms (max {s['max_ms']})")
 
     # --- Shortcuts ---
-    def play(self): self.send_command('play')
-    def pause(self): self.send_command('pause')
-    def next(self): self.send_command('next')
-    def previous(self): self.send_command('previous')
\ No newline at end of file
+    def play(self, origin=None): self.send_command('play', origin)
+    def pause(self, origin=None): self.send_command('pause', origin)
+    def next(self, origin=None): self.send_command('next', origin)
+    def previous(self, origin=None): self.send_command('previous', origin)
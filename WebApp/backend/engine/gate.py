@@ -0,0 +1,113 @@
+from gestures import GESTURES, NONE
+
+class CooldownGate:
+    """
+    Decides which per-frame gestures actually become commands.
+
+    A gesture fires only if COOLDOWN seconds passed since the last command
+    and it differs from the last command (prevents spamming the same one).
+    """
+    def __init__(self, cooldown=1.0):
+        self.cooldown = cooldown
+        self.reset()
+
+    def reset(self):
+        self.last_command_time = 0
+        self.last_command_name = "None"
+
+    def update(self, gesture, now):
+        """Feed one frame's gesture (or None). Returns the command to send, or None."""
+        if not gesture:
+            return None
+
+        if now - self.last_command_time > self.cooldown:
+            if gesture != self.last_command_name:
+                self.last_command_time = now
+                self.last_command_name = gesture
+                return gesture
+
+        return None
+
+class ConfirmationGate:
+    """
+    k-of-n voting over a ring buffer of the last `window` per-frame gestures.
+
+    - FIRE:    a gesture fires once it holds at least `votes` of the window.
+    - RELEASE: it stays held until its share drops to `release` votes or fewer;
+               nothing else fires while a gesture is held (hysteresis, so a
+               hand wobbling between two poses doesn't alternate commands).
+    - RE-ARM:  the same command fires again only after it was absent for
+               `rearm_frames` consecutive frames. A different gesture fires
+               as soon as it is confirmed.
+
+    Single-frame misclassifications never reach `votes`, so flicker is ignored.
+    Timestamps are accepted for interface parity with CooldownGate but unused.
+    """
+    def __init__(self, window=5, votes=3, release=1, rearm_frames=5):
+        if not 1 <= votes <= window:
+            raise ValueError(f"votes must be between 1 and window ({window}), got {votes}")
+        if not 0 <= release < votes:
+            raise ValueError(f"release must be below votes ({votes}), got {release}")
+
+        self.window = window
+        self.votes = votes
+        self.release = release
+        self.rearm_frames = rearm_frames
+        self._codes = {name: code for code, name in enumerate(GESTURES)}
+        self.reset()
+
+    def reset(self):
+        self._ring = [NONE] * self.window
+        self._pos = 0
+        self._counts = [0] * len(GESTURES)
+        self._counts[NONE] = self.window
+        self.held = NONE
+        self.last_fired = NONE
+        self.absent = 0 # consecutive frames without last_fired
+        self.armed = True
+
+    def rearm(self):
+        """Forget that the last command fired (it was never sent), so a still-held gesture fires again."""
+        self.held = NONE
+        self.armed = True
+
+    def update(self, gesture, now=None):
+        """Feed one frame's gesture (or None). Returns the command to send, or None."""
+        code = self._codes.get(gesture, NONE)
+
+        # Ring buffer: overwrite the oldest slot, keep vote counts in sync
+        counts = self._counts
+        counts[self._ring[self._pos]] -= 1
+        counts[code] += 1
+        self._ring[self._pos] = code
+        self._pos = (self._pos + 1) % self.window
+
+        if code == self.last_fired:
+            self.absent = 0
+        else:
+            self.absent += 1
+            if self.absent >= self.rearm_frames:
+                self.armed = True
+
+        # Nothing new fires until the held gesture has been released
+        if self.held != NONE:
+            if counts[self.held] > self.release:
+                return None
+            self.held = NONE
+
+        # Strongest real gesture in the window
+        best, best_votes = NONE, 0
+        for c in range(1, len(counts)):
+            if counts[c] > best_votes:
+                best, best_votes = c, counts[c]
+
+        if best_votes < self.votes:
+            return None
+        if best == self.last_fired and not self.armed:
+            return None
+
+        self.held = best
+        self.last_fired = best
+        self.absent = 0
+        self.armed = False
+        return GESTURES[best]
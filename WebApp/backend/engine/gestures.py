@@ -0,0 +1,82 @@
+import numpy as np
+
+# --- LANDMARK LAYOUT (MediaPipe Hands) ---
+NUM_LANDMARKS = 21
+WRIST = 0
+MIDDLE_BASE = 9
+FINGER_TIPS = np.array([8, 12, 16, 20]) # Index, Middle, Ring, Pinky
+FINGER_PIPS = np.array([6, 10, 14, 18]) # Knuckles
+
+# --- GESTURE CODES ---
+# Classification works on int codes so whole batches stay inside NumPy.
+NONE, PLAY, PAUSE, NEXT, PREVIOUS = range(5)
+GESTURES = (None, "play", "pause", "next", "previous")
+
+def landmarks_to_array(landmarks):
+    """
+    Converts MediaPipe landmarks into a (21, 3) float32 array of (x, y, z).
+    Do this once per frame; everything below works on the array.
+    """
+    flat = np.fromiter(
+        (c for lm in landmarks for c in (lm.x, lm.y, lm.z)),
+        dtype=np.float32,
+        count=NUM_LANDMARKS * 3
+    )
+    return flat.reshape(NUM_LANDMARKS, 3)
+
+def as_array(landmarks):
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    return landmarks_to_array(landmarks)
+
+def finger_states(lms):
+    """
+    Extended/folded flags for the 4 fingers (thumb excluded for simplicity).
+    lms: (..., 21, 3) -> bool (..., 4)
+
+    "Extended" means the tip is further from the wrist than the knuckle is,
+    which works regardless of hand rotation. Squared distances, no sqrt needed.
+    """
+    xy = lms[..., :2]
+    wrist = xy[..., WRIST:WRIST + 1, :]
+    dist_tip = ((xy[..., FINGER_TIPS, :] - wrist) ** 2).sum(axis=-1)
+    dist_pip = ((xy[..., FINGER_PIPS, :] - wrist) ** 2).sum(axis=-1)
+    return dist_tip > dist_pip
+
+def classify(lms):
+    """
+    Gesture codes for one hand (21, 3) or a batch (N, 21, 3).
+
+    - FIST (0 fingers)            -> PAUSE
+    - OPEN PALM (3+), upright     -> PLAY (only if pointing UP, y decreases going up)
+    - OPEN PALM (3+), sideways    -> NEXT (fingers right) / PREVIOUS (fingers left)
+    """
+    lms = np.asarray(lms, dtype=np.float32)
+    count = finger_states(lms).sum(axis=-1)
+
+    # Wrist -> Middle Finger Base is the "Spine" of the hand
+    delta_x = lms[..., MIDDLE_BASE, 0] - lms[..., WRIST, 0]
+    delta_y = lms[..., MIDDLE_BASE, 1] - lms[..., WRIST, 1]
+
+    open_palm = count >= 3
+    sideways = np.abs(delta_x) > np.abs(delta_y)
+
+    return np.select(
+        [count < 1,
+         open_palm & sideways & (delta_x > 0),
+         open_palm & sideways,
+         open_palm & (delta_y < 0)],
+        [PAUSE, NEXT, PREVIOUS, PLAY],
+        default=NONE
+    ).astype(np.int8)
+
+def count_fingers(landmarks):
+    """
+    Counts extended fingers. Returns (count, list_of_status).
+    """
+    status = finger_states(as_array(landmarks)).astype(int).tolist()
+    return sum(status), status
+
+def detect_gesture(landmarks):
+    """Gesture name ("play", "pause", "next", "previous") or None for a single hand."""
+    return GESTURES[int(classify(as_array(landmarks)))]
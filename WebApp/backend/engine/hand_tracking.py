@@ -1,166 +1,205 @@
 import cv2
 import mediapipe as mp
+import os
 import time
 from controller import SystemController
+from pipeline import FramePipeline
+from gestures import detect_gesture, landmarks_to_array
+from gate import ConfirmationGate
+from recording import LandmarkRecorder
+from roi import HandROI
+from scheduler import AdaptiveRateScheduler
 
 MODULE_NAME = "hand"
 
 # --- CONFIGURATION ---
-COMMAND_COOLDOWN = 1  # Seconds between commands
+# Gesture confirmation (frames, not seconds): a gesture fires once it wins
+# CONFIRM_VOTES of the last CONFIRM_WINDOW frames, is held until it drops to
+# RELEASE_VOTES, and can repeat only after REARM_FRAMES frames without it.
+CONFIRM_WINDOW = 5
+CONFIRM_VOTES = 3
+RELEASE_VOTES = 1
+REARM_FRAMES = 5
+MAX_FRAME_AGE = 0.25  # Frames older than this are skipped by inference
+MAX_COMMAND_AGE = 0.5  # Commands older than this (since capture) are never sent
+# ROI mode: after a detection, only a crop around the hand goes through MediaPipe.
+# The crop moves every frame, so MediaPipe then runs in static image mode (its own
+# tracking assumes one coordinate frame). Off by default: MediaPipe's tracking already
+# crops around the hand; compare both on your camera with bench_roi.py first.
+ROI_MODE = os.getenv("STARTIFY_HAND_ROI", "0") == "1"
+ROI_EXPAND = 1.6  # Crop = hand bounding box grown by this factor
+ROI_SIZE = 224  # Longest side (px) of the crop fed to MediaPipe
+SEARCH_SIZE = 480  # Longest side (px) of the full-frame search when no hand is tracked
+# Idle scheduling: with no hand for IDLE_AFTER seconds, only probe a frame every
+# PROBE_INTERVAL seconds, and skip MediaPipe unless the probe shows motion
+IDLE_AFTER = 3.0
+PROBE_INTERVAL = 0.5
+MOTION_GATE = True
+MOTION_THRESHOLD = 6.0  # Mean abs pixel difference (0-255) of a 64x48 thumbnail
+STATS_INTERVAL = 10  # Seconds between pipeline timing reports (console + backend /api/metrics)
+RECORD_PATH = os.getenv("STARTIFY_RECORD")  # If set, landmarks are recorded here for replay/benchmarks
 
-def count_fingers(landmarks):
+def main(controller=None, stop_event=None, show_window=True):
     """
-    Counts extended fingers. Returns (count, list_of_status).
+    Runs the engine until 'q', Ctrl+C or stop_event. When hosted by the backend, it passes
+    an in-process controller and a stop event, and usually no window.
     """
-    finger_tips = [8, 12, 16, 20] # Index, Middle, Ring, Pinky
-    finger_pips = [6, 10, 14, 18] # Knuckles
+    controller = controller or SystemController(name=MODULE_NAME)
     
-    status = []
-    
-    # Check 4 Fingers (Excluding Thumb for simplicity)
-    for tip, pip in zip(finger_tips, finger_pips):
-        # In screen coordinates, Y=0 is top. So Tip < Pip means extended UP.
-        # But since hand might be rotated, we calculate distance from wrist instead.
-        # However, for this specific logic, simpler is better:
-        
-        # We assume "Extended" means the tip is further from the wrist than the knuckle is.
-        # (This works regardless of rotation)
-        wrist = landmarks[0]
-        
-        # Euclidean distance squared (faster than sqrt)
-        dist_tip = (landmarks[tip].x - wrist.x)**2 + (landmarks[tip].y - wrist.y)**2
-        dist_pip = (landmarks[pip].x - wrist.x)**2 + (landmarks[pip].y - wrist.y)**2
-        
-        if dist_tip > dist_pip:
-            status.append(1) # Extended
-        else:
-            status.append(0) # Folded
-            
-    return sum(status), status
-
-def detect_gesture(landmarks):
-    count, _ = count_fingers(landmarks)
-    
-    # 1. FIST (0 fingers extended) -> PAUSE
-    # We use < 2 to be lenient (sometimes pinky doesn't close fully)
-    if count < 1:
-        return "pause"
-    
-    # 2. OPEN PALM (4 or 5 fingers) -> CHECK ROTATION
-    if count >= 3:
-        # Get coordinates of Wrist (0) and Middle Finger Base (9)
-        # We use these to determine the "Spine" of the hand
-        wrist = landmarks[0]
-        middle_base = landmarks[9]
-        
-        delta_x = middle_base.x - wrist.x
-        delta_y = middle_base.y - wrist.y
-        
-        # Check Orientation
-        # If Horizontal Distance > Vertical Distance -> Hand is Rotated (Sideways)
-        if abs(delta_x) > abs(delta_y):
-            # ROTATED
-            if delta_x > 0:
-                # Base is to the RIGHT of wrist (Fingers pointing RIGHT)
-                # This mimics "Clockwise" rotation for Right Hand
-                return "next"
-            else:
-                # Base is to the LEFT of wrist (Fingers pointing LEFT)
-                # This mimics "Anticlockwise" rotation
-                return "previous"
-        else:
-            # UPRIGHT (Vertical Distance is larger)
-            # Only play if hand is pointing UP (y decreases going up)
-            if delta_y < 0:
-                return "play"
-            
-    return None
-
-def main():
-    controller = SystemController()
-    
-    print("📷 Initializing Camera...")
-    cap = cv2.VideoCapture(0)
+    # Opened by the capture thread; released while the module is toggled off
+    def open_camera():
+        print("📷 Initializing Camera...")
+        cap = cv2.VideoCapture(0)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1) # Don't let the driver queue up old frames
+        return cap
     
     mp_hands = mp.solutions.hands
     hands = mp_hands.Hands(
+        static_image_mode=ROI_MODE,
         max_num_hands=1,
         min_detection_confidence=0.7,
         min_tracking_confidence=0.5
     )
     mp_draw = mp.solutions.drawing_utils
 
+    gate = ConfirmationGate(CONFIRM_WINDOW, CONFIRM_VOTES, RELEASE_VOTES, REARM_FRAMES)
+    recorder = LandmarkRecorder(RECORD_PATH) if RECORD_PATH else None
+    roi = HandROI(expand=ROI_EXPAND, roi_size=ROI_SIZE, search_size=SEARCH_SIZE) if ROI_MODE else None
+    scheduler = AdaptiveRateScheduler(
+        idle_after=IDLE_AFTER,
+        probe_interval=PROBE_INTERVAL,
+        use_motion=MOTION_GATE,
+        motion_threshold=MOTION_THRESHOLD
+    )
+
+    # --- INFERENCE STAGE (runs on the pipeline's inference thread) ---
+    def infer(img):
+        patch, window = roi.crop(img) if roi else (img, None)
+
+        img_rgb = cv2.cvtColor(patch, cv2.COLOR_BGR2RGB)
+        results = hands.process(img_rgb)
+
+        gesture_command = None
+        landmarks = None
+
+        if results.multi_hand_landmarks:
+            for hand_lms in results.multi_hand_landmarks:
+                landmarks = landmarks_to_array(hand_lms.landmark) # (21, 3), once per frame
+
+                if window:
+                    # Patch coordinates -> full-frame coordinates (also for drawing)
+                    landmarks = roi.to_full(landmarks, window)
+                    for lm, (x, y, z) in zip(hand_lms.landmark, landmarks.tolist()):
+                        lm.x, lm.y, lm.z = x, y, z
+
+                mp_draw.draw_landmarks(img, hand_lms, mp_hands.HAND_CONNECTIONS)
+                
+                gesture_command = detect_gesture(landmarks)
+                
+                if gesture_command:
+                    # Draw Visual Indicator
+                    color = (0, 255, 0) # Green for Play
+                    if gesture_command == "pause": color = (0, 0, 255) # Red
+                    if gesture_command in ["next", "previous"]: color = (255, 165, 0) # Orange
+                    
+                    # UI Text
+                    cv2.putText(img, f"CMD: {gesture_command.upper()}", (10, 70), 
+                              cv2.FONT_HERSHEY_SIMPLEX, 1, color, 3)
+
+        scheduler.observe(landmarks is not None, time.time())
+
+        # --- QUEUE COMMAND (Confirmed over several frames) ---
+        # Every frame votes, including empty ones, so flicker never gets through
+        command = gate.update(gesture_command, time.time())
+        if command:
+            print(f"👉 EXECUTE: {command.upper()}")
+
+        if recorder:
+            recorder.write(time.time(), landmarks)
+
+        if roi:
+            roi.update(landmarks, img.shape)
+            if window and (window.w, window.h) != (window.frame_w, window.frame_h):
+                cv2.rectangle(img, (window.x0, window.y0),
+                              (window.x0 + window.w, window.y0 + window.h), (255, 255, 0), 1)
+
+        # Debug Info
+        cv2.putText(img, "System Active", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        return img, command
+
+    # --- DISPATCH STAGE (runs on its own thread so HTTP never blocks the camera) ---
+    # captured_at (the frame's capture time) is the start of the command's latency trace
+    def dispatch(command, captured_at):
+        if command == "play": controller.play(captured_at)
+        elif command == "pause": controller.pause(captured_at)
+        elif command == "next": controller.next(captured_at)
+        elif command == "previous": controller.previous(captured_at)
+
+    pipeline = FramePipeline(
+        open_camera, infer, dispatch,
+        preprocess=lambda img: cv2.flip(img, 1), # Mirror the image (so right moves right on screen)
+        scheduler=scheduler,
+        max_frame_age=MAX_FRAME_AGE,
+        max_command_age=MAX_COMMAND_AGE,
+        on_stale=lambda command: gate.rearm() # Too late to send: let the held gesture fire again
+    )
+
     # Register Engine
     controller.set_engine_status(MODULE_NAME, True)
-    last_command_time = 0
-    last_command_name = "None"
+    pipeline.start()
+    last_report = time.time()
+    window_open = True
 
     try:
-        while True:
+        while pipeline.running and not (stop_event and stop_event.is_set()):
             # Poll Permission
             _, hand_active = controller.sync_system_status()
 
             if not hand_active:
-                cv2.destroyAllWindows()
-                time.sleep(1)
+                if window_open:
+                    pipeline.pause() # Releases the camera
+                    if show_window:
+                        cv2.destroyAllWindows()
+                    window_open = False
+                controller.wait_for_status_change(1.0)
                 continue
 
-            # Process Frame
-            success, img = cap.read()
-            if not success: continue
-
-            # Mirror the image (so right moves right on screen)
-            img = cv2.flip(img, 1)
-            
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            results = hands.process(img_rgb)
-
-            gesture_command = None
-            
-            if results.multi_hand_landmarks:
-                for hand_lms in results.multi_hand_landmarks:
-                    mp_draw.draw_landmarks(img, hand_lms, mp_hands.HAND_CONNECTIONS)
-                    
-                    gesture_command = detect_gesture(hand_lms.landmark)
-                    
-                    if gesture_command:
-                        # Draw Visual Indicator
-                        color = (0, 255, 0) # Green for Play
-                        if gesture_command == "pause": color = (0, 0, 255) # Red
-                        if gesture_command in ["next", "previous"]: color = (255, 165, 0) # Orange
-                        
-                        # --- EXECUTE COMMAND (With Cooldown) ---
-                        current_time = time.time()
-                        if current_time - last_command_time > COMMAND_COOLDOWN:
-                            if gesture_command != last_command_name: # prevent spamming same command
-                                if gesture_command == "play": controller.play()
-                                elif gesture_command == "pause": controller.pause()
-                                elif gesture_command == "next": controller.next()
-                                elif gesture_command == "previous": controller.previous()
-                                
-                                last_command_time = current_time
-                                last_command_name = gesture_command
-                                print(f"👉 EXECUTE: {gesture_command.upper()}")
-                        
-                        # UI Text
-                        cv2.putText(img, f"CMD: {gesture_command.upper()}", (10, 70), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 1, color, 3)
-
-            # Debug Info
-            cv2.putText(img, "System Active", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            cv2.imshow("Startify Hand Control", img)
-
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
+            pipeline.resume()
+            window_open = True
+
+            img = pipeline.latest(timeout=0.1)
+            if show_window:
+                if img is not None:
+                    cv2.imshow("Startify Hand Control", img)
+
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+
+            if time.time() - last_report > STATS_INTERVAL:
+                print(pipeline.report())
+                if roi:
+                    print(f"🎯 [ROI] {roi.hit_rate():.0%} of frames ran on the hand crop")
+                print(scheduler.report())
+                print(controller.report())
+                controller.report_metrics(MODULE_NAME, pipeline.snapshot())
+                last_report = time.time()
+
+        if pipeline.error:
+            raise pipeline.error
 
     except KeyboardInterrupt:
         print("\n🛑 Manual Stop")
     except Exception as e:
         print(f"⚠️ Error: {e}")
     finally:
-        cap.release()
-        cv2.destroyAllWindows()
+        pipeline.stop()
+        if recorder:
+            recorder.close()
+            print(f"📼 Recorded {recorder.frames} frames to {RECORD_PATH}")
+        if show_window:
+            cv2.destroyAllWindows()
         controller.set_engine_status(MODULE_NAME, False)
+        controller.close()
         print("👋 Hand Engine Shutdown.")
 
 if __name__ == "__main__":
@@ -0,0 +1,360 @@
+"""
+Multi-source hand engine: one worker process per camera / video file.
+
+    python multi_hand.py 0 1                      # two cameras
+    python multi_hand.py 0@2 1@1                  # camera 0 wins conflicts (priority 2 > 1)
+    python multi_hand.py clip.mp4 clip.mp4 --bench  # throughput, files as fast as possible
+
+Every worker runs capture + MediaPipe + its own confirmation gates in its own
+process (so sources scale across cores instead of sharing one GIL). Workers send
+only small gesture / stats tuples back; their annotated preview frames go through
+shared memory (SharedFrame). A single GestureArbiter merges the gestures of all
+sources and hands before they reach the controller.
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import cv2
+import mediapipe as mp
+import numpy as np
+from controller import SystemController
+from arbiter import GestureArbiter
+from gate import ConfirmationGate
+from gestures import detect_gesture, landmarks_to_array
+from pipeline import StageStats
+from shared_frames import SharedFrame
+from hand_tracking import MODULE_NAME, CONFIRM_WINDOW, CONFIRM_VOTES, RELEASE_VOTES, REARM_FRAMES, MAX_COMMAND_AGE
+
+# --- CONFIGURATION ---
+SOURCES = os.getenv("STARTIFY_HAND_SOURCES", "0")  # Comma separated camera indexes / video paths
+MAX_HANDS = 2  # Per source; every hand gets its own confirmation gate
+PREVIEW_SIZE = (320, 240)  # (w, h) of each source's tile in the preview window
+DEDUPE_WINDOW = 0.6  # Seconds in which the same command from several sources counts once
+SETTLE = 0.05  # Seconds a gesture waits for a higher-priority source to disagree
+STATS_INTERVAL = 10  # Seconds between timing reports (console + backend /api/metrics)
+WORKER_STATS_INTERVAL = 2  # Seconds between stats messages from each worker
+RESTART_DELAY = 2  # Seconds before a crashed worker is started again
+
+def parse_source(spec):
+    """'0' -> (0, 0), 'clip.mp4@2' -> ('clip.mp4', 2). Digits are camera indexes."""
+    priority = 0
+    head, sep, tail = spec.rpartition('@')
+    if sep and tail.lstrip('-').isdigit():
+        spec, priority = head, int(tail)
+    return (int(spec) if spec.isdigit() else spec), priority
+
+# --- WORKER (runs in its own process) ---
+def source_worker(index, source, frame_name, events, active, stop, realtime):
+    """Capture -> MediaPipe -> per-hand gates for one source. Talks back only through `events`."""
+    is_camera = isinstance(source, int)
+    preview = SharedFrame((PREVIEW_SIZE[1], PREVIEW_SIZE[0], 3), name=frame_name)
+    mp_hands = mp.solutions.hands
+    hands = mp_hands.Hands(max_num_hands=MAX_HANDS, min_detection_confidence=0.7, min_tracking_confidence=0.5)
+    mp_draw = mp.solutions.drawing_utils
+    gates = {} # handedness label -> ConfirmationGate
+    stats = {"capture": StageStats("capture"), "inference": StageStats("inference")}
+    frames = 0
+    started = last_stats = time.time()
+    cap = None
+    frame_interval = 0.0
+
+    try:
+        while not stop.is_set():
+            if not active.is_set():
+                if cap is not None:
+                    cap.release() # Cameras are released while hand control is off
+                    cap = None
+                active.wait(0.5)
+                continue
+
+            if cap is None:
+                cap = cv2.VideoCapture(source)
+                if not cap.isOpened():
+                    events.put(("error", index, f"Cannot open source {source}"))
+                    return
+                if is_camera:
+                    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                elif realtime:
+                    fps = cap.get(cv2.CAP_PROP_FPS)
+                    frame_interval = 1.0 / fps if fps > 0 else 0.0
+
+            start = time.perf_counter()
+            success, img = cap.read()
+            if not success:
+                if not is_camera:
+                    events.put(("eof", index, frames, time.time() - started))
+                    return
+                time.sleep(0.005)
+                continue
+            captured_at = time.time()
+            if is_camera:
+                img = cv2.flip(img, 1)
+            stats["capture"].record(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            results = hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+            seen = set()
+            if results.multi_hand_landmarks:
+                for hand_lms, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                    label = handedness.classification[0].label
+                    seen.add(label)
+                    gate = gates.get(label)
+                    if gate is None:
+                        gate = gates[label] = ConfirmationGate(CONFIRM_WINDOW, CONFIRM_VOTES, RELEASE_VOTES, REARM_FRAMES)
+                    command = gate.update(detect_gesture(landmarks_to_array(hand_lms.landmark)))
+                    if command:
+                        events.put(("gesture", index, command, captured_at, label))
+                    mp_draw.draw_landmarks(img, hand_lms, mp_hands.HAND_CONNECTIONS)
+            # Every frame votes, so a hand that left the picture releases its gesture
+            for label, gate in gates.items():
+                if label not in seen:
+                    gate.update(None)
+            stats["inference"].record(time.perf_counter() - start)
+            frames += 1
+
+            preview.write(cv2.resize(img, PREVIEW_SIZE), captured_at)
+
+            now = time.time()
+            if now - last_stats >= WORKER_STATS_INTERVAL:
+                elapsed = now - started
+                events.put(("stats", index, {
+                    "fps": round(frames / elapsed, 1) if elapsed else 0.0,
+                    "frames": frames,
+                    "stages": {name: s.as_dict() for name, s in stats.items()}
+                }))
+                last_stats = now
+
+            if frame_interval:
+                time.sleep(max(0.0, frame_interval - (time.time() - captured_at)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if cap is not None:
+            cap.release()
+        hands.close()
+        preview.close()
+
+class SourcePool:
+    """
+    One long-lived worker process per source, plus the shared preview slots and the
+    event queue they report on. Workers that die are restarted by supervise();
+    video files that reached their end are not.
+    """
+    def __init__(self, sources, realtime=True):
+        self.sources = list(sources)
+        self.realtime = realtime
+        self.ctx = multiprocessing.get_context("spawn") # Never fork a process that has threads (Flask, capture)
+        self.events = self.ctx.Queue()
+        self.active = self.ctx.Event()
+        self.active.set()
+        self.stop_event = self.ctx.Event()
+        self.frames = [SharedFrame((PREVIEW_SIZE[1], PREVIEW_SIZE[0], 3), create=True) for _ in self.sources]
+        self.procs = [None] * len(self.sources)
+        self.finished = set()
+        self.restarts = 0
+        self._died_at = {}
+
+    def _spawn(self, index):
+        proc = self.ctx.Process(
+            target=source_worker,
+            args=(index, self.sources[index], self.frames[index].name, self.events, self.active, self.stop_event, self.realtime),
+            name=f"hand-source-{index}",
+            daemon=True
+        )
+        proc.start()
+        self.procs[index] = proc
+
+    def start(self):
+        for index in range(len(self.sources)):
+            self._spawn(index)
+        return self
+
+    def supervise(self):
+        now = time.time()
+        for index, proc in enumerate(self.procs):
+            if index in self.finished or proc.is_alive() or self.stop_event.is_set():
+                continue
+            died_at = self._died_at.setdefault(index, now)
+            if now - died_at >= RESTART_DELAY:
+                print(f"⚠️ [POOL] Source {self.sources[index]} worker exited ({proc.exitcode}), restarting")
+                del self._died_at[index]
+                self.restarts += 1
+                self._spawn(index)
+
+    @property
+    def done(self):
+        return len(self.finished) == len(self.sources)
+
+    def pause(self):
+        self.active.clear()
+
+    def resume(self):
+        self.active.set()
+
+    def stop(self, timeout=3.0):
+        self.stop_event.set()
+        self.active.set()
+        for proc in self.procs:
+            if proc:
+                proc.join(timeout)
+                if proc.is_alive():
+                    proc.terminate()
+        for frame in self.frames:
+            frame.close()
+
+def mosaic(frames, tiles):
+    """Grid of the latest preview of every source (black until its first frame)."""
+    w, h = PREVIEW_SIZE
+    cols = math.ceil(math.sqrt(len(tiles)))
+    rows = math.ceil(len(tiles) / cols)
+    canvas = np.zeros((rows * h, cols * w, 3), dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        latest = frame.read()
+        if latest is not None:
+            tiles[i] = latest[0]
+        if tiles[i] is not None:
+            r, c = divmod(i, cols)
+            canvas[r * h:(r + 1) * h, c * w:(c + 1) * w] = tiles[i]
+    return canvas
+
+def main(sources=None, controller=None, stop_event=None, show_window=True):
+    """
+    Runs the multi-source engine until 'q', Ctrl+C or stop_event.
+    sources: ["0", "clip.mp4@2", ...] (default: STARTIFY_HAND_SOURCES).
+    """
+    specs = [parse_source(s.strip()) for s in (sources or SOURCES.split(',')) if s.strip()]
+    controller = controller or SystemController(name=MODULE_NAME)
+    arbiter = GestureArbiter({f"src{i}": p for i, (_, p) in enumerate(specs)}, DEDUPE_WINDOW, SETTLE)
+    pool = SourcePool([s for s, _ in specs]).start()
+    snapshots = {}
+    done = threading.Event()
+
+    def dispatch(event):
+        if time.time() - event.t > MAX_COMMAND_AGE:
+            return # Same rule as the single-camera pipeline: never send stale gestures
+        print(f"👉 EXECUTE: {event.command.upper()} ({event.source})")
+        controller.send_command(event.command, origin=event.t)
+
+    # --- ARBITRATION STAGE (one thread; every source's gestures meet here) ---
+    def arbitrate():
+        while not done.is_set():
+            wait = arbiter.next_due()
+            try:
+                event = pool.events.get(timeout=0.1 if wait is None else wait)
+            except queue.Empty:
+                event = None
+
+            ready = arbiter.poll()
+            if event:
+                kind, index = event[0], event[1]
+                if kind == "gesture":
+                    _, _, command, captured_at, _ = event
+                    ready += arbiter.submit(f"src{index}", command, captured_at)
+                elif kind == "stats":
+                    snapshots[index] = event[2]
+                elif kind in ("eof", "error"):
+                    pool.finished.add(index)
+                    print(f"📼 [POOL] Source {pool.sources[index]} finished: {event[2:]}")
+            for ready_event in ready:
+                dispatch(ready_event)
+
+    def report():
+        sources = {f"src{i}": snapshots[i] for i in sorted(snapshots)}
+        snapshot = {
+            "sources": len(pool.sources),
+            "fps_inference": round(sum(s["fps"] for s in sources.values()), 1),
+            "worker_restarts": pool.restarts,
+            **{f"arbiter_{k}": v for k, v in arbiter.stats().items()},
+            "stages": {f"{name}_{stage}": s for name, src in sources.items() for stage, s in src["stages"].items()}
+        }
+        print(f"📊 [POOL] {snapshot['fps_inference']} fps over {snapshot['sources']} sources | "
+              + " | ".join(f"{name} {s['fps']} fps" for name, s in sources.items())
+              + f" | arbiter {arbiter.stats()}")
+        controller.report_metrics(MODULE_NAME, snapshot)
+
+    arbiter_thread = threading.Thread(target=arbitrate, name="gesture-arbiter", daemon=True)
+    arbiter_thread.start()
+    controller.set_engine_status(MODULE_NAME, True)
+    tiles = [None] * len(specs)
+    last_report = time.time()
+
+    try:
+        while not pool.done and not (stop_event and stop_event.is_set()):
+            _, hand_active = controller.sync_system_status()
+            if not hand_active:
+                pool.pause() # Workers release their cameras
+                if show_window:
+                    cv2.destroyAllWindows()
+                controller.wait_for_status_change(1.0)
+                continue
+            pool.resume()
+            pool.supervise()
+
+            if show_window:
+                cv2.imshow("Startify Hand Control", mosaic(pool.frames, tiles))
+                if cv2.waitKey(30) & 0xFF == ord('q'):
+                    break
+            else:
+                time.sleep(0.1)
+
+            if time.time() - last_report > STATS_INTERVAL:
+                report()
+                last_report = time.time()
+
+    except KeyboardInterrupt:
+        print("\n🛑 Manual Stop")
+    finally:
+        done.set()
+        arbiter_thread.join(1.0)
+        pool.stop()
+        if show_window:
+            cv2.destroyAllWindows()
+        controller.set_engine_status(MODULE_NAME, False)
+        controller.close()
+        print("👋 Multi Hand Engine Shutdown.")
+
+def bench(sources):
+    """Runs video files through the pool as fast as possible and reports frames/s per source and total."""
+    pool = SourcePool([parse_source(s)[0] for s in sources], realtime=False).start()
+    results = {}
+    started = time.time()
+    try:
+        while len(results) < len(pool.sources):
+            try:
+                event = pool.events.get(timeout=1.0)
+            except queue.Empty:
+                if not any(proc.is_alive() for proc in pool.procs):
+                    print("❌ Workers exited without finishing")
+                    break
+                continue
+            if event[0] == "eof":
+                _, index, frames, elapsed = event
+                results[index] = (frames, elapsed)
+            elif event[0] == "error":
+                print(f"❌ {event[2]}")
+                results[event[1]] = (0, 0.0)
+    finally:
+        wall = time.time() - started
+        pool.stop()
+
+    total = sum(frames for frames, _ in results.values())
+    for index in sorted(results):
+        frames, elapsed = results[index]
+        print(f"   {pool.sources[index]}: {frames} frames, {frames / elapsed if elapsed else 0:.1f} fps")
+    print(f"📊 {len(pool.sources)} sources on {os.cpu_count()} cores: {total} frames in {wall:.1f}s = {total / wall:.1f} fps total")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hand gesture engine over several cameras / video files")
+    parser.add_argument("sources", nargs="*", help="camera index or video path, optionally @priority")
+    parser.add_argument("--no-window", action="store_true")
+    parser.add_argument("--bench", action="store_true", help="throughput of the given video files, no backend")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.sources)
+    else:
+        main(args.sources or None, show_window=not args.no_window)
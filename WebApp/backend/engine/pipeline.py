@@ -0,0 +1,270 @@
+import queue
+import threading
+import time
+
+
+class LatestQueue:
+    """
+    Bounded queue that never blocks the producer.
+    When full, the oldest item is thrown away so consumers always see fresh data.
+    """
+    def __init__(self, maxsize=1):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Returns the next item, or None if nothing arrived within timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def clear(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+class StageStats:
+    """Running timings (in ms) for a single pipeline stage."""
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def record(self, elapsed_s):
+        ms = elapsed_s * 1000.0
+        self.count += 1
+        self.total_ms += ms
+        self.last_ms = ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    @property
+    def avg_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "avg_ms": round(self.avg_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+            "last_ms": round(self.last_ms, 2)
+        }
+
+
+class Frame:
+    __slots__ = ("seq", "captured_at", "image")
+
+    def __init__(self, seq, captured_at, image):
+        self.seq = seq
+        self.captured_at = captured_at
+        self.image = image
+
+
+class FramePipeline:
+    """
+    Capture -> Inference -> Dispatch, each on its own thread.
+
+    - capture:   reads the camera as fast as it delivers and keeps only the newest frame.
+                 open_capture() is called to (re)open the camera; while paused it is released.
+    - inference: infer(image) -> (display_image, command or None).
+    - dispatch:  dispatch(command, captured_at), so a slow HTTP call never stalls the camera.
+
+    Commands older than max_command_age (glass-to-command) are dropped instead of sent.
+    That is decided on the inference thread, right after infer() fired the command, and
+    on_stale(command) is called there so the gesture gate can re-arm: the gesture, still
+    held, then fires again from a fresh frame instead of being lost.
+
+    Stage "handoff" times the dispatch() call and "glass_to_handoff" capture -> handoff;
+    dispatch() only queues for the controller, whose own stats cover delivery.
+    The main thread pulls annotated frames with latest() (cv2.imshow must stay on it).
+
+    An optional scheduler (see scheduler.py) can skip decoding (decode_due) and
+    inference (admit) while nobody is in front of the camera.
+    """
+    def __init__(self, open_capture, infer, dispatch, preprocess=None, scheduler=None,
+                 max_frame_age=0.25, max_command_age=0.5, dispatch_queue_size=4, on_stale=None):
+        self.open_capture = open_capture
+        self.scheduler = scheduler
+        self.infer = infer
+        self.dispatch = dispatch
+        self.preprocess = preprocess
+        self.max_frame_age = max_frame_age
+        self.max_command_age = max_command_age
+        self.on_stale = on_stale
+
+        self._frames = LatestQueue(maxsize=1)
+        self._display = LatestQueue(maxsize=1)
+        self._commands = LatestQueue(maxsize=dispatch_queue_size)
+
+        self._stop = threading.Event()
+        self._active = threading.Event()
+        self._active.set()
+        self._threads = []
+
+        self.error = None
+        self.stale_frames = 0
+        self.stale_commands = 0
+        self.stats = {
+            "capture": StageStats("capture"),
+            "inference": StageStats("inference"),
+            "handoff": StageStats("handoff"),
+            "glass_to_handoff": StageStats("glass_to_handoff")
+        }
+        self._started_at = None
+        self._seq = 0
+
+    # --- Lifecycle ---
+    def start(self):
+        self._started_at = time.time()
+        for name, target in (("capture", self._capture_loop),
+                             ("inference", self._inference_loop),
+                             ("dispatch", self._dispatch_loop)):
+            t = threading.Thread(target=self._guard, args=(target,), name=f"pipeline-{name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        self._active.set()  # wake a paused capture thread so it can exit
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def pause(self):
+        """Stops reading and releases the camera; queued frames are discarded."""
+        if self._active.is_set():
+            self._active.clear()
+            self._frames.clear()
+            self._display.clear()
+
+    def resume(self):
+        self._active.set()
+
+    @property
+    def running(self):
+        return not self._stop.is_set()
+
+    def latest(self, timeout=None):
+        """Most recent annotated frame for display, or None."""
+        return self._display.get(timeout=timeout)
+
+    # --- Stages ---
+    def _guard(self, target):
+        try:
+            target()
+        except Exception as e:
+            self.error = e
+            self._stop.set()
+
+    def _capture_loop(self):
+        cap = None
+        try:
+            while not self._stop.is_set():
+                if not self._active.is_set():
+                    if cap is not None:
+                        cap.release()
+                        cap = None
+                        print("📷 [PIPELINE] Camera released")
+                    self._active.wait()
+                    continue
+
+                if cap is None:
+                    cap = self.open_capture()
+
+                # Idle: keep the driver buffer drained but skip the decode
+                if self.scheduler and not self.scheduler.decode_due(time.time()):
+                    if not cap.grab():
+                        time.sleep(0.005)
+                    continue
+
+                start = time.perf_counter()
+                success, img = cap.read()
+                if not success:
+                    time.sleep(0.005)
+                    continue
+                if self.preprocess:
+                    img = self.preprocess(img)
+                self.stats["capture"].record(time.perf_counter() - start)
+
+                self._seq += 1
+                self._frames.put(Frame(self._seq, time.time(), img))
+        finally:
+            if cap is not None:
+                cap.release()
+
+    def _inference_loop(self):
+        while not self._stop.is_set():
+            frame = self._frames.get(timeout=0.1)
+            if frame is None:
+                continue
+
+            if time.time() - frame.captured_at > self.max_frame_age:
+                self.stale_frames += 1
+                continue
+
+            if self.scheduler and not self.scheduler.admit(frame.image):
+                self._display.put(frame.image)
+                continue
+
+            start = time.perf_counter()
+            display_img, command = self.infer(frame.image)
+            self.stats["inference"].record(time.perf_counter() - start)
+
+            if command:
+                if time.time() - frame.captured_at > self.max_command_age:
+                    self.stale_commands += 1
+                    if self.on_stale:
+                        self.on_stale(command)
+                else:
+                    self._commands.put((command, frame.captured_at))
+            self._display.put(display_img)
+
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            item = self._commands.get(timeout=0.1)
+            if item is None:
+                continue
+
+            command, captured_at = item
+            start = time.perf_counter()
+            self.dispatch(command, captured_at)
+            self.stats["handoff"].record(time.perf_counter() - start)
+            self.stats["glass_to_handoff"].record(time.time() - captured_at)
+
+    # --- Reporting ---
+    def snapshot(self):
+        elapsed = time.time() - self._started_at if self._started_at else 0.0
+        captured = self.stats["capture"].count
+        return {
+            "fps_capture": round(captured / elapsed, 1) if elapsed else 0.0,
+            "fps_inference": round(self.stats["inference"].count / elapsed, 1) if elapsed else 0.0,
+            "frames_dropped": self._frames.dropped + self.stale_frames,
+            "commands_dropped": self._commands.dropped + self.stale_commands,
+            "stages": {name: s.as_dict() for name, s in self.stats.items()}
+        }
+
+    def report(self):
+        snap = self.snapshot()
+        stages = " | ".join(
+            f"{name} {s['avg_ms']}ms (max {s['max_ms']})" for name, s in snap["stages"].items()
+        )
+        return (f"📊 [PIPELINE] cap {snap['fps_capture']} fps, infer {snap['fps_inference']} fps, "
+                f"dropped {snap['frames_dropped']} frames / {snap['commands_dropped']} cmds | {stages}")
@@ -0,0 +1,81 @@
+import struct
+import numpy as np
+
+from gestures import NUM_LANDMARKS
+
+# --- FILE FORMAT ---
+# [16 byte header][record][record]...
+# Each record is fixed size, so the whole file can be np.memmap'ed without parsing.
+MAGIC = b"STLM"
+VERSION = 1
+HEADER = struct.Struct("<4sHH8x") # magic, version, landmarks per hand
+
+RECORD_DTYPE = np.dtype([
+    ("t", "<f8"),                             # capture timestamp (time.time())
+    ("present", "u1"),                        # 0 = no hand in this frame
+    ("lm", "<f4", (NUM_LANDMARKS, 3))         # (x, y, z) per landmark
+])
+
+class LandmarkRecorder:
+    """
+    Appends one record per frame to a landmark recording.
+
+        with LandmarkRecorder("session.lmk") as rec:
+            rec.write(time.time(), landmarks)   # (21, 3) array or None
+    """
+    def __init__(self, path):
+        self.path = path
+        self.frames = 0
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, NUM_LANDMARKS))
+
+    def write(self, timestamp, landmarks=None):
+        rec = self._record[0]
+        rec["t"] = timestamp
+        if landmarks is None:
+            rec["present"] = 0
+            rec["lm"] = 0
+        else:
+            rec["present"] = 1
+            rec["lm"] = landmarks
+        self._file.write(self._record.tobytes())
+        self.frames += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_recording(path, timestamps, landmarks, present=None):
+    """Writes a whole stream at once. landmarks: (N, 21, 3), present: (N,) bool."""
+    records = np.zeros(len(timestamps), dtype=RECORD_DTYPE)
+    records["t"] = timestamps
+    records["lm"] = landmarks
+    records["present"] = 1 if present is None else present
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, NUM_LANDMARKS))
+        f.write(records.tobytes())
+    return len(records)
+
+def load_recording(path):
+    """
+    Memory-maps a recording. Returns a structured array with fields t, present, lm.
+    Nothing is read from disk until the fields are actually used.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path}: not a landmark recording (file too short)")
+
+    magic, version, landmarks = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or landmarks != NUM_LANDMARKS:
+        raise ValueError(f"{path}: unsupported landmark recording (magic={magic}, version={version})")
+
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size)
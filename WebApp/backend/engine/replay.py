@@ -0,0 +1,65 @@
+import time
+import numpy as np
+
+from gestures import GESTURES, NONE, classify
+
+class ReplayResult:
+    def __init__(self, frames, elapsed, latencies_ns, commands):
+        self.frames = frames
+        self.elapsed = elapsed
+        self.latencies_ns = latencies_ns # per-frame cost, empty in batch mode
+        self.commands = commands         # [(frame_index, timestamp, command), ...]
+
+    @property
+    def fps(self):
+        return self.frames / self.elapsed if self.elapsed else 0.0
+
+    def percentiles_us(self, q=(50, 95, 99)):
+        if not len(self.latencies_ns):
+            return {}
+        values = np.percentile(self.latencies_ns, q) / 1000.0
+        return {f"p{p}": round(float(v), 2) for p, v in zip(q, values)}
+
+    def command_counts(self):
+        counts = {}
+        for _, _, command in self.commands:
+            counts[command] = counts.get(command, 0) + 1
+        return counts
+
+def replay(records, gate, per_frame=True):
+    """
+    Runs a recording through classification + the command gate, as fast as possible.
+    Timestamps come from the recording, so cooldowns behave exactly as they did live.
+
+    per_frame=True  -> classify frame by frame, like the live engine (gives latencies).
+    per_frame=False -> classify the whole stream in one NumPy batch first.
+    """
+    timestamps = np.asarray(records["t"])
+    present = np.asarray(records["present"]).astype(bool)
+    landmarks = records["lm"]
+    frames = len(timestamps)
+
+    gate.reset()
+    commands = []
+    latencies = np.zeros(frames if per_frame else 0, dtype=np.int64)
+    clock = time.perf_counter_ns
+
+    start = time.perf_counter()
+    if per_frame:
+        for i in range(frames):
+            t0 = clock()
+            code = classify(landmarks[i]) if present[i] else NONE
+            command = gate.update(GESTURES[code], timestamps[i])
+            latencies[i] = clock() - t0
+            if command:
+                commands.append((i, float(timestamps[i]), command))
+    else:
+        codes = classify(landmarks)
+        codes[~present] = NONE
+        for i, code in enumerate(codes.tolist()):
+            command = gate.update(GESTURES[code], timestamps[i])
+            if command:
+                commands.append((i, float(timestamps[i]), command))
+    elapsed = time.perf_counter() - start
+
+    return ReplayResult(frames, elapsed, latencies, commands)
@@ -0,0 +1,95 @@
+from collections import namedtuple
+import cv2
+import numpy as np
+
+# Where a patch came from: offset + size inside a frame of frame_w x frame_h pixels
+Window = namedtuple("Window", "x0 y0 w h frame_w frame_h")
+
+class HandROI:
+    """
+    Runs inference on a small crop around the last known hand instead of the whole frame.
+
+    - After a detection, the next frame is cropped to the hand's bounding box
+      (grown by `expand`, squared, at least `min_size` px) and downscaled so its
+      longest side is `roi_size`.
+    - After `lost_after` frames without a hand it falls back to a full-frame
+      search, downscaled to `search_size`.
+    - to_full() maps MediaPipe's patch-normalized landmarks back into
+      full-frame normalized coordinates, so gesture detection is unchanged.
+    """
+    def __init__(self, expand=1.6, roi_size=224, search_size=480, min_size=96, lost_after=2):
+        self.expand = expand
+        self.roi_size = roi_size
+        self.search_size = search_size
+        self.min_size = min_size
+        self.lost_after = lost_after
+        self.box = None # (x0, y0, x1, y1) in pixels
+        self.misses = 0
+        self.roi_frames = 0
+        self.search_frames = 0
+
+    @property
+    def tracking(self):
+        return self.box is not None
+
+    def crop(self, img):
+        """Returns (patch, window). The patch may be a downscaled view."""
+        frame_h, frame_w = img.shape[:2]
+
+        if self.box is None:
+            x0, y0, x1, y1 = 0, 0, frame_w, frame_h
+            target = self.search_size
+            self.search_frames += 1
+        else:
+            x0, y0, x1, y1 = self.box
+            target = self.roi_size
+            self.roi_frames += 1
+
+        patch = img[y0:y1, x0:x1]
+        w, h = x1 - x0, y1 - y0
+
+        scale = target / max(w, h)
+        if scale < 1.0:
+            patch = cv2.resize(patch, (max(1, round(w * scale)), max(1, round(h * scale))),
+                               interpolation=cv2.INTER_AREA)
+
+        return patch, Window(x0, y0, w, h, frame_w, frame_h)
+
+    @staticmethod
+    def to_full(landmarks, window):
+        """(21, 3) patch-normalized landmarks -> full-frame normalized landmarks."""
+        out = np.empty_like(landmarks)
+        out[:, 0] = (landmarks[:, 0] * window.w + window.x0) / window.frame_w
+        out[:, 1] = (landmarks[:, 1] * window.h + window.y0) / window.frame_h
+        out[:, 2] = landmarks[:, 2] * (window.w / window.frame_w) # z uses the same scale as x
+        return out
+
+    def update(self, landmarks, frame_shape):
+        """Feed the full-frame landmarks of this frame (or None if no hand)."""
+        if landmarks is None:
+            self.misses += 1
+            if self.misses >= self.lost_after:
+                self.box = None
+            return
+
+        self.misses = 0
+        frame_h, frame_w = frame_shape[:2]
+
+        xs = landmarks[:, 0] * frame_w
+        ys = landmarks[:, 1] * frame_h
+        cx = (xs.min() + xs.max()) / 2
+        cy = (ys.min() + ys.max()) / 2
+        side = max(xs.max() - xs.min(), ys.max() - ys.min()) * self.expand
+        half = max(side, self.min_size) / 2
+
+        x0 = int(max(0, cx - half))
+        y0 = int(max(0, cy - half))
+        x1 = int(min(frame_w, cx + half))
+        y1 = int(min(frame_h, cy + half))
+
+        # Hand left the frame entirely -> search again
+        self.box = (x0, y0, x1, y1) if x1 - x0 > 1 and y1 - y0 > 1 else None
+
+    def hit_rate(self):
+        total = self.roi_frames + self.search_frames
+        return self.roi_frames / total if total else 0.0
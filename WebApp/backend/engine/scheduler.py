@@ -0,0 +1,77 @@
+import time
+import cv2
+import numpy as np
+
+class AdaptiveRateScheduler:
+    """
+    Decides which frames are worth decoding and running through MediaPipe.
+
+    - ACTIVE: every frame (a hand was seen in the last `idle_after` seconds).
+    - IDLE:   frames are only grabbed (no decode) and one frame is probed
+              every `probe_interval` seconds. With `use_motion`, a probe only
+              reaches MediaPipe if it differs from the previous probe (mean
+              absolute difference of a tiny grayscale thumbnail > `motion_threshold`).
+
+    A detected hand switches straight back to ACTIVE.
+    decode_due() runs on the capture thread, admit()/observe() on the inference thread.
+    """
+    def __init__(self, idle_after=3.0, probe_interval=0.5, use_motion=True,
+                 motion_threshold=6.0, thumb_size=(64, 48)):
+        self.idle_after = idle_after
+        self.probe_interval = probe_interval
+        self.use_motion = use_motion
+        self.motion_threshold = motion_threshold
+        self.thumb_size = thumb_size
+
+        self.idle = False
+        self.last_hand = time.time()
+        self.last_probe = 0.0
+        self._prev_thumb = None
+
+        self.probes = 0
+        self.motion_skips = 0
+
+    def decode_due(self, now):
+        if not self.idle:
+            return True
+        if now - self.last_probe >= self.probe_interval:
+            self.last_probe = now
+            return True
+        return False
+
+    def admit(self, img):
+        """False if this frame can skip inference (idle and nothing moved)."""
+        if not self.idle:
+            return True
+
+        self.probes += 1
+        if not self.use_motion:
+            return True
+
+        thumb = cv2.cvtColor(cv2.resize(img, self.thumb_size, interpolation=cv2.INTER_AREA),
+                             cv2.COLOR_BGR2GRAY).astype(np.int16)
+        prev, self._prev_thumb = self._prev_thumb, thumb
+        if prev is None:
+            return True
+
+        if np.abs(thumb - prev).mean() > self.motion_threshold:
+            return True
+
+        self.motion_skips += 1
+        return False
+
+    def observe(self, hand_present, now):
+        if hand_present:
+            self.last_hand = now
+            if self.idle:
+                self.idle = False
+                self._prev_thumb = None
+                print("🖐️ [SCHEDULER] Hand detected -> full rate")
+        elif not self.idle and now - self.last_hand > self.idle_after:
+            self.idle = True
+            self.last_probe = now
+            print(f"💤 [SCHEDULER] No hand for {self.idle_after}s -> probing every {self.probe_interval}s")
+
+    def report(self):
+        mode = "IDLE" if self.idle else "ACTIVE"
+        return f"💤 [SCHEDULER] {mode} | {self.probes} idle probes, {self.motion_skips} skipped (no motion)"
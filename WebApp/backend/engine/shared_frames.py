@@ -0,0 +1,62 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+class SharedFrame:
+    """
+    A single image slot in shared memory: one process writes, others read, and no
+    pickling or pipe copies are involved.
+
+    Layout: [seq uint64][captured_at float64][image bytes]. The writer makes seq odd
+    while it copies and even once done (a seqlock), so a reader that sees an odd
+    or changed seq knows it caught a half-written frame and tries again.
+    """
+    HEADER = 16
+
+    def __init__(self, shape, name=None, create=False):
+        self.shape = tuple(shape)
+        size = self.HEADER + int(np.prod(self.shape))
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.owner = create
+        self._seq = np.ndarray((1,), dtype=np.uint64, buffer=self.shm.buf, offset=0)
+        self._stamp = np.ndarray((1,), dtype=np.float64, buffer=self.shm.buf, offset=8)
+        self._image = np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf, offset=self.HEADER)
+        if create:
+            self._seq[0] = 0
+        self._last_read = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, image, captured_at):
+        """image must already have `shape` (uint8)."""
+        seq = int(self._seq[0])
+        self._seq[0] = seq + 1
+        np.copyto(self._image, image)
+        self._stamp[0] = captured_at
+        self._seq[0] = seq + 2
+
+    def read(self, retries=3):
+        """(image copy, captured_at) if a frame was written since the last read, else None."""
+        for _ in range(retries):
+            seq = int(self._seq[0])
+            if seq == self._last_read:
+                return None
+            if seq & 1:
+                continue
+            image = self._image.copy()
+            captured_at = float(self._stamp[0])
+            if int(self._seq[0]) == seq:
+                self._last_read = seq
+                return image, captured_at
+        return None
+
+    def close(self):
+        # Views into the buffer must go before the mapping can be closed
+        self._seq = self._stamp = self._image = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
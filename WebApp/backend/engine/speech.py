@@ -0,0 +1,142 @@
+"""
+Voice command recognizers. Every backend takes the same streaming interface:
+
+    rec.start()              # new utterance
+    rec.accept(chunk)        # 16-bit mono PCM bytes -> command or None (may fire mid-utterance)
+    rec.finish()             # end of utterance -> command or None
+
+and returns one of "play", "pause", "next", "previous".
+"""
+import json
+import numpy as np
+
+# Spoken word -> command. Order matters: earlier commands win if several words are heard.
+KEYWORDS = {
+    "play": "play",
+    "start": "play",
+    "pause": "pause",
+    "stop": "pause",
+    "next": "next",
+    "skip": "next",
+    "previous": "previous",
+    "back": "previous"
+}
+COMMANDS = ("play", "pause", "next", "previous")
+
+def match_command(text):
+    """Command for a transcript (whole words only), or None."""
+    words = set(text.lower().split())
+    for command in COMMANDS:
+        if any(KEYWORDS.get(w) == command for w in words):
+            return command
+    return None
+
+def chunk_rms(chunk):
+    """RMS of 16-bit PCM bytes, on the same scale as speech_recognition's energy_threshold."""
+    samples = np.frombuffer(chunk, dtype='<i2').astype(np.float32)
+    if not len(samples):
+        return 0.0
+    return float(np.sqrt(np.mean(samples * samples)))
+
+class GoogleRecognizer:
+    """
+    The original online path: buffers the utterance and sends it to Google's web API
+    when it ends. Needs network; never fires early.
+    """
+    name = "google"
+
+    def __init__(self, sample_rate, sample_width=2):
+        import speech_recognition as sr
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.buffer = bytearray()
+
+    def start(self):
+        self.buffer.clear()
+
+    def accept(self, chunk):
+        self.buffer.extend(chunk)
+        return None
+
+    def finish(self):
+        if not self.buffer:
+            return None
+        audio = self.sr.AudioData(bytes(self.buffer), self.sample_rate, self.sample_width)
+        self.buffer.clear()
+        try:
+            text = self.recognizer.recognize_google(audio).lower()
+        except self.sr.UnknownValueError:
+            return None
+        print(f"🗣️ Heard: '{text}'")
+        return match_command(text)
+
+class VoskRecognizer:
+    """
+    Offline recognizer restricted to the command vocabulary (Vosk/Kaldi grammar mode).
+
+    With a grammar of eight words the decoder is small and fast, and every partial
+    hypothesis already is one of our keywords. A command fires as soon as the same
+    keyword leads the partial result for `stable_partials` chunks in a row, or when
+    a final result has word confidence >= min_confidence, whichever comes first.
+    """
+    name = "vosk"
+
+    def __init__(self, model_path, sample_rate, stable_partials=2, min_confidence=0.6):
+        try:
+            import vosk
+        except ImportError:
+            raise RuntimeError("Offline voice needs the 'vosk' package (pip install vosk) and a model from alphacephei.com/vosk/models")
+        vosk.SetLogLevel(-1)
+        self.model = vosk.Model(model_path)
+        self.vosk = vosk
+        self.sample_rate = sample_rate
+        self.stable_partials = stable_partials
+        self.min_confidence = min_confidence
+        self.grammar = json.dumps(list(KEYWORDS) + ["[unk]"])
+        self.start()
+
+    def start(self):
+        self.rec = self.vosk.KaldiRecognizer(self.model, self.sample_rate, self.grammar)
+        self.rec.SetWords(True)
+        self.candidate = None
+        self.streak = 0
+        self.fired = False
+
+    def _final(self, result):
+        words = [w for w in json.loads(result).get("result", []) if w.get("conf", 0) >= self.min_confidence]
+        return match_command(" ".join(w["word"] for w in words))
+
+    def accept(self, chunk):
+        if self.fired:
+            return None
+
+        if self.rec.AcceptWaveform(chunk):
+            command = self._final(self.rec.Result())
+        else:
+            partial = json.loads(self.rec.PartialResult()).get("partial", "")
+            command = match_command(partial)
+            if command and command == self.candidate:
+                self.streak += 1
+            else:
+                self.candidate, self.streak = command, 1 if command else 0
+            if self.streak < self.stable_partials:
+                command = None
+
+        if command:
+            self.fired = True
+        return command
+
+    def finish(self):
+        if self.fired:
+            return None
+        return self._final(self.rec.FinalResult())
+
+def create_recognizer(backend, sample_rate, model_path=None):
+    """'vosk' (offline) or 'google' (online)."""
+    if backend == "vosk":
+        return VoskRecognizer(model_path, sample_rate)
+    if backend == "google":
+        return GoogleRecognizer(sample_rate)
+    raise ValueError(f"Unknown voice backend '{backend}'")
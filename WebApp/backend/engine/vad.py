@@ -0,0 +1,129 @@
+import json
+import os
+import time
+from collections import deque
+from speech import chunk_rms
+
+class EnergyVad:
+    """
+    Energy voice activity detection with a self-adjusting threshold.
+
+    The threshold is noise_floor * ratio (never below min_threshold). The noise
+    floor is the RMS of non-speech chunks, smoothed over `adapt_seconds`, so the
+    threshold follows a fan turning on or a quieter room without recalibrating.
+    While `calibrating` (no stored floor yet) the first chunks are taken as noise.
+
+    If the room got louder than the threshold, nothing counts as non-speech and that
+    adaptation would never run. So the floor is also checked against the quiet end of
+    the last `window_seconds` (the `low_percentile` RMS): real speech has pauses, a
+    louder room doesn't. When even that is above the threshold, it becomes the floor.
+    """
+    def __init__(self, chunk_seconds, noise_floor=None, ratio=1.5, min_threshold=100.0,
+                 adapt_seconds=5.0, calibration_seconds=1.0, window_seconds=8.0, low_percentile=0.1):
+        self.ratio = ratio
+        self.min_threshold = min_threshold
+        self.alpha = min(1.0, chunk_seconds / adapt_seconds)
+        self.noise_floor = noise_floor
+        self.calibrating = noise_floor is None
+        self._calibration_chunks = max(1, int(calibration_seconds / chunk_seconds))
+        self._calibration = []
+        self.low_percentile = low_percentile
+        self._recent = deque(maxlen=max(1, int(window_seconds / chunk_seconds)))
+        self.floor_resets = 0
+
+    @property
+    def threshold(self):
+        if self.noise_floor is None:
+            return float('inf')
+        return max(self.min_threshold, self.noise_floor * self.ratio)
+
+    def is_speech(self, chunk):
+        rms = chunk_rms(chunk)
+
+        if self.calibrating:
+            self._calibration.append(rms)
+            if len(self._calibration) >= self._calibration_chunks:
+                self.noise_floor = sorted(self._calibration)[len(self._calibration) // 2]
+                self.calibrating = False
+                self._calibration = []
+            return False
+
+        self._recent.append(rms)
+        speech = rms > self.threshold
+        if not speech:
+            self.noise_floor += (rms - self.noise_floor) * self.alpha
+        elif len(self._recent) == self._recent.maxlen:
+            quiet = sorted(self._recent)[int(len(self._recent) * self.low_percentile)]
+            if quiet > self.threshold:
+                # Stale floor (e.g. a saved calibration from a quieter room)
+                self.noise_floor = quiet
+                self.floor_resets += 1
+                speech = rms > self.threshold
+        return speech
+
+class UtteranceSegmenter:
+    """
+    Turns a chunk stream into utterances: push(chunk) returns a list of events
+    ("start", [pre-roll chunks]), ("audio", chunk), ("end", None).
+    An utterance starts on a speech chunk (the `preroll_seconds` before it are
+    included) and ends after `silence_end` seconds of non-speech or at `max_seconds`.
+    """
+    def __init__(self, vad, chunk_seconds, preroll_seconds=0.3, silence_end=0.5, max_seconds=3.0):
+        self.vad = vad
+        self.chunk_seconds = chunk_seconds
+        self.silence_end = silence_end
+        self.max_seconds = max_seconds
+        self.preroll = deque(maxlen=max(1, int(preroll_seconds / chunk_seconds)))
+        self.in_speech = False
+        self.speech_time = 0.0
+        self.silence_time = 0.0
+        self.utterances = 0
+
+    def push(self, chunk):
+        speech = self.vad.is_speech(chunk)
+
+        if not self.in_speech:
+            if not speech:
+                self.preroll.append(chunk)
+                return []
+            self.in_speech = True
+            self.speech_time = self.silence_time = 0.0
+            self.utterances += 1
+            events = [("start", list(self.preroll))]
+            self.preroll.clear()
+        else:
+            events = []
+
+        self.speech_time += self.chunk_seconds
+        self.silence_time = 0.0 if speech else self.silence_time + self.chunk_seconds
+        events.append(("audio", chunk))
+
+        if self.silence_time >= self.silence_end or self.speech_time >= self.max_seconds:
+            self.in_speech = False
+            events.append(("end", None))
+        return events
+
+    def reset(self):
+        self.in_speech = False
+        self.preroll.clear()
+
+# --- Persisted calibration ---
+def load_calibration(path, sample_rate):
+    """Stored noise floor for this sample rate, or None."""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("sample_rate") != sample_rate:
+        return None
+    return data.get("noise_floor")
+
+def save_calibration(path, noise_floor, sample_rate):
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump({"noise_floor": round(noise_floor, 2), "sample_rate": sample_rate, "saved_at": time.time()}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not save voice calibration: {e}")
@@ -1,66 +1,175 @@
+import os
 import time
 import speech_recognition as sr
 from controller import SystemController
+from pipeline import StageStats
+from speech import create_recognizer
+from audio_capture import AudioCapture
+from vad import EnergyVad, UtteranceSegmenter, load_calibration, save_calibration
 
 MODULE_NAME = "voice"
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-def main():
+# --- CONFIGURATION ---
+VOSK_MODEL_PATH = os.getenv("STARTIFY_VOSK_MODEL", os.path.join(ENGINE_DIR, "models", "vosk-model-small-en-us-0.15"))
+# Offline grammar recognizer when its model is installed, Google's web API otherwise
+VOICE_BACKEND = os.getenv("STARTIFY_VOICE_BACKEND", "vosk" if os.path.isdir(VOSK_MODEL_PATH) else "google")
+SAMPLE_RATE = 16000
+CHUNK_MS = 100  # Audio handed to the VAD / recognizer per step
+BUFFER_SECONDS = 10  # Capture ring; recognition may lag this far behind without losing audio
+PREROLL_SECONDS = 0.3  # Audio before the detected onset that is included in an utterance
+PHRASE_TIME_LIMIT = 3  # Seconds; longer utterances are cut here
+SILENCE_END = 0.5  # Seconds without speech that end an utterance
+STATUS_CHECK = 1.0  # Seconds between voice_active checks while nobody speaks
+# Noise calibration: measured once, then reused on every start and adapted while running
+CALIBRATION_FILE = os.getenv("STARTIFY_VOICE_CALIBRATION", os.path.join(ENGINE_DIR, "voice_calibration.json"))
+CALIBRATION_SECONDS = 1.0
+CALIBRATION_SAVE_INTERVAL = 60  # Seconds between saves of the adapted noise floor ...
+CALIBRATION_SAVE_CHANGE = 0.15  # ... and only if it moved by more than this fraction
+STATS_INTERVAL = 10  # Seconds between timing reports to the backend's /api/metrics
+
+def main(controller=None, stop_event=None):
+    """Runs the engine until Ctrl+C or stop_event (set when the backend hosts it in-process)."""
     # Initialize Controller (The Communication Hub)
-    controller = SystemController()
-    
-    # Initialize Microphone (The Sensor)
-    recognizer = sr.Recognizer()
-    mic = sr.Microphone()
+    controller = controller or SystemController(name=MODULE_NAME)
+
+    # Initialize Microphone (The Sensor); read continuously by the capture thread
+    chunk_frames = SAMPLE_RATE * CHUNK_MS // 1000
+    mic = sr.Microphone(sample_rate=SAMPLE_RATE, chunk_size=chunk_frames)
+    capture = AudioCapture(lambda: mic, chunk_frames, SAMPLE_RATE, BUFFER_SECONDS)
+
+    noise_floor = load_calibration(CALIBRATION_FILE, SAMPLE_RATE)
+    vad = EnergyVad(capture.chunk_seconds, noise_floor, calibration_seconds=CALIBRATION_SECONDS)
+    segmenter = UtteranceSegmenter(vad, capture.chunk_seconds, PREROLL_SECONDS, SILENCE_END, PHRASE_TIME_LIMIT)
+
+    if vad.calibrating:
+        print("🎤 Calibrating Microphone... Please be silent.")
+        capture.start()
+        while vad.calibrating:
+            chunk = capture.read(timeout=2.0)
+            if chunk is None:
+                raise RuntimeError(f"Microphone not delivering audio: {capture.error}")
+            vad.is_speech(chunk)
+        save_calibration(CALIBRATION_FILE, vad.noise_floor, SAMPLE_RATE)
+        print(f"✅ Calibration Complete (threshold {vad.threshold:.0f}).")
+    else:
+        print(f"✅ Using saved calibration (threshold {vad.threshold:.0f}).")
+    saved_floor = vad.noise_floor
+    last_save = time.monotonic()
 
-    print("🎤 Calibrating Microphone... Please be silent.")
-    with mic as source:
-        recognizer.adjust_for_ambient_noise(source, duration=2)
-    print("✅ Calibration Complete.")
+    backend = create_recognizer(VOICE_BACKEND, SAMPLE_RATE, VOSK_MODEL_PATH)
+    print(f"🧠 Voice backend: {backend.name}")
+
+    actions = {
+        "play": controller.play,
+        "pause": controller.pause,
+        "next": controller.next,
+        "previous": controller.previous
+    }
 
     # TELL BACKEND: "I AM READY"
     controller.set_engine_status(MODULE_NAME, True)
 
+    voice_active = False
+    last_check = 0.0
+    fired = False
+    onset = None # time.time() the current utterance started; origin of its command's trace
+    commands = 0
+    stats = {
+        "recognize": StageStats("recognize"), # recognizer compute per chunk / utterance end
+        "speech_to_command": StageStats("speech_to_command")
+    }
+    last_report = time.monotonic()
+
+    def report_metrics():
+        controller.report_metrics(MODULE_NAME, {
+            "utterances": segmenter.utterances,
+            "commands": commands,
+            "audio_captured": capture.captured,
+            "audio_dropped": capture.dropped,
+            "audio_backlog": capture.backlog(),
+            "noise_threshold": round(vad.threshold, 1) if not vad.calibrating else 0,
+            "stages": {name: s.as_dict() for name, s in stats.items()}
+        })
+
     try:
-        while True:
-            voice_active, _ = controller.sync_system_status()
+        while not (stop_event and stop_event.is_set()):
+            now = time.monotonic()
+            if now - last_report >= STATS_INTERVAL:
+                report_metrics()
+                last_report = now
+
+            if not segmenter.in_speech and now - last_check >= STATUS_CHECK:
+                voice_active, _ = controller.sync_system_status()
+                last_check = now
 
             if not voice_active:
-                time.sleep(1)
+                if capture.running:
+                    capture.stop() # Release the mic while voice control is off
+                    segmenter.reset()
+                    print("⏸️ Voice control off")
+                controller.wait_for_status_change(1.0)
+                last_check = 0.0
+                continue
+
+            if not capture.running:
+                if capture.error:
+                    time.sleep(1) # Mic vanished; retry without spinning
+                print("🟢 Listening...")
+                capture.start()
+
+            chunk = capture.read(timeout=STATUS_CHECK)
+            if chunk is None:
                 continue
 
-            print("🟢 Listening...")
             try:
-                with mic as source:
-                    audio = recognizer.listen(source, timeout=5, phrase_time_limit=3)
-                
-                command_text = recognizer.recognize_google(audio).lower()
-                print(f"🗣️ Heard: '{command_text}'")
-
-                if "play" in command_text or "start" in command_text:
-                    controller.play()
-                elif "pause" in command_text or "stop" in command_text:
-                    controller.pause()
-                elif "next" in command_text or "skip" in command_text:
-                    controller.next()
-                elif "previous" in command_text or "back" in command_text:
-                    controller.previous()
-
-            except sr.WaitTimeoutError:
-                pass 
-            except sr.UnknownValueError:
-                print("🤔 Unclear")
+                for kind, data in segmenter.push(chunk):
+                    command = None
+                    start = time.perf_counter()
+                    if kind == "start":
+                        fired = False
+                        # Audio read now was captured `backlog` chunks ago; the pre-roll is older still
+                        onset = time.time() - (capture.backlog() + 1) * capture.chunk_seconds
+                        backend.start()
+                        for pre in data:
+                            command = backend.accept(pre) or command
+                    elif kind == "audio":
+                        command = backend.accept(data)
+                    else: # end of utterance; capture kept running meanwhile
+                        command = backend.finish()
+                        if not command and not fired:
+                            print("🤔 Unclear")
+                    stats["recognize"].record(time.perf_counter() - start)
+
+                    if command and not fired:
+                        fired = True
+                        commands += 1
+                        stats["speech_to_command"].record(time.time() - onset)
+                        print(f"🎯 Command: {command}")
+                        actions[command](onset)
             except sr.RequestError:
                 print("❌ Internet Error")
             except Exception as e:
                 print(f"⚠️ Error: {e}")
 
+            # Keep the stored calibration close to the adapted one
+            floor = vad.noise_floor
+            if now - last_save >= CALIBRATION_SAVE_INTERVAL and abs(floor - saved_floor) > CALIBRATION_SAVE_CHANGE * max(saved_floor, 1.0):
+                save_calibration(CALIBRATION_FILE, floor, SAMPLE_RATE)
+                saved_floor, last_save = floor, now
+
     except KeyboardInterrupt:
         print("\n🛑 Manual Stop")
 
     finally:
+        capture.stop()
+        if not vad.calibrating:
+            save_calibration(CALIBRATION_FILE, vad.noise_floor, SAMPLE_RATE)
+        print(f"🎙️ Capture: {capture.report()}")
         # TELL BACKEND: "I AM DEAD"
         controller.set_engine_status(MODULE_NAME, False)
+        controller.close()
         print("👋 Engine Shutdown.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,177 @@
+"""
+Replay benchmark for the IMU tilt classifier.
+
+    python tools/bench_imu.py recording.npz [...] --devices 64 --batch 10
+    python tools/bench_imu.py --synthetic 120 --save synthetic_imu.npz
+
+Streams each recording through ImuClassifier in batches of --batch samples for
+--devices simulated devices at once, and reports samples/s, per-batch latency
+percentiles and the gestures found. Also checks that batching doesn't change the
+result and, for synthetic data, compares against the ground truth and against the
+sketch's original 100 ms threshold polling.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from CONFIG import Config
+from api.utils.u_imu import ImuClassifier, Settings, save_recording, load_recording
+
+DIRECTIONS = {
+    "previous": (1, 0),
+    "next": (-1, 0),
+    "pause": (0, 1),
+    "play": (0, -1)
+}
+
+def synthetic_stream(seconds, rate=Config.IMU_SAMPLE_RATE, seed=0):
+    """
+    Device mostly at rest (noise + a small mounting bias), with a tilt every ~1.5 s
+    (some held for most of a second) and occasional knocks whose ramps sweep
+    through the tilt window.
+    Returns (t_ms, raw int16 (N,3), [(command, start_ms), ...]).
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * rate)
+    t_ms = np.arange(n) * 1000.0 / rate
+    acc = np.zeros((n, 3))
+    acc[:, 2] = 1.0
+    acc[:, :2] += (0.03, -0.02) # mounting bias
+    truth = []
+
+    i = int(0.5 * rate)
+    while i < n - rate:
+        command = rng.choice(list(DIRECTIONS))
+        hold = int(rng.uniform(0.25, 0.9) * rate)
+        ramp = int(0.05 * rate)
+        dx, dy = DIRECTIONS[command]
+        level = rng.uniform(0.88, 0.98)
+        profile = np.concatenate((np.linspace(0, level, ramp), np.full(hold, level), np.linspace(level, 0, ramp)))
+        end = min(n, i + len(profile))
+        acc[i:end, 0] += dx * profile[:end - i]
+        acc[i:end, 1] += dy * profile[:end - i]
+        truth.append((str(command), float(t_ms[i])))
+
+        if rng.random() < 0.3: # knock: ~80 ms spike well past max_g
+            k = end + int(0.3 * rate)
+            spike = np.interp(np.arange(int(0.08 * rate)), [0, 0.04 * rate, 0.08 * rate], [0, 1.6, 0])
+            if k + len(spike) < n:
+                acc[k:k + len(spike), int(rng.integers(0, 2))] += rng.choice((-1.0, 1.0)) * spike
+        i = end + int(rng.uniform(0.8, 1.4) * rate)
+
+    acc += rng.normal(0, 0.04, acc.shape)
+    raw = np.clip(acc * Config.IMU_SCALE, -32768, 32767).astype(np.int16)
+    return t_ms, raw, truth
+
+def legacy_classify(raw, rate):
+    """The sketch's loop(): raw thresholds checked every 100 ms with a 500 ms debounce."""
+    g = raw / Config.IMU_SCALE
+    step = max(1, int(round(rate / 10)))
+    events, last = [], -np.inf
+    for i in range(0, len(g), step):
+        t = i * 1000.0 / rate
+        if t - last <= 500:
+            continue
+        x, y = g[i, 0], g[i, 1]
+        command = None
+        if 0.80 <= x <= 1.05: command = "previous"
+        elif -1.05 <= x <= -0.80: command = "next"
+        elif 0.80 <= y <= 1.05: command = "pause"
+        elif -1.05 <= y <= -0.80: command = "play"
+        if command:
+            events.append((command, t))
+            last = t
+    return events
+
+def score(events, truth, tolerance_ms=800):
+    """(correct, wrong, missed): events matched to ground truth tilts that started shortly before."""
+    correct = wrong = 0
+    matched = set()
+    for command, t in events:
+        hit = next((k for k, (c, start) in enumerate(truth) if k not in matched and 0 <= t - start <= tolerance_ms), None)
+        if hit is not None and truth[hit][0] == command:
+            correct += 1
+            matched.add(hit)
+        else:
+            wrong += 1
+    return correct, wrong, len(truth) - len(matched)
+
+def run(raw, rate, devices, batch, settings):
+    classifier = ImuClassifier(settings, calibration_file=None)
+    per_batch = []
+    events = {d: [] for d in range(devices)}
+    start = time.perf_counter()
+    for offset in range(0, len(raw), batch):
+        chunk = raw[offset:offset + batch]
+        for d in range(devices):
+            t0 = time.perf_counter()
+            events[d].extend(classifier.process(d, chunk, offset * 1000.0 / rate, rate))
+            per_batch.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    return events[0], elapsed, np.asarray(per_batch)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the IMU tilt classifier on recorded samples")
+    parser.add_argument("recordings", nargs="*", help=".npz files with t_ms and raw (N,3) int16")
+    parser.add_argument("--synthetic", type=float, default=0, help="seconds of synthetic data instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write the synthetic stream to this .npz")
+    parser.add_argument("--rate", type=float, default=Config.IMU_SAMPLE_RATE)
+    parser.add_argument("--devices", type=int, default=16, help="simulated devices streaming the same data")
+    parser.add_argument("--batch", type=int, default=10, help="samples per batch (10 = 100 ms at 100 Hz)")
+    parser.add_argument("--sensitivity", type=float, default=1.0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    streams = []
+    if args.synthetic:
+        t_ms, raw, truth = synthetic_stream(args.synthetic, args.rate, args.seed)
+        if args.save:
+            save_recording(args.save, t_ms, raw)
+        streams.append(("synthetic", raw, truth))
+    for path in args.recordings:
+        _, raw = load_recording(path)
+        streams.append((path, raw, None))
+    if not streams:
+        parser.error("give recordings or --synthetic SECONDS")
+
+    settings = Settings(sensitivity=args.sensitivity)
+    reports = []
+    for name, raw, truth in streams:
+        events, elapsed, per_batch = run(raw, args.rate, args.devices, args.batch, settings)
+        whole, _, _ = run(raw, args.rate, 1, len(raw), settings)
+        assert events == whole, "batching changed the classifier output"
+
+        report = {
+            "stream": name,
+            "samples": int(len(raw)),
+            "devices": args.devices,
+            "batch": args.batch,
+            "samples_per_s": round(len(raw) * args.devices / elapsed),
+            "batch_p50_us": round(float(np.percentile(per_batch, 50)) * 1e6, 1),
+            "batch_p99_us": round(float(np.percentile(per_batch, 99)) * 1e6, 1),
+            "gestures": {c: sum(1 for e in events if e[0] == c) for c in DIRECTIONS}
+        }
+        if truth is not None:
+            legacy = legacy_classify(raw, args.rate)
+            report["accuracy"] = dict(zip(("correct", "wrong", "missed"), score(events, truth)))
+            report["legacy_accuracy"] = dict(zip(("correct", "wrong", "missed"), score(legacy, truth)))
+        reports.append(report)
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    for r in reports:
+        print(f"📈 {r['stream']}: {r['samples']} samples x {r['devices']} devices, batch {r['batch']}")
+        print(f"   {r['samples_per_s']:,} samples/s | batch p50 {r['batch_p50_us']} us | p99 {r['batch_p99_us']} us")
+        print(f"   gestures: {r['gestures']}")
+        if "accuracy" in r:
+            print(f"   classifier vs truth: {r['accuracy']}")
+            print(f"   sketch thresholds:   {r['legacy_accuracy']}")
+
+if __name__ == '__main__':
+    main()
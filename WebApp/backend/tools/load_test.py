@@ -0,0 +1,151 @@
+"""
+Load generator for the backend API.
+
+    python tools/load_test.py --concurrency 16 --duration 20 --mix state=60,status=20,dashboard=10,pause=4,play=4,toggle=2
+
+Each worker thread keeps one HTTP session and picks a scenario per request according
+to the weighted mix. Prints throughput plus p50/p95/p99 latency per scenario and the
+status codes seen. Use it with tools/mock_spotify.py to measure without Spotify.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import requests
+
+# name -> (method, path, json body)
+SCENARIOS = {
+    "state": ("GET", "/api/player/state", None),
+    "devices": ("GET", "/api/player/devices", None),
+    "profile": ("GET", "/api/user/profile", None),
+    "dashboard": ("GET", "/api/dashboard", None),
+    "play": ("POST", "/api/player/play", None),
+    "pause": ("POST", "/api/player/pause", None),
+    "next": ("POST", "/api/player/next", None),
+    "previous": ("POST", "/api/player/previous", None),
+    "status": ("GET", "/api/status", None),
+    "error": ("GET", "/api/error", None),
+    "toggle": ("POST", "/api/toggle", {"module": "hand", "active": False})
+}
+
+DEFAULT_MIX = "state=50,status=20,pause=10,play=10,toggle=10"
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'. Known: {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class Results:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}  # scenario -> [seconds]
+        self.statuses = {}   # scenario -> {status: count}
+
+    def add(self, scenario, elapsed, status):
+        with self._lock:
+            self.latencies.setdefault(scenario, []).append(elapsed)
+            per_status = self.statuses.setdefault(scenario, {})
+            per_status[status] = per_status.get(status, 0) + 1
+
+    def summary(self, wall_time):
+        report = {"wall_time_s": round(wall_time, 2), "scenarios": {}}
+        total = 0
+        for scenario, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            total += len(values)
+            report["scenarios"][scenario] = {
+                "requests": len(values),
+                "rps": round(len(values) / wall_time, 1),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+                "statuses": self.statuses[scenario]
+            }
+        report["requests"] = total
+        report["rps"] = round(total / wall_time, 1)
+        return report
+
+def worker(base, mix, deadline, remaining, results, timeout):
+    session = requests.Session()
+    names = list(mix)
+    weights = [mix[n] for n in names]
+
+    while time.monotonic() < deadline:
+        if remaining is not None:
+            with remaining['lock']:
+                if remaining['left'] <= 0:
+                    return
+                remaining['left'] -= 1
+
+        scenario = random.choices(names, weights)[0]
+        method, path, body = SCENARIOS[scenario]
+        start = time.perf_counter()
+        try:
+            res = session.request(method, base + path, json=body, timeout=timeout,
+                                  headers={'X-Command-Source': 'load-test'})
+            status = res.status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        results.add(scenario, time.perf_counter() - start, status)
+
+def print_report(report):
+    print(f"\n📊 {report['requests']} requests in {report['wall_time_s']}s -> {report['rps']} req/s\n")
+    print(f"{'scenario':<10} {'n':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  statuses")
+    for name, s in report["scenarios"].items():
+        statuses = ' '.join(f"{k}:{v}" for k, v in s["statuses"].items())
+        print(f"{name:<10} {s['requests']:>7} {s['rps']:>8} {s['p50_ms']:>9} {s['p95_ms']:>9} "
+              f"{s['p99_ms']:>9} {s['max_ms']:>9}  {statuses}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the backend API and report latency percentiles")
+    parser.add_argument("--base", default="http://127.0.0.1:5000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted scenarios, e.g. state=60,pause=10")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    mix = parse_mix(args.mix)
+    results = Results()
+    remaining = {'left': args.requests, 'lock': threading.Lock()} if args.requests else None
+
+    start = time.monotonic()
+    deadline = start + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(args.base.rstrip('/'), mix, deadline, remaining, results, args.timeout), daemon=True)
+        for _ in range(args.concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    report = results.summary(time.monotonic() - start)
+    report["concurrency"] = args.concurrency
+    report["mix"] = mix
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""
+Local stand-in for the parts of the Spotify API the backend uses.
+
+    python tools/mock_spotify.py --port 5055 --latency 80 --jitter 20 --error-rate 0.02 --rate-limit 0.01
+
+Then start the backend against it:
+
+    SPOTIFY_API_BASE_URL=http://127.0.0.1:5055/v1 \
+    SPOTIFY_AUTH_URL=http://127.0.0.1:5055/authorize \
+    SPOTIFY_TOKEN_URL=http://127.0.0.1:5055/api/token python api/server.py
+
+/login now completes without a Spotify account. Injection settings can be changed while
+running with POST /mock/config (same names as the CLI flags, underscores), and
+GET /mock/stats shows what was served.
+"""
+import argparse
+import random
+import threading
+import time
+import urllib.parse
+import uuid
+from flask import Flask, jsonify, redirect, request
+
+TRACKS = [
+    {"name": "Mock Track One", "duration_ms": 215000, "artists": [{"name": "The Stubs"}]},
+    {"name": "Mock Track Two", "duration_ms": 184000, "artists": [{"name": "Latency & The Jitters"}]},
+    {"name": "Mock Track Three", "duration_ms": 242000, "artists": [{"name": "Retry-After"}]}
+]
+
+DEVICES = [
+    {"id": "mock-desktop", "name": "Mock Desktop", "type": "Computer", "is_active": True, "volume_percent": 60},
+    {"id": "mock-phone", "name": "Mock Phone", "type": "Smartphone", "is_active": False, "volume_percent": 40}
+]
+
+def parse_bool(value):
+    # bool("false") is True, so strings are read by name
+    if isinstance(value, str):
+        if value.strip().lower() in ("1", "true", "yes", "on"):
+            return True
+        if value.strip().lower() in ("0", "false", "no", "off", ""):
+            return False
+        raise ValueError(f"Not a boolean: {value!r}")
+    return bool(value)
+
+class Settings:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit=0.0, retry_after=1,
+                 expires_in=3600, check_tokens=True):
+        self.latency = latency          # ms added to every response
+        self.jitter = jitter            # +/- ms, uniform
+        self.error_rate = error_rate    # share of API calls answered 503
+        self.rate_limit = rate_limit    # share of API calls answered 429
+        self.retry_after = retry_after  # Retry-After seconds sent with 429
+        self.expires_in = expires_in    # lifetime of issued access tokens
+        self.check_tokens = check_tokens
+
+    def update(self, values):
+        """Raises ValueError for a value that doesn't fit the setting's type."""
+        for key, value in values.items():
+            if hasattr(self, key):
+                current = getattr(self, key)
+                setattr(self, key, parse_bool(value) if isinstance(current, bool) else type(current)(value))
+
+    def as_dict(self):
+        return dict(vars(self))
+
+class Player:
+    """Minimal playback simulation: play/pause/next/previous with a running position."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.track = 0
+        self.is_playing = True
+        self.progress_ms = 0
+        self.anchor = time.monotonic()
+
+    def _position(self, now):
+        position = self.progress_ms
+        if self.is_playing:
+            position += int((now - self.anchor) * 1000)
+        return position
+
+    def state(self):
+        now = time.monotonic()
+        with self._lock:
+            position = self._position(now)
+            duration = TRACKS[self.track]['duration_ms']
+            if position >= duration: # Auto-advance like a real queue
+                self.track = (self.track + 1) % len(TRACKS)
+                self.progress_ms, self.anchor = 0, now
+                position = 0
+            track = TRACKS[self.track]
+            return {
+                "is_playing": self.is_playing,
+                "progress_ms": position,
+                "item": {
+                    "name": track['name'],
+                    "duration_ms": track['duration_ms'],
+                    "artists": track['artists'],
+                    "album": {"images": [{"url": f"https://picsum.photos/seed/{self.track}/640", "height": 640, "width": 640}]}
+                },
+                "device": DEVICES[0]
+            }
+
+    def command(self, command):
+        now = time.monotonic()
+        with self._lock:
+            self.progress_ms = self._position(now)
+            self.anchor = now
+            if command in ("play", "pause"):
+                self.is_playing = command == "play"
+            else:
+                step = 1 if command == "next" else -1
+                self.track = (self.track + step) % len(TRACKS)
+                self.progress_ms = 0
+                self.is_playing = True
+
+def create_app(settings=None):
+    app = Flask(__name__)
+    settings = settings or Settings()
+    player = Player()
+    tokens = {}   # access token -> expires_at (time.time())
+    stats = {}    # "METHOD path" -> {status: count}
+    stats_lock = threading.Lock()
+
+    def count(status):
+        key = f"{request.method} {request.path}"
+        with stats_lock:
+            per_status = stats.setdefault(key, {})
+            per_status[status] = per_status.get(status, 0) + 1
+
+    def issue_token():
+        access = f"mock-access-{uuid.uuid4().hex[:16]}"
+        tokens[access] = time.time() + settings.expires_in
+        return {
+            "access_token": access,
+            "token_type": "Bearer",
+            "expires_in": settings.expires_in,
+            "refresh_token": f"mock-refresh-{uuid.uuid4().hex[:16]}",
+            "scope": "user-read-playback-state user-modify-playback-state"
+        }
+
+    def simulate():
+        """Latency + injected failures for /v1 calls. Returns an error response or None."""
+        delay = settings.latency + random.uniform(-settings.jitter, settings.jitter)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if settings.check_tokens:
+            auth = request.headers.get('Authorization', '')
+            token = auth[7:] if auth.startswith('Bearer ') else None
+            if token not in tokens or tokens[token] < time.time():
+                return jsonify({"error": {"status": 401, "message": "The access token expired"}}), 401
+
+        roll = random.random()
+        if roll < settings.rate_limit:
+            response = jsonify({"error": {"status": 429, "message": "API rate limit exceeded"}})
+            response.headers['Retry-After'] = str(settings.retry_after)
+            return response, 429
+        if roll < settings.rate_limit + settings.error_rate:
+            return jsonify({"error": {"status": 503, "message": "Service unavailable"}}), 503
+        return None
+
+    @app.after_request
+    def record(response):
+        count(response.status_code)
+        return response
+
+    # --- Accounts ---
+    @app.route('/authorize')
+    def authorize():
+        # No consent screen: straight back to the app with a code
+        params = {'code': f"mock-code-{uuid.uuid4().hex[:8]}"}
+        if request.args.get('state'):
+            params['state'] = request.args['state']
+        return redirect(f"{request.args['redirect_uri']}?{urllib.parse.urlencode(params)}")
+
+    @app.route('/api/token', methods=['POST'])
+    def token():
+        grant = request.form.get('grant_type')
+        if grant == 'authorization_code' and request.form.get('code'):
+            return jsonify(issue_token())
+        if grant == 'refresh_token' and request.form.get('refresh_token'):
+            data = issue_token()
+            del data['refresh_token'] # Spotify usually keeps the old one
+            return jsonify(data)
+        return jsonify({"error": "invalid_grant"}), 400
+
+    # --- Web API ---
+    @app.route('/v1/me')
+    def me():
+        error = simulate()
+        if error: return error
+        return jsonify({
+            "id": "mock-user",
+            "display_name": "Mock User",
+            "email": "mock@example.com",
+            "images": [{"url": "https://picsum.photos/seed/user/64", "height": 64, "width": 64}]
+        })
+
+    @app.route('/v1/me/player')
+    def playback_state():
+        error = simulate()
+        if error: return error
+        return jsonify(player.state())
+
+    @app.route('/v1/me/player/devices')
+    def devices():
+        error = simulate()
+        if error: return error
+        return jsonify({"devices": DEVICES})
+
+    @app.route('/v1/me/player/<command>', methods=['PUT', 'POST'])
+    def control(command):
+        expected = {"play": "PUT", "pause": "PUT", "next": "POST", "previous": "POST"}
+        if expected.get(command) != request.method:
+            return jsonify({"error": {"status": 405, "message": "Method not allowed"}}), 405
+        error = simulate()
+        if error: return error
+        player.command(command)
+        return "", 204
+
+    # --- Mock control ---
+    @app.route('/mock/config', methods=['GET', 'POST'])
+    def mock_config():
+        if request.method == 'POST':
+            try:
+                settings.update(request.json or {})
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": str(e)}), 400
+        return jsonify(settings.as_dict())
+
+    @app.route('/mock/stats')
+    def mock_stats():
+        with stats_lock:
+            return jsonify(stats)
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Spotify API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--latency", type=float, default=0.0, help="ms added to every API response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- ms of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of API calls answered 503")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of API calls answered 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429")
+    parser.add_argument("--expires-in", type=int, default=3600, help="access token lifetime in seconds")
+    parser.add_argument("--no-token-check", action="store_true", help="accept any bearer token")
+    args = parser.parse_args()
+
+    settings = Settings(args.latency, args.jitter, args.error_rate, args.rate_limit,
+                        args.retry_after, args.expires_in, not args.no_token_check)
+    print(f"🎭 [MOCK] Spotify stand-in on http://{args.host}:{args.port} {settings.as_dict()}")
+    create_app(settings).run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == '__main__':
+    main()
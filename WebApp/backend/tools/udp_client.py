@@ -0,0 +1,100 @@
+"""
+Python stand-in for the ESP32's UDP controller channel.
+
+    python tools/udp_client.py pause                 # one command, retransmitted until acked
+    python tools/udp_client.py status --device 0xE532
+    python tools/udp_client.py pause --bench 500     # round-trip latency percentiles
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.utils import u_udp
+
+OPCODES = {
+    "play": u_udp.OP_PLAY,
+    "pause": u_udp.OP_PAUSE,
+    "next": u_udp.OP_NEXT,
+    "previous": u_udp.OP_PREVIOUS,
+    "voice-on": u_udp.OP_VOICE_ON,
+    "voice-off": u_udp.OP_VOICE_OFF,
+    "hand-on": u_udp.OP_HAND_ON,
+    "hand-off": u_udp.OP_HAND_OFF,
+    "status": u_udp.OP_STATUS
+}
+
+class DeviceClient:
+    """Sends one datagram per event and resends the same seq until the ack arrives."""
+    def __init__(self, host, port, device_id, retry_timeout=0.08, retries=3):
+        self.addr = (host, port)
+        self.device_id = device_id
+        self.retry_timeout = retry_timeout
+        self.retries = retries
+        self.seq = 0 # seq 0 tells the backend we (re)started
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(retry_timeout)
+        self.retransmits = 0
+
+    def send(self, opcode):
+        """Returns (ack dict, round trip seconds) or (None, None) after all retries."""
+        seq = self.seq
+        self.seq = (self.seq + 1) % 2**32
+        packet = u_udp.encode_packet(opcode, self.device_id, seq)
+
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.retransmits += 1
+            self.sock.sendto(packet, self.addr)
+            deadline = time.monotonic() + self.retry_timeout
+            while time.monotonic() < deadline:
+                try:
+                    data, _ = self.sock.recvfrom(64)
+                except socket.timeout:
+                    break
+                ack = u_udp.decode_ack(data)
+                if ack and ack["seq"] == seq and ack["device_id"] == self.device_id:
+                    return ack, time.perf_counter() - start
+        return None, None
+
+def main():
+    parser = argparse.ArgumentParser(description="Send controller events to the backend over UDP")
+    parser.add_argument("command", choices=list(OPCODES))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5005)
+    parser.add_argument("--device", type=lambda v: int(v, 0), default=0x5A17, help="device id (int, 0x.. ok)")
+    parser.add_argument("--timeout", type=float, default=0.08, help="seconds before a retransmit")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--bench", type=int, default=0, help="send N times and report latency")
+    args = parser.parse_args()
+
+    client = DeviceClient(args.host, args.port, args.device, args.timeout, args.retries)
+    opcode = OPCODES[args.command]
+
+    if not args.bench:
+        ack, rtt = client.send(opcode)
+        if not ack:
+            print("❌ No ack")
+            sys.exit(1)
+        print(f"✅ {ack} in {rtt * 1000:.2f} ms")
+        return
+
+    rtts, lost = [], 0
+    for _ in range(args.bench):
+        ack, rtt = client.send(opcode)
+        if ack:
+            rtts.append(rtt)
+        else:
+            lost += 1
+
+    rtts.sort()
+    def pct(p):
+        return rtts[min(len(rtts) - 1, int(p / 100 * len(rtts)))] * 1000 if rtts else 0.0
+    print(f"📊 {len(rtts)}/{args.bench} acked, {lost} lost, {client.retransmits} retransmits")
+    print(f"   p50 {pct(50):.2f} ms | p95 {pct(95):.2f} ms | p99 {pct(99):.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,7 @@ import Login from "./components/Login";
 import Dashboard from "./components/Dashboard";
 import ErrorPage from "./globals/ErrorPage";
 import { getTokenFromUrl } from "./utils/token";
-import { checkSystemHealth } from "./utils/error";
+import { checkSystemHealth, watchSystemHealth } from "./utils/error";
 
 function App() {
   const [token, setToken] = useState(null);
@@ -17,28 +17,19 @@ function App() {
     if (accessToken) setToken(accessToken);
   }, []);
 
-  // 2. Smart Heartbeat
+  // 2. Smart Heartbeat (long-poll: the backend answers when an error event arrives)
   useEffect(() => {
     if (!token) return;
-    const poll = async () => {
-      const errorData = await checkSystemHealth();
-      setGlobalError(errorData);
-    };
-
-    poll(); // Initial check
-
-    let interval = null;
-    if (isSystemActive) {
-      interval = setInterval(poll, 5000);
+    if (!isSystemActive) {
+      checkSystemHealth().then(setGlobalError); // One check
+      return;
     }
-
-    return () => {
-      if (interval) clearInterval(interval);
-    };
+    return watchSystemHealth(setGlobalError);
   }, [isSystemActive]);
 
   const handleDismiss = () => {
     localStorage.removeItem("access_token");
+    localStorage.removeItem("device_key");
     setToken(null);
     setGlobalError(null);
     setIsSystemActive(false);
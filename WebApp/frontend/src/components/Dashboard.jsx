@@ -2,9 +2,11 @@ import React, { useState, useEffect } from "react";
 import Header from "./Header";
 import PlayerStage from "./PlayerStage";
 import Controls from "./Controls";
-import { fetchUserProfile } from "../utils/user";
+import { fetchDashboard } from "../utils/dashboard";
 import { play, pause, next, previous } from "../utils/player";
 
+const DASHBOARD_SECTIONS = ["player", "profile"];
+
 const Dashboard = ({
   token,
   engineState,
@@ -15,32 +17,19 @@ const Dashboard = ({
   const [user, setUser] = useState(null);
   const [playerState, setPlayerState] = useState(null);
 
-  // 1. Fetch User (Once)
-  useEffect(() => {
-    const loadUser = async () => {
-      const userData = await fetchUserProfile();
-      setUser(userData);
-    };
-    loadUser();
-  }, []);
-
-  // 2. Poll Player State (Every 1s)
+  // One request per tick for what this screen shows (profile is cached server-side).
+  // Devices, engine status and errors are not rendered here, so they aren't fetched.
   useEffect(() => {
-    const fetchState = async () => {
-      try {
-        const res = await fetch("http://127.0.0.1:5000/api/player/state");
-        if (res.ok) {
-          const data = await res.json();
-          setPlayerState(data);
-        }
-      } catch (e) {
-        console.error("Sync error", e);
-      }
+    const sync = async () => {
+      const data = await fetchDashboard(DASHBOARD_SECTIONS);
+      if (!data) return;
+      if (data.profile) setUser(data.profile);
+      if (!data.failed?.player) setPlayerState(data.player);
     };
 
     // Run immediately then loop
-    fetchState();
-    const interval = setInterval(fetchState, 1000);
+    sync();
+    const interval = setInterval(sync, 1000);
     return () => clearInterval(interval);
   }, []);
 
@@ -0,0 +1,23 @@
+import { authHeaders } from "./token";
+
+const API_BASE = "http://127.0.0.1:5000/api";
+
+/**
+ * Player state, devices, profile, engine status and error in one request.
+ * Sections that failed upstream are null (see `failed`).
+ */
+export const fetchDashboard = async (sections) => {
+  try {
+    const query = sections ? `?sections=${sections.join(",")}` : "";
+    const res = await fetch(`${API_BASE}/dashboard${query}`, {
+      headers: authHeaders(),
+    });
+    if (res.ok) {
+      return await res.json();
+    }
+    return null;
+  } catch (err) {
+    console.error("Failed to load dashboard", err);
+    return null;
+  }
+};
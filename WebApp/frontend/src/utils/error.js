@@ -1,8 +1,12 @@
+import { authHeaders } from "./token";
+
 const API_BASE = "http://127.0.0.1:5000/api";
 
+const RETRY_MS = 5000;
+
 export const checkSystemHealth = async () => {
   try {
-    const res = await fetch(`${API_BASE}/error`);
+    const res = await fetch(`${API_BASE}/error`, { headers: authHeaders() });
     const data = await res.json();
 
     if (data && data.code) {
@@ -18,3 +22,44 @@ export const checkSystemHealth = async () => {
     };
   }
 };
+
+/**
+ * Calls onError(error | null) every time the current error changes, using the
+ * backend's long-poll (only new events come back). Returns a stop function.
+ */
+export const watchSystemHealth = (onError, timeout = 20) => {
+  let stopped = false;
+  let since = 0;
+
+  const loop = async () => {
+    while (!stopped) {
+      try {
+        const res = await fetch(
+          `${API_BASE}/error?since=${since}&timeout=${timeout}`,
+          { headers: authHeaders() },
+        );
+        const data = await res.json(); // { seq, events, current, truncated }
+        if (stopped) return;
+        if (data.seq !== since) {
+          since = data.seq;
+          onError(data.current && data.current.code ? data.current : null);
+        }
+      } catch (err) {
+        if (stopped) return;
+        console.error("Backend unreachable", err);
+        onError({
+          code: 500,
+          message: "Backend unreachable",
+          dev_info: err.toString(),
+        });
+        since = 0; // Read everything again once it's back
+        await new Promise((resolve) => setTimeout(resolve, RETRY_MS));
+      }
+    }
+  };
+
+  loop();
+  return () => {
+    stopped = true;
+  };
+};
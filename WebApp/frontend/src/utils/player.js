@@ -1,3 +1,5 @@
+import { authHeaders } from "./token";
+
 const API_BASE = "http://127.0.0.1:5000/api/player";
 
 /**
@@ -10,7 +12,7 @@ const sendCommand = async (endpoint) => {
   try {
     await fetch(`${API_BASE}/${endpoint}`, {
       method: "POST",
-      headers: { "Content-Type": "application/json" },
+      headers: { "Content-Type": "application/json", ...authHeaders() },
     });
   } catch (err) {
     console.error(`Failed to send ${endpoint} command`, err);
@@ -24,7 +26,9 @@ export const previous = () => sendCommand("previous");
 
 export const fetchDevices = async () => {
   try {
-    const res = await fetch(`${API_BASE}/devices`);
+    const res = await fetch(`${API_BASE}/devices`, {
+      headers: authHeaders(),
+    });
     if (res.ok) {
       const data = await res.json();
       return data || [];
@@ -1,10 +1,15 @@
 export const getTokenFromUrl = () => {
   const params = new URLSearchParams(window.location.search);
   const accessToken = params.get("access_token");
+  // The device key comes in the fragment (never sent to a server)
+  const deviceKey = new URLSearchParams(window.location.hash.slice(1)).get(
+    "device_key",
+  );
 
   if (accessToken) {
     localStorage.setItem("access_token", accessToken);
-    window.history.pushState({}, null, "/");
+    if (deviceKey) localStorage.setItem("device_key", deviceKey);
+    window.history.replaceState({}, null, "/"); // Drop the tokens from history
     return accessToken;
   }
 
@@ -16,7 +21,17 @@ export const getTokenFromUrl = () => {
   return null;
 };
 
+/**
+ * Identifies this browser's user to the backend (the session cookie alone
+ * isn't sent cross-origin from the dev server).
+ */
+export const authHeaders = () => {
+  const deviceKey = localStorage.getItem("device_key");
+  return deviceKey ? { "X-Device-Key": deviceKey } : {};
+};
+
 export const logout = () => {
   localStorage.removeItem("spotify_token");
+  localStorage.removeItem("device_key");
   window.location.reload();
 };
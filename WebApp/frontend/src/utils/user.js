@@ -1,8 +1,12 @@
+import { authHeaders } from "./token";
+
 const API_BASE = "http://127.0.0.1:5000/api/user";
 
 export const fetchUserProfile = async () => {
   try {
-    const res = await fetch(`${API_BASE}/profile`);
+    const res = await fetch(`${API_BASE}/profile`, {
+      headers: authHeaders(),
+    });
     if (res.ok) {
       return await res.json();
     }